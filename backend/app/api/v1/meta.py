@@ -20,7 +20,7 @@ from app.core.meta.schemas import (
     PolicyBindingCreate, PolicyBindingRead, PolicyBindingUpdate,
     AttributeCreate, AttributeRead, AttributeUpdate,
     RuleCreate, RuleRead,
-    DryRunRequest, DryRunResult,
+    DryRunRequest, DryRunResult, DryRunBatchRequest, DryRunBatchResult,
     SwitchboardManifest # ⚡ NEW: Dumb UI Contract
 )
 from app.core.kernel.registry import domain_registry
@@ -67,6 +67,15 @@ async def update_policy(id: int, payload: PolicyUpdate, db: AsyncSession = Depen
 async def dry_run_policy(payload: DryRunRequest, db: AsyncSession = Depends(get_db)):
     return MetaService.dry_run_policy(
         policy_data={"rules": [r.model_dump() for r in payload.policy.rules]},
+        context=payload.context,
+        explain=payload.explain
+    )
+
+@router.post("/policies/dry-run/batch", response_model=DryRunBatchResult)
+async def dry_run_policy_batch(payload: DryRunBatchRequest, db: AsyncSession = Depends(get_db)):
+    return MetaService.dry_run_policy_batch(
+        policy_data={"rules": [r.model_dump() for r in payload.policy.rules]},
+        entities=payload.entities,
         context=payload.context
     )
 
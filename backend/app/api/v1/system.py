@@ -4,6 +4,8 @@
 # @description: Exposes Hypervisor Circuits, System Capabilities, and the Boot Manifest.
 # @security-level: LEVEL 9 (Admin Control)
 # @updated: /manifest now injects Actor Context for RBAC Navigation filtering.
+# @updated: /policies/hot-rules exposes the per-rule latency histograms (core/meta/profiler.py).
+# @updated: /outbox/dead-letters/replay queues a background replay and returns the queued ids at once.
 
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from typing import Any, Dict, List, Optional
@@ -13,6 +15,13 @@ from sqlalchemy import select
 from app.core.database.session import get_db
 from app.core.kernel.system import system_manifest
 from app.core.kernel.context.manager import context_manager
+from app.core.kernel.deadletter import DeadLetterStore
+from app.core.kernel.capabilities import capability_map
+from app.core.meta.cache import policy_cache, policy_cache_listener
+from app.core.meta.compiled import compiler_stats
+from app.core.meta.engine import policy_engine
+from app.core.meta.profiler import rule_profiler
+from app.core.meta.features.states.logic.registry import state_registry
 from app.core.context import GlobalContext  # ⚡ NEW: Context Accessor
 
 from app.domains.system.logic.state import SystemState
@@ -182,3 +191,81 @@ async def update_config(
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+
+# --- OUTBOX DEAD LETTERS ---
+
+@router.get("/outbox/dead-letters", response_model=Dict[str, Any])
+async def list_dead_letters(
+    consumer: Optional[str] = Query(None),
+    include_replayed: bool = Query(False),
+    limit: int = Query(100, le=1000),
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    letters = await DeadLetterStore.fetch(db, consumer=consumer, include_replayed=include_replayed, limit=limit)
+    return {
+        "pending": await DeadLetterStore.count_pending(db, consumer=consumer),
+        "items": [letter.to_dict() for letter in letters]
+    }
+
+@router.post("/outbox/dead-letters/replay", response_model=Dict[str, Any])
+async def replay_dead_letters(
+    payload: Dict[str, Any] = Body(default={}),
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Queues dead letters for replay into the outbox at a controlled rate.
+    The rate-limited replay runs in the background; the response lists the queued letters.
+    Payload: { ids?: int[], consumer?: str, limit?: int (max 10000), rate?: float (events/s) }
+    """
+    try:
+        limit = min(int(payload.get("limit", 1000)), 10000)
+        rate = float(payload["rate"]) if payload.get("rate") is not None else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'limit' and 'rate' must be numbers")
+    if limit <= 0:
+        raise HTTPException(status_code=400, detail="'limit' must be positive")
+    if rate is not None and rate <= 0:
+        raise HTTPException(status_code=400, detail="'rate' must be positive")
+
+    ids = await DeadLetterStore.pending_ids(
+        db,
+        ids=payload.get("ids"),
+        consumer=payload.get("consumer"),
+        limit=limit
+    )
+    if ids:
+        DeadLetterStore.schedule_replay(ids, rate=rate)
+    return {"queued": len(ids), "ids": ids, "success": True}
+
+# --- GOVERNANCE CACHE ---
+
+@router.get("/cache/policies", response_model=Dict[str, Any])
+async def get_policy_cache_stats() -> Any:
+    """Hit/miss counters of the compiled policy-binding cache of THIS worker process."""
+    return {**policy_cache.stats(), "listening": policy_cache_listener.is_listening, "compiler": compiler_stats(), "selection": policy_engine.stats()}
+
+@router.get("/cache/state-machines", response_model=Dict[str, Any])
+async def get_state_registry_stats() -> Any:
+    """Hit/miss counters of the compiled state machine registry of THIS worker process."""
+    return {**state_registry.stats(), "listening": policy_cache_listener.is_listening}
+
+@router.get("/cache/capabilities", response_model=Dict[str, Any])
+async def get_capability_map_stats() -> Any:
+    """Governed/workflow domains and fast-path counters of the Interceptor of THIS worker process."""
+    return capability_map.stats()
+
+# --- POLICY PROFILER ---
+
+@router.get("/policies/hot-rules", response_model=Dict[str, Any])
+async def get_hot_rules(
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("total", pattern="^(total|mean|p99|max|count)$"),
+    policy: Optional[str] = Query(None),
+) -> Any:
+    """Slowest policy rules of THIS worker process (latency histograms since start or last reset)."""
+    return {**rule_profiler.stats(), "sort": sort, "rules": rule_profiler.hot_rules(limit=limit, sort=sort, policy=policy)}
+
+@router.post("/policies/hot-rules/reset", response_model=Dict[str, Any])
+async def reset_hot_rules() -> Any:
+    rule_profiler.reset()
+    return {"success": True}
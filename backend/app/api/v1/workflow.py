@@ -6,6 +6,7 @@
 # @security-level: LEVEL 9 (Dynamic Protected Fields & Preliminary Dry Runs)
 # @invariant: Must evaluate Transition Guards BEFORE returning options AND BEFORE committing transactions.
 # @narrator: Logs API requests, payload applications, and transition outcomes.
+# UPDATED: Machines come compiled from the StateMachineRegistry.
 
 import logging
 from typing import Dict, Any, Optional, List
@@ -13,13 +14,11 @@ from pydantic import BaseModel
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from sqlalchemy.inspection import inspect
 
 from app.core.database.session import get_db
 from app.core.kernel.registry import domain_registry
-from app.core.meta.models import StateDefinition
-from app.core.meta.features.states.logic.machine import StateMachine
+from app.core.meta.features.states.logic.registry import state_registry
 
 # ⚡ THE DECOUPLED ENGINES
 from app.core.kernel.interceptor import LogicInterceptor
@@ -70,19 +69,13 @@ async def _load_machine_and_entity(db: AsyncSession, domain: str, scope: str, id
     if not entity:
         raise HTTPException(status_code=404, detail="Entity not found.")
 
-    # 3. Fetch Definition
-    stmt = select(StateDefinition).where(
-        StateDefinition.entity_key == domain_key,
-        StateDefinition.scope == scope_key,
-        StateDefinition.is_active == True
-    )
-    result = await db.execute(stmt)
-    definition = result.scalars().first()
+    # 3. Fetch Definition (compiled, from the registry)
+    definition = await state_registry.get_machine(db, domain_key, scope_key)
 
     if not definition:
         raise HTTPException(status_code=400, detail=f"No active workflow found for {domain_key}:{scope_key}.")
 
-    return entity, StateMachine(definition.transitions), domain_ctx
+    return entity, definition.machine, domain_ctx
 
 
 # --- ENDPOINTS ---
@@ -104,7 +97,7 @@ async def get_transition_options(
     if not current_state:
         return []
 
-    possible_moves = machine._transition_map.get(current_state, {})
+    possible_moves = machine.transitions_from(current_state)
     options = []
 
     # Prepare Context Envelope for Governance Check
@@ -179,8 +172,7 @@ async def execute_transition(
     entity, machine, domain_ctx = await _load_machine_and_entity(db, domain, scope, id)
     
     current_state = getattr(entity, "status", None)
-    state_transitions = machine._transition_map.get(current_state, {})
-    transition_config = state_transitions.get(body.event)
+    transition_config = machine.get_event_config(current_state, body.event)
 
     if not transition_config:
         raise HTTPException(status_code=400, detail=f"Event '{body.event}' not valid from '{current_state}'.")
@@ -4,8 +4,10 @@
 # @description: Configures the SQLAlchemy Async Engine and Session Factory.
 # This is the "Heart" that pumps data to the API.
 # UPDATED: Logging disabled (echo=False) for performance.
+# UPDATED: KernelSession runs async pre-flush hooks (the Interceptor's validate stage) on the
+#          caller's event loop before every flush/commit.
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, List, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
@@ -17,7 +19,35 @@ connect_args = {}
 if "sqlite" in settings.DATABASE_URL:
     connect_args["check_same_thread"] = False
 
-# 2. Create the Async Engine (The Connection Pool)
+# 2. Async Pre-Flush Stage
+# Filled by LogicInterceptor.register(). Kept here (not imported) so this module stays dependency-free.
+pre_flush_hooks: List[Callable[[AsyncSession], Awaitable[int]]] = []
+
+class KernelSession(AsyncSession):
+    """
+    AsyncSession that awaits 'pre_flush_hooks' before flush() and commit().
+    The hooks run on the caller's event loop with this session's connection, so the sync
+    'before_flush' has nothing left to do and never blocks the loop on the AsyncBridge.
+    """
+
+    async def run_pre_flush_hooks(self):
+        if not pre_flush_hooks:
+            return
+        sync_session = self.sync_session
+        if not sync_session.new and not sync_session.dirty:
+            return
+        for hook in pre_flush_hooks:
+            await hook(self)
+
+    async def flush(self, objects: Optional[Sequence] = None) -> None:
+        await self.run_pre_flush_hooks()
+        await super().flush(objects)
+
+    async def commit(self) -> None:
+        await self.run_pre_flush_hooks()
+        await super().commit()
+
+# 3. Create the Async Engine (The Connection Pool)
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,                # ⚡ PERFORMANCE: Logging disabled based on Directive P2-S3
@@ -25,16 +55,16 @@ engine = create_async_engine(
     connect_args=connect_args,
 )
 
-# 3. Create the Session Factory
+# 4. Create the Session Factory
 # This generates short-lived "sessions" for each API request.
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
-    class_=AsyncSession,
+    class_=KernelSession,
     autoflush=False,
     expire_on_commit=False,
 )
 
-# 4. Dependency Injection (The "Needle")
+# 5. Dependency Injection (The "Needle")
 # Endpoints use this to get a safe, isolated database session.
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,110 @@
+# FILEPATH: backend/app/core/database/sidecar.py
+# @file: Sidecar Database Pool
+# @author: The Engineer
+# @description: Process-wide connection pool for the lookups the Interceptor runs on the
+#              AsyncBridge sidecar loops (governance bindings, state machines, context).
+#              Sized separately from the request pool (SIDECAR_DB_*), so interceptor reads
+#              never starve API requests and never pay a TCP/auth handshake per object.
+# UPDATED: session(shared=True) keeps a pool for long-lived loops the bridge does not own (the API
+#          loop's committed reads for the shared caches); release it with dispose() on that loop.
+
+import asyncio
+import atexit
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database.session import connect_args
+from app.core.utilities.async_bridge import async_bridge
+
+logger = logging.getLogger("core.database.sidecar")
+
+class SidecarDatabase:
+    """
+    One engine per event loop.
+    Async drivers bind connections to the loop that opened them, and the AsyncBridge runs a
+    small pool of persistent loops, so each sidecar loop lazily gets its own engine and keeps it.
+    Short-lived loops (nested bridge calls) get a throwaway engine, disposed after the session.
+    """
+
+    def __init__(self):
+        self._engines: Dict[asyncio.AbstractEventLoop, Tuple[AsyncEngine, async_sessionmaker]] = {}
+
+    @staticmethod
+    def _create_engine() -> AsyncEngine:
+        pool_args = {}
+        if "sqlite" not in settings.DATABASE_URL:
+            pool_args = {
+                "pool_size": settings.SIDECAR_DB_POOL_SIZE,
+                "max_overflow": settings.SIDECAR_DB_MAX_OVERFLOW,
+                "pool_recycle": settings.SIDECAR_DB_POOL_RECYCLE,
+            }
+        return create_async_engine(
+            settings.DATABASE_URL,
+            echo=False,
+            pool_pre_ping=True,
+            connect_args=connect_args,
+            **pool_args
+        )
+
+    def _factory(self, loop: asyncio.AbstractEventLoop) -> async_sessionmaker:
+        entry = self._engines.get(loop)
+        if entry is None:
+            engine = self._create_engine()
+            factory = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            entry = (engine, factory)
+            self._engines[loop] = entry
+            logger.info(f"🔌 [Sidecar DB] Pool opened for loop {id(loop):#x} (size {settings.SIDECAR_DB_POOL_SIZE}).")
+        return entry[1]
+
+    @asynccontextmanager
+    async def session(self, shared: bool = False) -> AsyncIterator[AsyncSession]:
+        """
+        Read session on the pool of the current loop.
+        'shared': pool it even if the bridge does not own the loop (the loop must be long-lived).
+        """
+        loop = asyncio.get_running_loop()
+        if shared or async_bridge.owns_loop(loop):
+            async with self._factory(loop)() as db:
+                yield db
+            return
+
+        engine = self._create_engine()
+        try:
+            async with AsyncSession(engine, autoflush=False, expire_on_commit=False) as db:
+                yield db
+        finally:
+            await engine.dispose()
+
+    async def dispose(self):
+        """Closes the pool of the current loop."""
+        entry = self._engines.pop(asyncio.get_running_loop(), None)
+        if entry:
+            await entry[0].dispose()
+
+    def dispose_all(self, timeout: float = 5.0):
+        """
+        Closes every pool on its own loop (shutdown hook; call from outside the sidecar loops).
+        The pool of the calling loop cannot be awaited here: await dispose() on it first.
+        """
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, (engine, _) in list(self._engines.items()):
+            if loop is current:
+                continue
+            if loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(timeout=timeout)
+                except Exception as e:
+                    logger.warning(f"⚠️ [Sidecar DB] Dispose failed: {e}")
+        self._engines.clear()
+
+# Global Instance
+sidecar_pool = SidecarDatabase()
+# Registered after the bridge: atexit runs it first, while the sidecar loops are still up.
+atexit.register(sidecar_pool.dispose_all)
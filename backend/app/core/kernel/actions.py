@@ -4,6 +4,7 @@
 # @description Defines the output structure of the Logic Engine.
 #              This decouples "Calculation" from "Enforcement".
 #              UPDATED: Added 'TRIGGER_EVENT' and 'TRANSITION' for Async Event Loop.
+#              UPDATED: Optional 'trace' (PolicyEngine explain mode).
 
 from enum import Enum
 from dataclasses import dataclass, field
@@ -42,6 +43,9 @@ class LogicResult:
     # Structure: [{"type": "TRIGGER_EVENT", "value": {...}}, {"type": "TRANSITION", "value": "APPROVED"}]
     side_effects: List[Dict[str, Any]] = field(default_factory=list)
 
+    # Explain mode only: per-policy / per-rule breakdown (see PolicyEngine.evaluate(explain=True))
+    trace: Optional[Dict[str, Any]] = None
+
     def merge(self, other: 'LogicResult'):
         """
         Helper to combine results from multiple rule checks.
@@ -0,0 +1,431 @@
+# FILEPATH: backend/app/core/kernel/bus.py
+# @file: Event Bus Transport (Kafka / In-Memory)
+# @author: The Engineer
+# @description: Transport selection for the Nervous System.
+#              EVENT_BUS_TRANSPORT = "kafka"  -> aiokafka (production).
+#              EVENT_BUS_TRANSPORT = "memory" -> in-process asyncio broker with the same
+#              producer/consumer interface (single-node deployments, laptop benchmarks, tests).
+#              The memory broker models partitions, per-partition ordering, offsets and
+#              consumer-group commits. It lives in the current process only.
+# UPDATED: Group partitions are assigned per topic over that topic's subscribers.
+# UPDATED: The data-ready event is created per running loop (the broker outlives asyncio.run calls).
+
+import asyncio
+import logging
+import time
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger("kernel.bus")
+
+# Same shape as aiokafka.structs.TopicPartition / RecordMetadata
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+RecordMetadata = namedtuple("RecordMetadata", ["topic", "partition", "topic_partition", "offset", "timestamp", "timestamp_type", "log_start_offset"])
+
+@dataclass
+class ConsumerRecord:
+    """Same attributes as aiokafka.structs.ConsumerRecord."""
+    topic: str
+    partition: int
+    offset: int
+    timestamp: int
+    timestamp_type: int
+    key: Any
+    value: Any
+    checksum: Optional[int] = None
+    serialized_key_size: int = -1
+    serialized_value_size: int = -1
+    headers: Sequence[Tuple[str, bytes]] = field(default_factory=tuple)
+
+class MemoryBroker:
+    """
+    The In-Process Broker.
+    Topics are created on first use with 'partitions' partitions (append-only lists).
+    Keyed records go to crc32(key) % partitions (stable, ordered per key);
+    keyless records are spread round robin.
+    Consumer groups: committed offsets per partition; each topic's partitions are split evenly
+    between the members subscribed to it.
+    The broker is a module singleton, so it never holds loop-bound state across event loops:
+    the data-ready event is (re)created for the loop that is running.
+    """
+
+    def __init__(self, partitions: int = 12):
+        self.default_partitions = partitions
+        self._topics: Dict[str, List[List[ConsumerRecord]]] = {}
+        self._round_robin: Dict[str, int] = {}
+        self._committed: Dict[str, Dict[TopicPartition, int]] = {}
+        self._members: Dict[str, List["MemoryConsumer"]] = {}
+        self._new_data: Optional[asyncio.Event] = None
+        self._new_data_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.appended = 0
+
+    # --- TOPICS ---
+
+    def create_topic(self, topic: str, partitions: Optional[int] = None):
+        if topic not in self._topics:
+            self._topics[topic] = [[] for _ in range(partitions or self.default_partitions)]
+            self._round_robin[topic] = 0
+
+    def partitions_for(self, topic: str) -> List[int]:
+        self.create_topic(topic)
+        return list(range(len(self._topics[topic])))
+
+    def end_offset(self, tp: TopicPartition) -> int:
+        self.create_topic(tp.topic)
+        return len(self._topics[tp.topic][tp.partition])
+
+    # --- PRODUCE ---
+
+    def append(
+        self,
+        topic: str,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+        headers: Optional[Sequence[Tuple[str, bytes]]] = None
+    ) -> RecordMetadata:
+        self.create_topic(topic)
+        log = self._topics[topic]
+
+        if partition is None:
+            if key is not None:
+                partition = zlib.crc32(key) % len(log)
+            else:
+                partition = self._round_robin[topic] % len(log)
+                self._round_robin[topic] += 1
+
+        timestamp = timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+        records = log[partition]
+        offset = len(records)
+        records.append(ConsumerRecord(
+            topic=topic,
+            partition=partition,
+            offset=offset,
+            timestamp=timestamp,
+            timestamp_type=0,
+            key=key,
+            value=value,
+            serialized_key_size=len(key) if key is not None else -1,
+            serialized_value_size=len(value) if value is not None else -1,
+            headers=tuple(headers or ())
+        ))
+
+        self.appended += 1
+        try:
+            self._data_event().set()
+        except RuntimeError:
+            pass  # No running loop: nobody can be waiting.
+        tp = TopicPartition(topic, partition)
+        return RecordMetadata(topic, partition, tp, offset, timestamp, 0, 0)
+
+    def read(self, tp: TopicPartition, offset: int, limit: int) -> List[ConsumerRecord]:
+        return self._topics[tp.topic][tp.partition][offset:offset + limit]
+
+    def _data_event(self) -> asyncio.Event:
+        """The data-ready event of the running loop (raises RuntimeError outside a loop)."""
+        loop = asyncio.get_running_loop()
+        if self._new_data is None or self._new_data_loop is not loop:
+            self._new_data, self._new_data_loop = asyncio.Event(), loop
+        return self._new_data
+
+    async def wait_for_data(self, marker: int, timeout: float):
+        """Blocks until a record is appended after 'marker' (a previous 'appended' value), or timeout."""
+        if self.appended != marker:
+            return
+        new_data = self._data_event()
+        new_data.clear()
+        try:
+            await asyncio.wait_for(new_data.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # --- CONSUMER GROUPS ---
+
+    def join(self, group_id: str, member: "MemoryConsumer"):
+        self._members.setdefault(group_id, []).append(member)
+        self._rebalance(group_id)
+
+    def leave(self, group_id: str, member: "MemoryConsumer"):
+        members = self._members.get(group_id, [])
+        if member in members:
+            members.remove(member)
+        self._rebalance(group_id)
+
+    def _rebalance(self, group_id: str):
+        members = self._members.get(group_id, [])
+        if not members:
+            return
+        # Round robin per topic over that topic's subscribers only, so no partition is left
+        # unassigned when members subscribe to different topic sets. The turn carries over
+        # between topics to spread single-partition topics across members.
+        assignments: Dict["MemoryConsumer", List[TopicPartition]] = {member: [] for member in members}
+        turn = 0
+        for topic in sorted({topic for member in members for topic in member.topics}):
+            subscribers = [member for member in members if topic in member.topics]
+            for p in self.partitions_for(topic):
+                assignments[subscribers[turn % len(subscribers)]].append(TopicPartition(topic, p))
+                turn += 1
+        for member in members:
+            member._assign(assignments[member])
+
+    def commit(self, group_id: str, offsets: Dict[TopicPartition, int]):
+        self._committed.setdefault(group_id, {}).update(offsets)
+
+    def committed(self, group_id: str, tp: TopicPartition) -> Optional[int]:
+        return self._committed.get(group_id, {}).get(tp)
+
+    def reset(self):
+        """Drops all topics, offsets and members."""
+        self._topics.clear()
+        self._round_robin.clear()
+        self._committed.clear()
+        self._members.clear()
+
+class MemoryProducer:
+    """
+    Drop-in for AIOKafkaProducer on the memory broker.
+    send() appends immediately and returns an already-resolved delivery future.
+    Unsupported aiokafka options (linger_ms, compression_type...) are accepted and ignored.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers: Any = None,
+        value_serializer: Optional[Callable] = None,
+        key_serializer: Optional[Callable] = None,
+        broker: Optional[MemoryBroker] = None,
+        **kwargs
+    ):
+        self.broker = broker or memory_broker
+        self._value_serializer = value_serializer
+        self._key_serializer = key_serializer
+        self._started = False
+
+    async def start(self):
+        self._started = True
+
+    async def stop(self):
+        self._started = False
+
+    async def flush(self):
+        return None
+
+    async def partitions_for(self, topic: str):
+        return set(self.broker.partitions_for(topic))
+
+    async def send(self, topic, value=None, key=None, partition=None, timestamp_ms=None, headers=None):
+        if not self._started:
+            raise RuntimeError("MemoryProducer is not started")
+
+        key_bytes = self._key_serializer(key) if (self._key_serializer and key is not None) else key
+        value_bytes = self._value_serializer(value) if (self._value_serializer and value is not None) else value
+        metadata = self.broker.append(topic, key_bytes, value_bytes, partition, timestamp_ms, headers)
+
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result(metadata)
+        return fut
+
+    async def send_and_wait(self, topic, value=None, key=None, partition=None, timestamp_ms=None, headers=None):
+        fut = await self.send(topic, value=value, key=key, partition=partition, timestamp_ms=timestamp_ms, headers=headers)
+        return await fut
+
+class MemoryConsumer:
+    """
+    Drop-in for AIOKafkaConsumer on the memory broker.
+    Supports: start/stop, getone, getmany, async iteration, commit (auto or manual),
+    committed, position, seek, seek_to_beginning/end, assignment, pause/resume/paused.
+    """
+
+    def __init__(
+        self,
+        *topics: str,
+        bootstrap_servers: Any = None,
+        group_id: Optional[str] = None,
+        value_deserializer: Optional[Callable] = None,
+        key_deserializer: Optional[Callable] = None,
+        auto_offset_reset: str = "latest",
+        enable_auto_commit: bool = True,
+        max_poll_records: Optional[int] = None,
+        broker: Optional[MemoryBroker] = None,
+        **kwargs
+    ):
+        self.broker = broker or memory_broker
+        self.topics = set(topics)
+        self.group_id = group_id
+        self._value_deserializer = value_deserializer
+        self._key_deserializer = key_deserializer
+        self._auto_offset_reset = auto_offset_reset
+        self._enable_auto_commit = enable_auto_commit
+        self._max_poll_records = max_poll_records or 500
+        self._assignment: List[TopicPartition] = []
+        self._positions: Dict[TopicPartition, int] = {}
+        self._paused: set = set()
+        self._turn = 0
+        self._started = False
+
+    # --- LIFECYCLE ---
+
+    async def start(self):
+        self._started = True
+        if self.group_id:
+            self.broker.join(self.group_id, self)
+        else:
+            self._assign([TopicPartition(t, p) for t in sorted(self.topics) for p in self.broker.partitions_for(t)])
+
+    async def stop(self):
+        if self._started and self.group_id:
+            if self._enable_auto_commit:
+                await self.commit()
+            self.broker.leave(self.group_id, self)
+        self._started = False
+
+    def _assign(self, partitions: List[TopicPartition]):
+        self._assignment = list(partitions)
+        for tp in self._assignment:
+            if tp not in self._positions:
+                self._positions[tp] = self._initial_position(tp)
+        self._positions = {tp: pos for tp, pos in self._positions.items() if tp in self._assignment}
+        # Like aiokafka, pausing does not survive a reassignment.
+        self._paused &= set(self._assignment)
+
+    def _initial_position(self, tp: TopicPartition) -> int:
+        if self.group_id:
+            committed = self.broker.committed(self.group_id, tp)
+            if committed is not None:
+                return committed
+        return 0 if self._auto_offset_reset == "earliest" else self.broker.end_offset(tp)
+
+    def assignment(self):
+        return set(self._assignment)
+
+    # --- FETCH ---
+
+    def _deserialize(self, record: ConsumerRecord) -> ConsumerRecord:
+        key = self._key_deserializer(record.key) if (self._key_deserializer and record.key is not None) else record.key
+        value = self._value_deserializer(record.value) if (self._value_deserializer and record.value is not None) else record.value
+        return ConsumerRecord(
+            record.topic, record.partition, record.offset, record.timestamp, record.timestamp_type,
+            key, value, record.checksum, record.serialized_key_size, record.serialized_value_size, record.headers
+        )
+
+    def _fetch(self, partitions: Sequence[TopicPartition], max_records: int) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        result = {}
+        budget = max_records
+        # Rotate the first partition so a busy partition cannot starve the others.
+        ordered = list(partitions)
+        if ordered:
+            turn = self._turn % len(ordered)
+            ordered = ordered[turn:] + ordered[:turn]
+            self._turn += 1
+
+        for tp in ordered:
+            if budget <= 0:
+                break
+            records = self.broker.read(tp, self._positions[tp], budget)
+            if records:
+                result[tp] = [self._deserialize(r) for r in records]
+                self._positions[tp] += len(records)
+                budget -= len(records)
+        return result
+
+    async def getmany(self, *partitions: TopicPartition, timeout_ms: int = 0, max_records: Optional[int] = None) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        max_records = max_records or self._max_poll_records
+        deadline = time.monotonic() + timeout_ms / 1000.0
+
+        while True:
+            # Re-evaluated every round: a rebalance may change the assignment while we wait.
+            current = [tp for tp in (partitions or self._assignment) if tp in self._positions and tp not in self._paused]
+            marker = self.broker.appended
+            result = self._fetch(current, max_records)
+            if result:
+                if self._enable_auto_commit and self.group_id:  # Like aiokafka: no group, no commits.
+                    await self.commit()
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {}
+            await self.broker.wait_for_data(marker, remaining)
+
+    async def getone(self, *partitions: TopicPartition) -> ConsumerRecord:
+        while True:
+            result = await self.getmany(*partitions, timeout_ms=1000, max_records=1)
+            for records in result.values():
+                return records[0]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ConsumerRecord:
+        if not self._started:
+            raise StopAsyncIteration
+        return await self.getone()
+
+    # --- FLOW CONTROL ---
+
+    def pause(self, *partitions: TopicPartition):
+        """getmany() returns nothing from these partitions until resume()."""
+        for tp in partitions:
+            if tp not in self._positions:
+                raise ValueError(f"{tp} is not assigned")
+            self._paused.add(tp)
+
+    def resume(self, *partitions: TopicPartition):
+        for tp in partitions:
+            self._paused.discard(tp)
+
+    def paused(self):
+        return set(self._paused)
+
+    # --- OFFSETS ---
+
+    async def commit(self, offsets: Optional[Dict[TopicPartition, int]] = None):
+        if not self.group_id:
+            raise ValueError("commit() requires a group_id")
+        offsets = offsets if offsets is not None else dict(self._positions)
+        # aiokafka also accepts {tp: OffsetAndMetadata}
+        self.broker.commit(self.group_id, {tp: getattr(o, "offset", o) for tp, o in offsets.items()})
+
+    async def committed(self, tp: TopicPartition) -> Optional[int]:
+        return self.broker.committed(self.group_id, tp) if self.group_id else None
+
+    async def position(self, tp: TopicPartition) -> int:
+        return self._positions[tp]
+
+    def seek(self, tp: TopicPartition, offset: int):
+        self._positions[tp] = offset
+
+    async def seek_to_beginning(self, *partitions: TopicPartition):
+        for tp in partitions or self._assignment:
+            self._positions[tp] = 0
+
+    async def seek_to_end(self, *partitions: TopicPartition):
+        for tp in partitions or self._assignment:
+            self._positions[tp] = self.broker.end_offset(tp)
+
+    async def end_offsets(self, partitions: Sequence[TopicPartition]) -> Dict[TopicPartition, int]:
+        return {tp: self.broker.end_offset(tp) for tp in partitions}
+
+# Global Instance (one broker per process)
+memory_broker = MemoryBroker(partitions=settings.MEMORY_BUS_PARTITIONS)
+
+def is_memory_transport() -> bool:
+    return settings.EVENT_BUS_TRANSPORT.lower() == "memory"
+
+def create_producer(**kwargs):
+    """AIOKafkaProducer or MemoryProducer, per EVENT_BUS_TRANSPORT."""
+    if is_memory_transport():
+        return MemoryProducer(**kwargs)
+    from aiokafka import AIOKafkaProducer
+    return AIOKafkaProducer(**kwargs)
+
+def create_consumer(*topics: str, **kwargs):
+    """AIOKafkaConsumer or MemoryConsumer, per EVENT_BUS_TRANSPORT."""
+    if is_memory_transport():
+        return MemoryConsumer(*topics, **kwargs)
+    from aiokafka import AIOKafkaConsumer
+    return AIOKafkaConsumer(*topics, **kwargs)
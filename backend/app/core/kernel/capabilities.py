@@ -0,0 +1,155 @@
+# FILEPATH: backend/app/core/kernel/capabilities.py
+# @file: Model Capability Map (Interceptor Fast Path)
+# @author: The Engineer
+# @description: Precomputed answer to "is there anything to enforce for this model?".
+#              - Static (per model class, computed once): domain key, CDC on/off ('__cdc__ = False' opts out).
+#              - Dynamic (per domain): has_policies / has_state_machines, loaded with two DISTINCT
+#                queries and marked stale whenever the policy cache or the state registry is invalidated.
+#              Models with nothing to enforce skip serialization, context and engine lookups entirely:
+#              the Interceptor writes their CDC event directly, or does nothing.
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.meta.cache import policy_cache
+from app.core.meta.models import PolicyBinding, PolicyDefinition, StateDefinition
+from app.core.meta.features.states.logic.registry import state_registry
+
+logger = logging.getLogger("kernel.capabilities")
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    domain_key: str
+    has_policies: bool
+    has_state_machines: bool
+    cdc_enabled: bool
+
+    @property
+    def enforces(self) -> bool:
+        """True if Governance or Workflow have something to check for this model."""
+        return self.has_policies or self.has_state_machines
+
+class CapabilityMap:
+    """
+    Usage (Interceptor):
+        if capability_map.is_stale:
+            await capability_map.refresh(db)
+        caps = capability_map.for_object(obj)
+
+    While the map is not loaded (or its last refresh failed) every domain reports
+    has_policies/has_state_machines = True, i.e. the full (fail-open) path is taken.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.POLICY_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._policy_domains: Optional[Set[str]] = None
+        self._state_domains: Optional[Set[str]] = None
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Model class -> (domain_key, cdc_enabled)
+        self._models: Dict[type, Tuple[str, bool]] = {}
+        # Counters
+        self.fast_path = 0
+        self.enforced = 0
+        self.refreshes = 0
+
+    # --- STATIC (per model class) ---
+
+    @staticmethod
+    def domain_key_of(model: type) -> str:
+        model_name = model.__name__.upper()
+        # We assume the domain matches the class name, unless overridden by the model itself.
+        domain_key = getattr(model, '__domain__', model_name)
+        # Fallback for internal Kernel structures (Optional but safe)
+        if model_name == "SYSTEMCONFIG": domain_key = "GLOBAL"
+        elif model_name == "CIRCUITBREAKER": domain_key = "SYS"
+        return domain_key
+
+    def _static(self, model: type) -> Tuple[str, bool]:
+        entry = self._models.get(model)
+        if entry is None:
+            entry = (self.domain_key_of(model), bool(getattr(model, '__cdc__', True)))
+            self._models[model] = entry
+        return entry
+
+    # --- DYNAMIC (per domain) ---
+
+    @property
+    def is_stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or (bool(self.ttl) and time.monotonic() - loaded_at >= self.ttl)
+
+    def mark_stale(self, domain: str = "ALL"):
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    async def refresh(self, db: AsyncSession):
+        """⚡ DB IO: Domains with active policy bindings / active state machines (two DISTINCT queries)."""
+        generation = self._generation
+        try:
+            policy_stmt = select(PolicyBinding.target_domain).join(
+                PolicyDefinition, PolicyDefinition.id == PolicyBinding.policy_id
+            ).where(
+                PolicyBinding.is_active == True,
+                PolicyDefinition.is_active == True
+            ).distinct()
+            state_stmt = select(StateDefinition.entity_key).where(StateDefinition.is_active == True).distinct()
+
+            policy_domains = set((await db.execute(policy_stmt)).scalars().all())
+            state_domains = set((await db.execute(state_stmt)).scalars().all())
+        except Exception as e:
+            logger.warning(f"⚠️ [Capabilities] Refresh failed ({e}). Full path for every domain.")
+            with self._lock:
+                self._policy_domains = self._state_domains = None
+                # Retry on the next flush after a short pause, not on every object
+                self._loaded_at = time.monotonic() - max(self.ttl - 5.0, 0) if self.ttl else None
+            return
+
+        with self._lock:
+            # An invalidation during the load wins: stay stale, reload next time.
+            if generation != self._generation:
+                return
+            self._policy_domains = policy_domains
+            self._state_domains = state_domains
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+        logger.debug(f"🗺️ [Capabilities] {len(policy_domains)} governed / {len(state_domains)} workflow domains.")
+
+    def for_model(self, model: type) -> ModelCapabilities:
+        domain_key, cdc_enabled = self._static(model)
+        policy_domains, state_domains = self._policy_domains, self._state_domains
+        return ModelCapabilities(
+            domain_key=domain_key,
+            has_policies=policy_domains is None or domain_key in policy_domains,
+            has_state_machines=state_domains is None or domain_key in state_domains,
+            cdc_enabled=cdc_enabled
+        )
+
+    def for_object(self, obj: Any) -> ModelCapabilities:
+        return self.for_model(type(obj))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._policy_domains is not None,
+            "stale": self.is_stale,
+            "governed_domains": sorted(self._policy_domains or []),
+            "workflow_domains": sorted(self._state_domains or []),
+            "models": {model.__name__: {"domain": key, "cdc": cdc} for model, (key, cdc) in self._models.items()},
+            "fast_path_objects": self.fast_path,
+            "enforced_objects": self.enforced,
+            "refreshes": self.refreshes
+        }
+
+# Global Instance (kept in sync by the caches it derives from)
+capability_map = CapabilityMap()
+policy_cache.subscribe(capability_map.mark_stale)
+state_registry.subscribe(capability_map.mark_stale)
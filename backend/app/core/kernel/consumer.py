@@ -0,0 +1,320 @@
+# FILEPATH: backend/app/core/kernel/consumer.py
+# @file: Stream Consumer Runtime
+# @author: The Engineer
+# @description: Runtime for downstream services reading the event stream (Kafka or the memory bus).
+#              1. Batch fetch with getmany().
+#              2. Partitions of a batch run concurrently (bounded); records of one partition run in order.
+#              3. Offsets are committed manually, only over records that succeeded.
+#              4. An idempotency store keyed by the outbox 'id' skips redelivered messages.
+#              Handlers use the same EventHandlerRegistry as the BackgroundWorker.
+# UPDATED: Filters on Kafka headers first; bodies are only decoded for events that have a handler.
+# UPDATED: A partition in backoff is paused (not re-fetched every round) and resumed when due.
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database.session import AsyncSessionLocal
+from app.core.kernel.bus import create_consumer
+from app.core.kernel.handlers import EventHandlerRegistry
+from app.core.kernel.models import ConsumerInbox
+from app.core.kernel.outbox import retry_delay
+from app.core.kernel.routing import topic_router, read_headers, HEADER_EVENT_NAME, HEADER_TRACE_ID
+
+logger = logging.getLogger("kernel.consumer")
+
+@dataclass
+class StreamEvent:
+    """
+    One decoded stream message. Mirrors the SystemOutbox attributes used by handlers
+    (id, event_name, partition_key, payload, trace_id, entity_id) plus its stream position.
+    """
+    id: Optional[int]
+    event_name: str
+    partition_key: Optional[str]
+    payload: Any
+    trace_id: Optional[str] = None
+    entity_id: Optional[int] = None
+    seq: Optional[int] = None
+    timestamp: Optional[str] = None
+    topic: Optional[str] = None
+    partition: Optional[int] = None
+    offset: Optional[int] = None
+    headers: Sequence[Tuple[str, bytes]] = field(default_factory=tuple)
+
+    @classmethod
+    def from_record(cls, record, headers: Optional[Dict[str, str]] = None) -> "StreamEvent":
+        """Decodes a record (JSON body, bytes or already deserialized)."""
+        headers = read_headers(record.headers) if headers is None else headers
+        value = record.value
+        if isinstance(value, (bytes, bytearray)):
+            value = json.loads(value.decode("utf-8"))
+        value = value if isinstance(value, dict) else {}
+        return cls(
+            id=value.get("id"),
+            event_name=value.get("event") or value.get("event_name") or headers.get(HEADER_EVENT_NAME) or "UNKNOWN",
+            partition_key=value.get("key"),
+            payload=value.get("payload"),
+            trace_id=value.get("trace_id") or headers.get(HEADER_TRACE_ID),
+            entity_id=value.get("entity_id"),
+            seq=value.get("seq"),
+            timestamp=value.get("timestamp"),
+            topic=record.topic,
+            partition=record.partition,
+            offset=record.offset,
+            headers=tuple(record.headers or ())
+        )
+
+    @classmethod
+    def from_headers(cls, record, headers: Dict[str, str]) -> "StreamEvent":
+        """Header-only view (body NOT decoded). Used for events nobody handles."""
+        return cls(
+            id=None,
+            event_name=headers.get(HEADER_EVENT_NAME, "UNKNOWN"),
+            partition_key=record.key.decode("utf-8") if isinstance(record.key, (bytes, bytearray)) else record.key,
+            payload=None,
+            trace_id=headers.get(HEADER_TRACE_ID),
+            topic=record.topic,
+            partition=record.partition,
+            offset=record.offset,
+            headers=tuple(record.headers or ())
+        )
+
+# --- IDEMPOTENCY STORES ---
+
+class MemoryIdempotencyStore:
+    """Bounded LRU of processed ids. Survives rebalances, not restarts."""
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self._ids: "OrderedDict[int, None]" = OrderedDict()
+
+    async def seen(self, consumer: str, ids: Iterable[int]) -> Set[int]:
+        return {i for i in ids if i in self._ids}
+
+    async def mark(self, consumer: str, ids: Iterable[int]):
+        for i in ids:
+            self._ids[i] = None
+            self._ids.move_to_end(i)
+        while len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+
+class DatabaseIdempotencyStore:
+    """'system_consumer_inbox' rows. One SELECT and one INSERT per batch."""
+
+    async def seen(self, consumer: str, ids: Iterable[int]) -> Set[int]:
+        ids = list(ids)
+        if not ids:
+            return set()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ConsumerInbox.event_id).where(ConsumerInbox.consumer == consumer, ConsumerInbox.event_id.in_(ids))
+            )
+            return set(result.scalars().all())
+
+    async def mark(self, consumer: str, ids: Iterable[int]):
+        rows = [{"consumer": consumer, "event_id": i, "processed_at": datetime.utcnow()} for i in ids]
+        if not rows:
+            return
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(ConsumerInbox).values(rows).on_conflict_do_nothing(index_elements=["consumer", "event_id"]))
+            await db.commit()
+
+# --- RUNTIME ---
+
+class StreamConsumer:
+    """
+    Usage:
+        handlers = EventHandlerRegistry()
+
+        @handlers.on("USER:")
+        async def project_user(event: StreamEvent): ...
+
+        await StreamConsumer("billing-projection", handlers).start()
+
+    FAILURES:
+    A failed record stops its partition. Offsets are committed up to the record before it,
+    the partition is rewound to it and paused for a backoff (see outbox.retry_delay), then
+    resumed and retried. After OUTBOX_MAX_ATTEMPTS the record is logged and skipped.
+    """
+
+    def __init__(
+        self,
+        group_id: str,
+        handlers: EventHandlerRegistry,
+        topics: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        idempotency_store=None,
+        auto_offset_reset: str = "earliest"
+    ):
+        self.group_id = group_id
+        self.handlers = handlers
+        self.topics = topics or topic_router.topics()
+        self.batch_size = batch_size or settings.CONSUMER_BATCH_SIZE
+        self.concurrency = concurrency or settings.CONSUMER_CONCURRENCY
+        self.store = idempotency_store or DatabaseIdempotencyStore()
+        self.auto_offset_reset = auto_offset_reset
+        self.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+        self.is_running = True
+        self.consumer = None
+        # Records filtered out on headers (never decoded)
+        self.skipped = 0
+
+        self._slots = asyncio.Semaphore(self.concurrency)
+        # Partition -> (attempts, retry_at) of the record it is stuck on
+        self._retries: Dict[Any, Tuple[int, float]] = {}
+
+    def _build_consumer(self):
+        return create_consumer(
+            *self.topics,
+            bootstrap_servers=getattr(settings, "KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"),
+            group_id=self.group_id,
+            enable_auto_commit=False,
+            auto_offset_reset=self.auto_offset_reset,
+            max_poll_records=self.batch_size
+            # No value_deserializer: bodies are decoded lazily (see 'decode').
+        )
+
+    async def start(self):
+        self.consumer = self._build_consumer()
+        await self.consumer.start()
+        logger.info(f"👂 [Consumer] '{self.group_id}' reading {self.topics} (batch {self.batch_size}, concurrency {self.concurrency}).")
+
+        try:
+            while self.is_running:
+                try:
+                    await self.process_batch()
+                except Exception as e:
+                    logger.error(f"🔥 [Consumer] '{self.group_id}' batch crashed: {e}", exc_info=True)
+                    await asyncio.sleep(5)
+        finally:
+            await self.consumer.stop()
+            logger.info(f"🛑 [Consumer] '{self.group_id}' stopped.")
+
+    async def stop(self):
+        self.is_running = False
+
+    async def process_batch(self) -> int:
+        """Fetches, handles and commits one batch. Returns the number of records handled."""
+        # 1. BACKOFF (partitions waiting for a retry stay paused until their deadline)
+        timeout_ms = self._resume_due()
+        batches = await self.consumer.getmany(timeout_ms=timeout_ms, max_records=self.batch_size)
+        if not batches:
+            return 0
+        ready = {tp: [self.decode(r) for r in records] for tp, records in batches.items()}
+
+        # 2. IDEMPOTENCY (one lookup for the whole batch)
+        ids = [event.id for events in ready.values() for event in events if event.id is not None]
+        done = await self.store.seen(self.group_id, ids)
+
+        # 3. EXECUTE (partitions in parallel, records of a partition in order)
+        outcomes = await asyncio.gather(*(self._run_partition(tp, events, done) for tp, events in ready.items()))
+
+        # 4. RECORD + COMMIT (inbox first: a crash in between only causes skipped redeliveries)
+        handled: List[int] = []
+        offsets = {}
+        for tp, (succeeded_ids, next_offset) in zip(ready.keys(), outcomes):
+            handled.extend(succeeded_ids)
+            if next_offset is not None:
+                offsets[tp] = next_offset
+
+        await self.store.mark(self.group_id, handled)
+        if offsets:
+            await self.consumer.commit(offsets)
+
+        return sum(len(events) for events in ready.values())
+
+    async def _run_partition(self, tp, events: List[StreamEvent], done: Set[int]) -> Tuple[List[int], Optional[int]]:
+        """
+        Returns: (ids handled now, offset to commit). On failure the partition is rewound
+        to the failed record, so the commit stops right before it.
+        """
+        succeeded: List[int] = []
+        next_offset = None
+
+        async with self._slots:
+            for event in events:
+                if event.id is None or event.id not in done:
+                    error = await self.handle_event(event)
+                    if error is not None and not self._give_up(tp, event, error):
+                        self.consumer.seek(tp, event.offset)
+                        self.consumer.pause(tp)
+                        return succeeded, next_offset
+                    if error is None and event.id is not None:
+                        succeeded.append(event.id)
+
+                self._retries.pop(tp, None)
+                next_offset = event.offset + 1
+
+        return succeeded, next_offset
+
+    def _resume_due(self) -> int:
+        """
+        Resumes the paused partitions whose retry is due; forgets the ones no longer assigned.
+        Returns the poll timeout (ms), shortened to wake up for the next due retry.
+        """
+        timeout_ms = settings.CONSUMER_POLL_TIMEOUT_MS
+        if not self._retries:
+            return timeout_ms
+
+        now = asyncio.get_running_loop().time()
+        assigned = self.consumer.assignment()
+        due = []
+        for tp, (attempts, retry_at) in list(self._retries.items()):
+            if tp not in assigned:
+                # Rebalanced away: the new owner starts over from the committed offset.
+                self._retries.pop(tp)
+            elif retry_at <= now:
+                due.append(tp)
+            else:
+                timeout_ms = min(timeout_ms, max(1, int((retry_at - now) * 1000)))
+        if due:
+            self.consumer.resume(*due)
+        return timeout_ms
+
+    def decode(self, record) -> StreamEvent:
+        """
+        Header fast path: if the 'event_name' header has no handler here, the body is never
+        deserialized. Records without headers (older relays) are always decoded.
+        """
+        headers = read_headers(record.headers)
+        event_name = headers.get(HEADER_EVENT_NAME)
+        if event_name is not None and not self.handlers.resolve(event_name):
+            self.skipped += 1
+            return StreamEvent.from_headers(record, headers)
+        return StreamEvent.from_record(record, headers)
+
+    def _give_up(self, tp, event: StreamEvent, error: str) -> bool:
+        """Schedules the next attempt of a failed record. True once attempts are exhausted (skip it)."""
+        attempts = self._retries.get(tp, (0, 0))[0] + 1
+        if attempts >= self.max_attempts:
+            logger.error(f"💀 [Consumer] '{self.group_id}' skipping {event.event_name} (ID: {event.id}, {event.topic}/{event.partition}@{event.offset}) after {attempts} attempts: {error}")
+            self._retries.pop(tp, None)
+            return True
+
+        delay = retry_delay(attempts)
+        self._retries[tp] = (attempts, asyncio.get_running_loop().time() + delay)
+        logger.warning(f"🔁 [Consumer] '{self.group_id}' {event.topic}/{event.partition}@{event.offset} retry {attempts}/{self.max_attempts} in {delay:.1f}s.")
+        return False
+
+    async def handle_event(self, event: StreamEvent) -> Optional[str]:
+        """Runs the registered handlers. Returns None on success, or the error message."""
+        handlers = self.handlers.resolve(event.event_name)
+        if not handlers:
+            return None
+        try:
+            for handler in handlers:
+                await handler(event)
+            return None
+        except Exception as e:
+            logger.error(f"      ❌ [Consumer] Failed: {event.event_name} (ID: {event.id}): {e}")
+            return f"{type(e).__name__}: {e}"
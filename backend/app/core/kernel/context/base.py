@@ -42,6 +42,7 @@ class ContextProvider(ABC):
         EXECUTION: Returns the actual values at runtime.
         Args:
             db: The active AsyncSession.
-            entity: The object being saved (Context Subject).
+            entity: The object being saved (Context Subject), or None when the Interceptor
+                    resolves the context once for a whole flush.
         """
         pass
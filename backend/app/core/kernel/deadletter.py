@@ -0,0 +1,158 @@
+# FILEPATH: backend/app/core/kernel/deadletter.py
+# @file: Dead Letter Store (Outbox Replay)
+# @author: The Engineer
+# @description: Inspection and bulk replay of outbox events that exhausted their retries.
+#              A replay appends a copy of the event to the outbox addressed to the consumer that
+#              failed it ('target_consumer'), so other consumers never see it twice.
+# UPDATED: Replays requested over HTTP run as background tasks with their own session
+#          (schedule_replay), so a slow, rate-limited replay never holds the request open.
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional, Set
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database.session import AsyncSessionLocal
+from app.core.kernel.models import SystemOutbox, OutboxDeadLetter
+
+logger = logging.getLogger("kernel.deadletter")
+
+# Strong references to running background replays (the loop only keeps weak ones).
+_replay_tasks: Set[asyncio.Task] = set()
+
+class DeadLetterStore:
+
+    @staticmethod
+    async def fetch(
+        db: AsyncSession,
+        consumer: Optional[str] = None,
+        include_replayed: bool = False,
+        limit: int = 100
+    ) -> List[OutboxDeadLetter]:
+        stmt = select(OutboxDeadLetter)
+        if consumer:
+            stmt = stmt.where(OutboxDeadLetter.consumer == consumer)
+        if not include_replayed:
+            stmt = stmt.where(OutboxDeadLetter.replayed_at.is_(None))
+        result = await db.execute(stmt.order_by(OutboxDeadLetter.id).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def count_pending(db: AsyncSession, consumer: Optional[str] = None) -> int:
+        stmt = select(func.count(OutboxDeadLetter.id)).where(OutboxDeadLetter.replayed_at.is_(None))
+        if consumer:
+            stmt = stmt.where(OutboxDeadLetter.consumer == consumer)
+        return (await db.execute(stmt)).scalar() or 0
+
+    @staticmethod
+    async def pending_ids(
+        db: AsyncSession,
+        ids: Optional[List[int]] = None,
+        consumer: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[int]:
+        """Ids of the pending dead letters a replay with the same filters would re-drive (oldest first)."""
+        stmt = select(OutboxDeadLetter.id).where(OutboxDeadLetter.replayed_at.is_(None))
+        if ids:
+            stmt = stmt.where(OutboxDeadLetter.id.in_(ids))
+        if consumer:
+            stmt = stmt.where(OutboxDeadLetter.consumer == consumer)
+        result = await db.execute(stmt.order_by(OutboxDeadLetter.id).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def replay(
+        db: AsyncSession,
+        ids: Optional[List[int]] = None,
+        consumer: Optional[str] = None,
+        limit: int = 1000,
+        rate: Optional[float] = None,
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Re-drives pending dead letters (oldest first) at a controlled rate.
+        Each batch is appended to the outbox and marked replayed in ONE transaction,
+        then the loop sleeps so that no more than 'rate' events/s are released.
+        Returns the number of replayed dead letters.
+        """
+        rate = settings.OUTBOX_REPLAY_RATE if rate is None else rate
+        if rate <= 0:
+            raise ValueError(f"Replay rate must be positive, got {rate}")
+        batch_size = max(1, min(batch_size or settings.OUTBOX_REPLAY_BATCH_SIZE, limit))
+        replayed = 0
+        after_id = 0
+
+        while replayed < limit:
+            started = time.monotonic()
+
+            stmt = select(OutboxDeadLetter).where(
+                OutboxDeadLetter.replayed_at.is_(None),
+                OutboxDeadLetter.id > after_id
+            )
+            if ids:
+                stmt = stmt.where(OutboxDeadLetter.id.in_(ids))
+            if consumer:
+                stmt = stmt.where(OutboxDeadLetter.consumer == consumer)
+            stmt = stmt.order_by(OutboxDeadLetter.id).limit(min(batch_size, limit - replayed))
+
+            letters = list((await db.execute(stmt)).scalars().all())
+            if not letters:
+                break
+
+            db.add_all([
+                SystemOutbox(
+                    event_name=letter.event_name,
+                    partition_key=letter.partition_key,
+                    trace_id=letter.trace_id,
+                    payload=letter.payload,
+                    entity_id=letter.entity_id,
+                    target_consumer=letter.consumer
+                )
+                for letter in letters
+            ])
+            await db.execute(
+                update(OutboxDeadLetter)
+                .where(OutboxDeadLetter.id.in_([letter.id for letter in letters]))
+                .values(replayed_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+            replayed += len(letters)
+            after_id = letters[-1].id
+            logger.info(f"♻️ [DeadLetter] Replayed {len(letters)} events ({replayed} total).")
+
+            # ⚡ RATE LIMIT
+            budget = len(letters) / rate
+            elapsed = time.monotonic() - started
+            if replayed < limit and budget > elapsed:
+                await asyncio.sleep(budget - elapsed)
+
+        return replayed
+
+    @staticmethod
+    def schedule_replay(ids: List[int], rate: Optional[float] = None) -> asyncio.Task:
+        """
+        Replays the given dead letters in a background task with its own session.
+        Letters replayed meanwhile by someone else are skipped (replay only takes pending ones).
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Replay rate must be positive, got {rate}")
+
+        async def run():
+            try:
+                async with AsyncSessionLocal() as db:
+                    replayed = await DeadLetterStore.replay(db, ids=ids, limit=len(ids), rate=rate)
+                logger.info(f"✅ [DeadLetter] Background replay finished: {replayed}/{len(ids)} events re-driven.")
+            except Exception as e:
+                logger.error(f"❌ [DeadLetter] Background replay failed: {e}")
+
+        task = asyncio.create_task(run(), name="deadletter-replay")
+        _replay_tasks.add(task)
+        task.add_done_callback(_replay_tasks.discard)
+        return task
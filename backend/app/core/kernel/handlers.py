@@ -0,0 +1,105 @@
+# FILEPATH: backend/app/core/kernel/handlers.py
+# @file: Event Handler Registry (The Switchboard)
+# @author: The Engineer
+# @description: Maps outbox event names to the side-effect handlers executed by the BackgroundWorker.
+#              Domains register handlers for an exact event name ('USER:CREATED') or a
+#              prefix ending in ':' ('WORKFLOW:'). The Worker only dispatches; it knows no domain.
+#              Stream consumers (kernel/consumer.py) use their own registry instances of the same class.
+
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.core.kernel.models import SystemOutbox
+
+logger = logging.getLogger("kernel.handlers")
+
+# Receives a SystemOutbox row (Worker) or a StreamEvent (stream consumers).
+EventHandler = Callable[[Any], Awaitable[None]]
+
+class EventHandlerRegistry:
+    """
+    Central Registry for Worker Side Effects.
+    Singleton pattern used by the Worker to resolve handlers per event.
+
+    MATCHING:
+    - 'USER:CREATED' matches that event name only.
+    - 'USER:'        matches every event name starting with 'USER:'.
+    - '*'            matches every event.
+    All matching handlers run, in registration order. Resolution is cached per event name.
+    """
+    def __init__(self):
+        # Pattern -> Handlers
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        # Event Name -> Resolved Handlers (cleared on every registration)
+        self._resolved: Dict[str, List[EventHandler]] = {}
+
+    def register(self, pattern: str, handler: EventHandler):
+        """
+        Registers an async handler for an event name or prefix.
+
+        Args:
+            pattern (str): Exact event name, prefix ending in ':', or '*'.
+            handler (callable): 'async def handler(event: SystemOutbox) -> None'. Raise to signal failure.
+        """
+        if not inspect.iscoroutinefunction(handler):
+            raise TypeError(f"Event handler '{getattr(handler, '__name__', handler)}' must be 'async def'.")
+
+        self._handlers.setdefault(pattern, []).append(handler)
+        self._resolved.clear()
+        logger.debug(f"✅ [Handlers] Registered '{handler.__name__}' for '{pattern}'")
+
+    def on(self, pattern: str):
+        """
+        Decorator form of 'register'.
+
+        Usage:
+            @event_handlers.on("USER:")
+            async def audit_user(event): ...
+        """
+        def decorator(handler: EventHandler) -> EventHandler:
+            self.register(pattern, handler)
+            return handler
+        return decorator
+
+    def resolve(self, event_name: str) -> List[EventHandler]:
+        """Returns the handlers for an event name (empty list if nobody listens)."""
+        handlers = self._resolved.get(event_name)
+        if handlers is None:
+            handlers = []
+            for pattern, registered in self._handlers.items():
+                if self._matches(pattern, event_name):
+                    handlers.extend(registered)
+            self._resolved[event_name] = handlers
+        return handlers
+
+    @staticmethod
+    def _matches(pattern: str, event_name: str) -> bool:
+        if pattern == "*":
+            return True
+        if pattern.endswith(":"):
+            return event_name.startswith(pattern)
+        return pattern == event_name
+
+# Global Instance
+event_handlers = EventHandlerRegistry()
+
+# --- KERNEL HANDLERS ---
+
+@event_handlers.on("WORKFLOW:")
+async def handle_workflow_action(event: SystemOutbox):
+    """
+    Executes business logic triggered by State Changes.
+    """
+    action = event.payload.get('data', {}).get('action')
+    entity_id = event.entity_id
+
+    if action == 'send_email':
+        # In a real app, this calls SendGrid/SES
+        logger.info(f"      📧 [MOCK] Sending Email for Entity #{entity_id}")
+
+    elif action == 'notify_slack':
+        logger.info(f"      💬 [MOCK] Posting to Slack for Entity #{entity_id}")
+
+    else:
+        logger.warning(f"      ⚠️  Unknown Action: {action}")
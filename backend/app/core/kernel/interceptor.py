@@ -4,21 +4,43 @@
 # @author: The Engineer (ansav8@gmail.com)
 # @description: Decoupled Gateway. No Hardcoded Maps. Resilient Fail-Open Logic.
 # @security-level: LEVEL 10 (Fail-Open Resilience)
+# UPDATED: Sidecar lookups share one pooled engine per sidecar loop (database/sidecar.py).
+# UPDATED: Flush-level batching. Context, bindings and state machines are loaded ONCE per flush
+#          (one sidecar round trip for every domain in it), then each object is evaluated on CPU.
+# UPDATED: Async-native stage (validate). KernelSession runs it on the request's own loop and
+#          connection before every flush/commit; the sync before_flush + AsyncBridge path only
+#          handles objects that were not validated (plain sync Sessions, scripts).
+# UPDATED: Fast path (kernel/capabilities.py). Models without policies or state machines skip
+#          serialization, context and engine lookups: a direct CDC write, or nothing at all.
+# UPDATED: One snapshot per object per flush (kernel/snapshot.py): host dict, raw and JSON-ready
+#          changeset from a single pass, reused by Governance, Workflow and CDC.
+# UPDATED: Updates pass their changed paths to Governance (policies tagged 'eval:changeset' skip
+#          rules whose inputs did not change).
+# UPDATED: Saves evaluate with early exit (POLICY_EARLY_EXIT): the first BLOCK aborts the flush anyway.
+# UPDATED: Cache misses (policies, state machines, capability map) are loaded from a committed read
+#          (pooled sidecar session), never through the caller's uncommitted transaction: the caches
+#          are process-wide and must not keep rows that may still roll back.
 
 import logging
-from typing import List, Dict, Any
-from types import SimpleNamespace
-from datetime import datetime, date
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Dict, Any, FrozenSet, Iterable, Optional, Tuple
+from datetime import datetime
 
 from sqlalchemy import event
 from sqlalchemy.orm import Session
-from sqlalchemy.inspection import inspect
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.database.session import pre_flush_hooks
+from app.core.database.sidecar import sidecar_pool
+from app.core.kernel.capabilities import capability_map, ModelCapabilities
+from app.core.kernel.context.manager import context_manager
 from app.core.kernel.registry import domain_registry
 from app.core.meta.constants import RuleEventType
 from app.core.kernel.models import SystemOutbox
+from app.core.kernel.snapshot import EntitySnapshot, changeset_of, column_keys, json_friendly, take_snapshot
+from app.core.kernel.notify import OutboxNotifier
 
 # 🔌 DECOUPLED ENGINES (Plug & Play)
 from app.core.utilities.async_bridge import async_bridge
@@ -27,6 +49,21 @@ from app.core.meta.features.states.logic.enforcer import StateEnforcer
 
 logger = logging.getLogger('app.core.kernel.interceptor')
 
+# session.info key: { id(obj): (obj, changeset after validation) } for objects handled by validate()
+VALIDATED_KEY = "kernel.validated"
+
+@dataclass
+class FlushPlan:
+    """
+    Everything the engines need for one flush, loaded in one round trip.
+    'policies' / 'states' are None when that engine could not be reached (Fail-Open).
+    """
+    context: Dict[str, Any] = field(default_factory=dict)
+    policies: Optional[Dict[str, list]] = None
+    states: Optional[Dict[str, list]] = None
+    governance_error: Optional[Exception] = None
+    workflow_error: Optional[Exception] = None
+
 class LogicInterceptor:
     """
     The Universal Gateway.
@@ -38,60 +75,212 @@ class LogicInterceptor:
     @staticmethod
     def register(session_class_or_factory):
         event.listen(session_class_or_factory, 'before_flush', LogicInterceptor.before_flush)
+        event.listen(session_class_or_factory, 'after_flush', LogicInterceptor._forget_validated)
+        event.listen(session_class_or_factory, 'after_soft_rollback', LogicInterceptor._forget_validated)
+        # ⚡ ASYNC STAGE: KernelSession awaits validate() before every flush/commit.
+        if LogicInterceptor.validate not in pre_flush_hooks:
+            pre_flush_hooks.append(LogicInterceptor.validate)
+        # ⚡ WAKEUP: Every transaction that writes outbox rows (CDC or kernel.publish) pings the Relay/Worker.
+        OutboxNotifier.register(session_class_or_factory)
         logger.info("🛡️ [Interceptor] Universal Gateway & CDC Activated (Decoupled Mode).")
 
+    @staticmethod
+    async def validate(db: AsyncSession) -> int:
+        """
+        ⚡ ASYNC PRE-FLUSH STAGE: Governance, Workflow and CDC for the pending objects,
+        on the caller's event loop (no sidecar thread, no blocked loop).
+        Context lookups run on the session's own connection, inside a SAVEPOINT; the shared caches
+        are filled from committed reads only.
+        Objects handled here are skipped by before_flush unless they change again.
+        Returns the number of objects processed.
+        """
+        session = db.sync_session
+        if capability_map.is_stale and (session.new or session.dirty):
+            try:
+                async with sidecar_pool.session(shared=True) as committed_db:
+                    await capability_map.refresh(committed_db)
+            except Exception as e:
+                logger.error(f"⚠️ [Interceptor] Capability refresh failed. Full path. Error: {e}")
+
+        work = LogicInterceptor._collect(session)
+        if not work:
+            return 0
+
+        plan = None
+        domain_keys = {caps.domain_key for _, caps, _ in work if caps.enforces}
+        if domain_keys:
+            try:
+                plan = await LogicInterceptor.load_plan(domain_keys, db=db)
+            except Exception as e:
+                logger.error(f"⚠️ [Interceptor] Lookups failed. Failing OPEN. Error: {e}")
+                plan = FlushPlan(governance_error=e, workflow_error=e)
+
+        validated = session.info.setdefault(VALIDATED_KEY, {})
+        for obj, caps, snapshot in work:
+            LogicInterceptor._dispatch(session, obj, caps, snapshot, plan)
+            # Post-mutation changeset: a later edit of the object makes before_flush re-check it.
+            validated[id(obj)] = (obj, changeset_of(obj)[0])
+        return len(work)
+
     @staticmethod
     def before_flush(session, flush_context, instances):
+        if capability_map.is_stale and (session.new or session.dirty):
+            LogicInterceptor._refresh_capabilities()
+
+        # 1. ⚡ PRE-FLIGHT: Resolve capabilities & changesets (CPU only)
+        work = LogicInterceptor._collect(session)
+        if not work:
+            return
+
+        # 2. ⚡ BATCH IO: One sidecar round trip for the governed domains of the flush (none if there are none)
+        domain_keys = {caps.domain_key for _, caps, _ in work if caps.enforces}
+        plan = LogicInterceptor._prepare_plan(domain_keys) if domain_keys else None
+
+        for obj, caps, snapshot in work:
+            LogicInterceptor._dispatch(session, obj, caps, snapshot, plan)
+
+    @staticmethod
+    def _dispatch(session: Session, obj: Any, caps: ModelCapabilities, snapshot: EntitySnapshot, plan: Optional[FlushPlan]):
+        if caps.enforces and plan is not None:
+            capability_map.enforced += 1
+            LogicInterceptor._process_object(session, obj, caps, snapshot, plan)
+        else:
+            # ⚡ FAST PATH: Nothing to enforce. CDC only.
+            capability_map.fast_path += 1
+            if caps.cdc_enabled:
+                LogicInterceptor._record_cdc(session, obj, caps.domain_key, snapshot)
+
+    @staticmethod
+    def _collect(session: Session) -> List[Tuple[Any, ModelCapabilities, EntitySnapshot]]:
+        """Pending objects with changes (outbox rows, inert models and already validated objects excluded)."""
         candidates = list(session.new) + list(session.dirty)
         if not candidates:
-            return
+            return []
 
+        validated = session.info.get(VALIDATED_KEY, {})
+        work: List[Tuple[Any, ModelCapabilities, EntitySnapshot]] = []
         for obj in candidates:
             # ⚡ NOISE FILTER: Skip Outbox to prevent infinite loops
             if isinstance(obj, SystemOutbox): 
                 continue
 
-            LogicInterceptor._process_object(session, obj)
+            # ⚡ ZERO-COST: No policies, no state machines, no CDC -> not even a changeset
+            caps = capability_map.for_object(obj)
+            if not caps.enforces and not caps.cdc_enabled:
+                continue
+
+            snapshot = take_snapshot(obj)
+            if not snapshot.changeset and obj not in session.new:
+                continue
+
+            done = validated.get(id(obj))
+            if done is not None and done[0] is obj and done[1] == snapshot.changeset:
+                continue
+            work.append((obj, caps, snapshot))
+        return work
 
     @staticmethod
-    def _process_object(session: Session, obj: Any):
-        model_name = type(obj).__name__.upper()
-        
-        # 1. ⚡ DYNAMIC DOMAIN RESOLUTION (No more hardcoded dicts)
-        # We assume the domain matches the class name, unless overridden by the model itself.
-        domain_key = getattr(obj, '__domain__', model_name)
-        
-        # Fallback for internal Kernel structures (Optional but safe)
-        if model_name == "SYSTEMCONFIG": domain_key = "GLOBAL"
-        elif model_name == "CIRCUITBREAKER": domain_key = "SYS"
+    def _forget_validated(session, *args):
+        session.info.pop(VALIDATED_KEY, None)
 
-        domain_ctx = domain_registry.get_domain(domain_key)
-        container_key = domain_ctx.dynamic_container if domain_ctx else None
+    @staticmethod
+    def _refresh_capabilities():
+        """Reloads the capability map on the sidecar. On failure every domain keeps the full path."""
+        async def _refresh():
+            async with sidecar_pool.session() as sidecar_db:
+                await capability_map.refresh(sidecar_db)
+        try:
+            async_bridge.run_sync(_refresh())
+        except Exception as e:
+            logger.error(f"⚠️ [Interceptor] Capability refresh failed. Full path. Error: {e}")
+
+    @staticmethod
+    def _prepare_plan(domain_keys: Iterable[str]) -> FlushPlan:
+        """Runs load_plan on the sidecar. Fails OPEN (empty plan) if the sidecar is unreachable."""
+        try:
+            return async_bridge.run_sync(LogicInterceptor.load_plan(domain_keys))
+        except Exception as e:
+            logger.error(f"⚠️ [Interceptor] Sidecar lookups failed. Failing OPEN. Error: {e}")
+            return FlushPlan(governance_error=e, workflow_error=e)
+
+    @staticmethod
+    async def load_plan(domain_keys: Iterable[str], db: Optional[AsyncSession] = None) -> FlushPlan:
+        """
+        ⚡ IO: Environment context (once per flush), then the policies and the state machines of
+        every domain in the flush. Each engine fails independently.
+        Without 'db' a pooled sidecar session is used. With 'db' (the caller's session) the context
+        lookups share its connection inside a SAVEPOINT, so a failed lookup cannot abort the caller's
+        transaction. Policies and state machines come from the process-wide caches, whose misses are
+        always loaded on a pooled sidecar session: the caller's transaction may hold uncommitted
+        binding / policy / state rows that must not outlive a rollback in the cache.
+        """
+        domain_keys = list(domain_keys)
+        async with LogicInterceptor._lookup(db) as lookup_db:
+            if db is None:
+                return await LogicInterceptor._load_plan(lookup_db, lookup_db, domain_keys)
+            async with sidecar_pool.session(shared=True) as committed_db:
+                return await LogicInterceptor._load_plan(lookup_db, committed_db, domain_keys)
 
-        # 2. ⚡ PRE-FLIGHT: Freeze & Calculate Changes
-        frozen_obj = LogicInterceptor._freeze_entity(obj)
-        changeset = LogicInterceptor._calculate_changeset(obj)
-        
-        if not changeset and obj not in session.new:
+    @staticmethod
+    @asynccontextmanager
+    async def _lookup(db: Optional[AsyncSession]) -> AsyncIterator[AsyncSession]:
+        """Read session for lookups: pooled sidecar session, or a SAVEPOINT on the caller's connection."""
+        if db is None:
+            async with sidecar_pool.session() as sidecar_db:
+                yield sidecar_db
             return
 
+        connection = await db.connection()
+        async with AsyncSession(bind=connection, join_transaction_mode="create_savepoint", autoflush=False, expire_on_commit=False) as lookup_db:
+            yield lookup_db
+
+    @staticmethod
+    async def _load_plan(db: AsyncSession, cache_db: AsyncSession, domain_keys: List[str]) -> FlushPlan:
+        """'db': context lookups. 'cache_db': committed reads for the policy / state machine caches."""
+        plan = FlushPlan()
+        try:
+            # Flush-level context: providers get no subject entity (see ContextProvider)
+            plan.context = await context_manager.resolve(db, None) or {}
+            plan.policies = await GovernanceEnforcer.fetch_policies(cache_db, domain_keys)
+        except Exception as e:
+            plan.governance_error = e
+            await db.rollback()
+            if cache_db is not db:
+                await cache_db.rollback()
+
+        try:
+            plan.states = await StateEnforcer.fetch_definitions_many(cache_db, domain_keys)
+        except Exception as e:
+            plan.workflow_error = e
+        return plan
+
+    @staticmethod
+    def _process_object(session: Session, obj: Any, caps: ModelCapabilities, snapshot: EntitySnapshot, plan: FlushPlan):
+        domain_key = caps.domain_key
+        domain_ctx = domain_registry.get_domain(domain_key)
+        container_key = domain_ctx.dynamic_container if domain_ctx else None
+
         # Construct default envelope
         meta_data = getattr(obj, container_key, {}) or {} if container_key else {}
-        host_data = LogicInterceptor._serialize_entity(obj)
-
         context_envelope = {
-            "host": host_data,
+            "host": snapshot.host,
             "meta": meta_data,
-            "changeset": changeset,
+            "changeset": snapshot.changeset,
             "session": { "discriminator": "INTERCEPTOR_SAVE", "event": RuleEventType.SAVE }
         }
 
-        # 3. 🧠 THE BRAIN: GOVERNANCE ENGINE (Decoupled Sidecar)
+        # 3. 🧠 THE BRAIN: GOVERNANCE ENGINE (Preloaded Policies)
         try:
-            logic_result, enriched_ctx = async_bridge.run_sync(
-                GovernanceEnforcer.fetch_and_evaluate(frozen_obj, obj, domain_key, context_envelope)
+            if plan.policies is None:
+                raise RuntimeError(plan.governance_error or "Policies not loaded")
+
+            context_envelope.update(plan.context)
+            # Creates evaluate every rule; updates only what their changeset can affect
+            changed = None if obj in session.new else LogicInterceptor._changed_paths(snapshot, container_key)
+            # A block aborts the flush: only the first blocking error matters (POLICY_EARLY_EXIT)
+            logic_result = GovernanceEnforcer.evaluate(
+                obj, plan.policies.get(domain_key, []), context_envelope, changed, early_exit=settings.POLICY_EARLY_EXIT
             )
-            context_envelope = enriched_ctx # Use enriched context for Workflow steps
 
             if not logic_result.is_valid:
                 error_msg = f"⛔ Policy Blocked Save: {', '.join(logic_result.blocking_errors)}"
@@ -110,18 +299,12 @@ class LogicInterceptor:
             # ⚡ FAIL-OPEN RESILIENCE: If Brain crashes, allow the body to survive.
             logger.error(f"⚠️ [Interceptor] Governance Engine Offline/Crashed. Failing OPEN. Error: {e}")
 
-        # 4. 🏃 THE BODY: WORKFLOW ENGINE (Decoupled)
+        # 4. 🏃 THE BODY: WORKFLOW ENGINE (Preloaded State Machines)
         try:
-            # Need an ephemeral async session just to fetch state defs for the workflow engine
-            async def fetch_states():
-                engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
-                try:
-                    async with AsyncSession(engine) as sdb:
-                        return await StateEnforcer.fetch_definitions(sdb, domain_key)
-                finally:
-                    await engine.dispose()
-
-            state_defs = async_bridge.run_sync(fetch_states())
+            if plan.states is None:
+                raise RuntimeError(plan.workflow_error or "State definitions not loaded")
+
+            state_defs = plan.states.get(domain_key)
             if state_defs:
                 StateEnforcer.enforce_logic(obj, state_defs, session)
         except ValueError as ve:
@@ -153,22 +336,26 @@ class LogicInterceptor:
             delattr(obj, "_pending_transition")
 
         # 6. ⚡ CHANGE DATA CAPTURE (CDC)
-        if changeset or obj in session.new:
+        if caps.cdc_enabled:
+            req_id = context_envelope.get("request_id", "system") if isinstance(context_envelope, dict) else "system"
+            LogicInterceptor._record_cdc(session, obj, domain_key, snapshot, req_id)
+
+    @staticmethod
+    def _record_cdc(session: Session, obj: Any, domain_key: str, snapshot: EntitySnapshot, req_id: str = "system"):
+        if snapshot.changeset or obj in session.new:
+            model_name = type(obj).__name__.upper()
             event_type = "CREATED" if obj in session.new else "UPDATED"
             event_name = f"{domain_key}:{event_type}"
-            
-            safe_changeset = LogicInterceptor._json_friendly(changeset)
-            
+
             cdc_payload = {
                 "entity_id": getattr(obj, "id", None),
                 "domain": domain_key,
                 "model": model_name,
-                "changes": safe_changeset,
+                "changes": snapshot.cdc_changes,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
             p_key = str(getattr(obj, "id", "global"))
-            req_id = context_envelope.get("request_id", "system") if isinstance(context_envelope, dict) else "system"
 
             cdc_event = SystemOutbox(
                 event_name=event_name,
@@ -182,6 +369,14 @@ class LogicInterceptor:
             session.add(cdc_event)
             logger.info(f"💾 [CDC] Recorded {event_name} for {model_name} #{getattr(obj, 'id', '?')}")
 
+    @staticmethod
+    def _changed_paths(snapshot: EntitySnapshot, container_key: Optional[str]) -> FrozenSet[Tuple[str, ...]]:
+        """Envelope paths touched by the changeset: host.<column>, and meta if the container changed."""
+        paths = {("host", key) for key in snapshot.changeset}
+        if container_key and container_key in snapshot.changeset:
+            paths.add(("meta",))
+        return frozenset(paths)
+
     @staticmethod
     def _schedule_workflow_effect(session: Session, obj: Any, event_name: str, scope: str):
         event = SystemOutbox(
@@ -200,30 +395,12 @@ class LogicInterceptor:
 
     @staticmethod
     def _json_friendly(data: Any) -> Any:
-        if isinstance(data, dict):
-            return {k: LogicInterceptor._json_friendly(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [LogicInterceptor._json_friendly(v) for v in data]
-        elif isinstance(data, (datetime, date)):
-            return data.isoformat()
-        return data
-
-    @staticmethod
-    def _freeze_entity(obj: Any) -> Any:
-        try:
-            data = {}
-            inspector = inspect(obj)
-            for col in inspector.mapper.column_attrs:
-                data[col.key] = getattr(obj, col.key)
-            return SimpleNamespace(**data)
-        except Exception:
-            return obj
+        return json_friendly(data)
 
     @staticmethod
     def _serialize_entity(obj: Any) -> Dict[str, Any]:
         try:
-            inspector = inspect(obj)
-            return {c.key: getattr(obj, c.key) for c in inspector.mapper.column_attrs}
+            return {key: getattr(obj, key) for key in column_keys(obj)}
         except Exception:
             return {}
 
@@ -250,16 +427,3 @@ class LogicInterceptor:
                     created_at=datetime.utcnow()
                 )
                 session.add(outbox_entry)
-
-    @staticmethod
-    def _calculate_changeset(obj) -> dict:
-        changes = {}
-        inspector = inspect(obj)
-        for attr in inspector.attrs:
-            history = attr.history
-            if history.has_changes():
-                changes[attr.key] = {
-                    "old": history.deleted[0] if history.deleted else None,
-                    "new": history.added[0] if history.added else None
-                }
-        return changes 
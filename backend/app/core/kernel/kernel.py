@@ -3,15 +3,21 @@
 # @author: The Engineer
 # @description: The Central Nervous System. Manages Event Ingestion.
 # UPDATED: Restored commit() helper. Enforces 'partition_key'.
+# UPDATED: Added publish_many() (bulk ingestion, one multi-row INSERT per chunk).
+# UPDATED: Added validate() (async pre-commit stage: Governance, Workflow, CDC on the caller's loop).
 
 import logging
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Iterable, List, Set, Tuple
 from datetime import datetime
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.kernel.models import SystemOutbox
+from app.core.config import settings
+from app.core.database.session import pre_flush_hooks
+from app.core.kernel.models import SystemOutbox, outbox_shard
 from app.core.kernel.events import SystemEvent
+from app.core.kernel.notify import OutboxNotifier
 from app.core.context import GlobalContext
 
 logger = logging.getLogger("kernel.core")
@@ -101,12 +107,119 @@ class Kernel:
             # In Level 100, we DO raise. If the event cannot be logged, the transaction is unsafe.
             raise e
 
+    async def publish_many(
+        self,
+        db: AsyncSession,
+        events: Iterable[Union[Tuple, Dict[str, Any]]],
+        chunk_size: int = 1000
+    ) -> int:
+        """
+        Bulk ingestion for import jobs. Same envelope, trace_id and partition_key rules as 'publish',
+        but written with Core multi-row INSERTs (no ORM objects, no per-row flush).
+
+        Args:
+            db (AsyncSession): Active session (Must be same transaction as business data).
+            events: Items as tuples '(event, payload[, entity_id[, partition_key]])'
+                    or dicts with the keys 'event', 'payload', 'entity_id', 'partition_key'.
+            chunk_size (int): Rows per INSERT statement.
+
+        Returns: The number of events written.
+        """
+        rows = self.build_outbox_rows(events)
+        if not rows:
+            return 0
+
+        try:
+            for offset in range(0, len(rows), chunk_size):
+                await db.execute(insert(SystemOutbox), rows[offset:offset + chunk_size])
+        except Exception as e:
+            logger.error(f"🔥 [KERNEL] Bulk Publish Failed ({len(rows)} events): {e}", exc_info=True)
+            raise e
+
+        # Core INSERTs bypass 'after_flush', so the consumers are woken explicitly.
+        if settings.OUTBOX_NOTIFY_ENABLED:
+            await db.run_sync(OutboxNotifier.notify)
+
+        logger.debug(f"📨 [KERNEL] Bulk Buffered: {len(rows)} events")
+        return len(rows)
+
+    def build_outbox_rows(self, events: Iterable[Union[Tuple, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Builds the outbox rows for 'publish_many'.
+        Everything that is constant for the call (trace_id, timestamp) is resolved once.
+        """
+        trace_id = GlobalContext.get_request_id() or "system"
+        now = datetime.utcnow()
+        timestamp = now.isoformat()
+
+        # Raw string events warn once per call, not once per row
+        warned: Set[str] = set()
+        rows = []
+
+        for item in events:
+            if isinstance(item, dict):
+                event = item["event"]
+                payload = item["payload"]
+                entity_id = item.get("entity_id")
+                partition_key = item.get("partition_key")
+            else:
+                event, payload = item[0], item[1]
+                entity_id = item[2] if len(item) > 2 else None
+                partition_key = item[3] if len(item) > 3 else None
+
+            if isinstance(event, SystemEvent):
+                meta = (event.name, event.version)
+            else:
+                meta = (str(event), "1.0.0")
+                if meta[0] not in warned:
+                    warned.add(meta[0])
+                    logger.warning(f"⚠️ [KERNEL] Raw string event '{meta[0]}' is deprecated.")
+
+            if not partition_key:
+                partition_key = str(entity_id) if entity_id else "global"
+
+            rows.append({
+                "event_name": meta[0],
+                "partition_key": partition_key,
+                "shard": outbox_shard(partition_key),
+                "trace_id": trace_id,
+                "payload": {
+                    "meta": {
+                        "version": meta[1],
+                        "timestamp": timestamp,
+                        "source": "flodock-kernel",
+                        "trace_id": trace_id
+                    },
+                    "data": payload
+                },
+                "entity_id": entity_id,
+                "status": "PENDING",
+                "retry_count": 0,
+                "created_at": now
+            })
+
+        return rows
+
+    async def validate(self, db: AsyncSession) -> int:
+        """
+        Runs the Interceptor's async pre-commit stage (Governance, Workflow, CDC) for the pending
+        objects of 'db', on the caller's event loop and connection. Raises ValueError on a policy block.
+        KernelSession (AsyncSessionLocal) does this automatically on flush/commit; call it explicitly
+        for other AsyncSessions to keep the sync before_flush from blocking the loop.
+        Returns the number of objects processed.
+        """
+        processed = 0
+        for hook in pre_flush_hooks:
+            processed += await hook(db)
+        return processed
+
     async def commit(self, db: AsyncSession):
         """
         Finalizes the transaction.
         Saves both the Data Changes and the Outbox Events atomically.
         """
         try:
+            await self.validate(db)
             await db.commit()
         except Exception as e:
             await db.rollback()
@@ -3,50 +3,97 @@
 # @author: ansav8@gmail.com
 # @description: Data Models for the Core Kernel.
 # UPDATED: Added 'partition_key' and 'trace_id' for Distributed Relay.
+# UPDATED: Outbox is an append-only log ('seq', 'txid', 'shard') read through per-consumer checkpoints.
+# UPDATED: Outbox is range-partitioned by day on 'created_at' (see kernel/retention.py).
+# UPDATED: Retry schedule on the checkpoints and a dead-letter store ('system_outbox_dead_letters').
+# UPDATED: Consumer inbox ('system_consumer_inbox') for idempotent stream consumers.
+# UPDATED: Consumer membership heartbeats ('system_outbox_members') for shard rebalancing.
+# UPDATED: Retries are parked per partition_key ('system_outbox_parked'); checkpoints no longer hold retry state.
 
+import zlib
 from datetime import datetime
 from typing import Optional, Dict, Any
 
-from sqlalchemy import Integer, String, DateTime, Text
+from sqlalchemy import Integer, BigInteger, String, DateTime, Text, Sequence, Index, DDL, text, event
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import JSONB
 
+from app.core.config import settings
 from app.core.database.base import Base
 
+def outbox_shard(partition_key: Optional[str]) -> int:
+    """
+    Stable shard of a partition_key. All events of one key land on one shard,
+    and a shard is drained by exactly one consumer instance at a time.
+    ⚠️ OUTBOX_SHARDS is fixed per deployment: changing it re-maps keys.
+    """
+    key = (partition_key or "global").encode("utf-8")
+    return zlib.crc32(key) % settings.OUTBOX_SHARDS
+
+def _default_shard(context) -> int:
+    return outbox_shard(context.get_current_parameters().get("partition_key"))
+
 class SystemOutbox(Base):
     """
     TRANSACTIONAL OUTBOX (The Kafka Waiting Room).
     Stores events atomically with business data.
-    The 'Relay' process reads this table and pushes to Kafka.
+
+    APPEND-ONLY LOG:
+    Rows are never updated by consumers. Each consumer (Relay, Worker, Projections)
+    reads forward from its own checkpoint in 'system_outbox_checkpoints'.
+    The log order is (txid, seq): only rows below the oldest in-flight transaction
+    are read, so a slow transaction can never be skipped by a cursor.
+
+    TIME PARTITIONING:
+    Daily RANGE partitions on 'created_at' (system_outbox_pYYYYMMDD) plus a DEFAULT catch-all.
+    Indexes are per partition, so they stay as small as the retention window.
+    Old partitions are archived and dropped in bulk by 'OutboxRetention'.
     """
     __tablename__ = 'system_outbox'
+    __table_args__ = (
+        # ⚡ RANGE SCAN: shard = :s AND (txid, seq) > checkpoint ORDER BY txid, seq
+        Index('ix_system_outbox_log', 'shard', 'txid', 'seq'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+    # Postgres requires the partition column in the primary key.
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    # ⚡ LOG POSITION
+    # seq  : Monotonic sequence number (allocation order).
+    # txid : Writing transaction (Postgres txid). Defines the visibility horizon.
+    # shard: crc32(partition_key) % OUTBOX_SHARDS. Unit of consumer ownership.
+    seq: Mapped[int] = mapped_column(BigInteger, Sequence('system_outbox_seq'), nullable=False)
+    txid: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("txid_current()"))
+    shard: Mapped[int] = mapped_column(Integer, nullable=False, default=_default_shard)
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    
     # ⚡ KAFKA ROUTING
     # The Event Key (e.g. 'CONTAINER:GATE_IN')
     event_name: Mapped[str] = mapped_column(String(100), nullable=False)
-    
+
     # Guaranteed Ordering Key (e.g. 'container_123', 'user_456')
     # All events for the same entity MUST have the same partition_key
     partition_key: Mapped[str] = mapped_column(String(100), nullable=False, index=True, default="global")
-    
+
     # Distributed Trace ID (OpenTelemetry compatible)
     trace_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
-    
+
     # The actual payload (Schema Versioned)
     payload: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
-    
+
     # Metadata for legacy tracing
-    entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True) 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    
-    # ⚡ PROCESSING STATUS
-    # PENDING   : Ready to be sent to Kafka
-    # PUBLISHED : Successfully sent to Kafka (Acked)
-    # FAILED    : Kafka rejected it (Poison Pill)
-    status: Mapped[str] = mapped_column(String(20), default='PENDING', index=True) 
-    
+    entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # ⚡ REPLAY ROUTING
+    # NULL = every consumer. Dead-letter replays are addressed to the consumer that failed them.
+    target_consumer: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    # ⚡ LEGACY STATUS (Pre-Log Era)
+    # Written once as PENDING. Consumers track progress through checkpoints instead,
+    # so it is deliberately not indexed (a full-history status index only grows).
+    status: Mapped[str] = mapped_column(String(20), default='PENDING')
+
     processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, default=0)
     error_log: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -57,9 +104,163 @@ class SystemOutbox(Base):
         """
         return {
             'id': self.id,
+            'seq': self.seq,
             'event': self.event_name,
             'key': self.partition_key,
             'payload': self.payload,
             'trace_id': self.trace_id,
+            'entity_id': self.entity_id,
             'timestamp': self.created_at.isoformat() if self.created_at else None
         }
+
+# ⚡ CATCH-ALL PARTITION: inserts never fail, even if the retention job has not pre-created today's partition.
+event.listen(
+    SystemOutbox.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS system_outbox_default PARTITION OF system_outbox DEFAULT").execute_if(dialect="postgresql")
+)
+
+class OutboxCheckpoint(Base):
+    """
+    CONSUMER CURSOR.
+    One row per (consumer, shard). Stores the last processed log position and
+    the lease of the consumer instance currently draining that shard.
+    """
+    __tablename__ = 'system_outbox_checkpoints'
+    __cdc__ = False  # Kernel bookkeeping: no CDC events (see kernel/capabilities.py)
+
+    consumer: Mapped[str] = mapped_column(String(100), primary_key=True)   # e.g. 'relay', 'worker'
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Last processed position (txid, seq). (0, 0) = beginning of the log.
+    last_txid: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    # Ownership lease (one instance per shard keeps per-key ordering)
+    leased_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    lease_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+class OutboxMember(Base):
+    """
+    CONSUMER MEMBERSHIP.
+    One row per live consumer instance, heartbeated on every lease round. Fair shares are
+    computed from this table, so an instance that holds no shard yet still counts.
+    """
+    __tablename__ = 'system_outbox_members'
+    __cdc__ = False  # Kernel bookkeeping: no CDC events (see kernel/capabilities.py)
+
+    consumer: Mapped[str] = mapped_column(String(100), primary_key=True)
+    owner: Mapped[str] = mapped_column(String(100), primary_key=True)
+    heartbeat_until: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+class OutboxParkedEvent(Base):
+    """
+    PARKED KEY (per-key retry queue).
+    When an event fails, it and every later event of its partition_key are copied here and the
+    shard checkpoint moves on, so the other keys of the shard keep flowing. The head row (lowest id
+    per consumer + partition_key) carries the retry schedule; the rest wait behind it in log order.
+    """
+    __tablename__ = 'system_outbox_parked'
+    __cdc__ = False  # Kernel bookkeeping: no CDC events (see kernel/capabilities.py)
+    __table_args__ = (
+        Index('ix_system_outbox_parked_key', 'consumer', 'partition_key', 'id'),
+        Index('ix_system_outbox_parked_shard', 'consumer', 'shard'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    consumer: Mapped[str] = mapped_column(String(100), nullable=False)
+    shard: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Original event (copied, the outbox partition may be dropped by retention)
+    outbox_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    outbox_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    outbox_txid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    event_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    partition_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    trace_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # ⚡ RETRY SCHEDULE (meaningful on the head row of a key)
+    # NULL next_attempt_at = due now (e.g. a row that just became the head).
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    def to_event(self) -> SystemOutbox:
+        """Transient outbox event (never added to a session) handed back to the consumer."""
+        return SystemOutbox(
+            id=self.outbox_id,
+            seq=self.outbox_seq,
+            txid=self.outbox_txid,
+            shard=self.shard,
+            event_name=self.event_name,
+            partition_key=self.partition_key,
+            trace_id=self.trace_id,
+            payload=self.payload,
+            entity_id=self.entity_id,
+            created_at=self.created_at
+        )
+
+class OutboxDeadLetter(Base):
+    """
+    DEAD LETTER STORE.
+    An event that failed OUTBOX_MAX_ATTEMPTS times for one consumer. It leaves the parked queue of
+    its key; the copy here is re-driven with 'DeadLetterStore.replay'.
+    """
+    __tablename__ = 'system_outbox_dead_letters'
+    __cdc__ = False  # Kernel bookkeeping: no CDC events (see kernel/capabilities.py)
+    __table_args__ = (
+        Index('ix_system_outbox_dead_letters_pending', 'consumer', 'replayed_at', 'id'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    consumer: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # Original event (copied, the outbox partition may be dropped by retention)
+    outbox_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    outbox_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    event_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    partition_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    trace_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Failure
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    failed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    # Set once re-appended to the outbox
+    replayed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'consumer': self.consumer,
+            'outbox_id': self.outbox_id,
+            'event': self.event_name,
+            'key': self.partition_key,
+            'trace_id': self.trace_id,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'failed_at': self.failed_at.isoformat() if self.failed_at else None,
+            'replayed_at': self.replayed_at.isoformat() if self.replayed_at else None
+        }
+
+class ConsumerInbox(Base):
+    """
+    IDEMPOTENCY STORE (Stream Consumers).
+    One row per (consumer group, outbox id) already handled. Redelivered messages
+    (rebalance, crash before the offset commit) are skipped.
+    """
+    __tablename__ = 'system_consumer_inbox'
+    __cdc__ = False  # Kernel bookkeeping: no CDC events (see kernel/capabilities.py)
+
+    consumer: Mapped[str] = mapped_column(String(100), primary_key=True)
+    event_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    processed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
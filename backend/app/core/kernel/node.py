@@ -0,0 +1,100 @@
+# FILEPATH: backend/app/core/kernel/node.py
+# @file: Single-Node Runner (Relay + Worker + Stream Consumers in one process)
+# @author: The Engineer
+# @description: The launcher for EVENT_BUS_TRANSPORT=memory. The in-process broker (kernel/bus.py)
+#              only connects producers and consumers of the same process, so the Relay and every
+#              Stream Consumer must share one event loop. This runner starts the KafkaRelay,
+#              the BackgroundWorker and the registered StreamConsumers together on that loop.
+#
+# Usage:
+#   python app/core/kernel/node.py
+
+import asyncio
+import logging
+import sys
+import os
+from typing import Callable, List, Optional
+
+# ⚡ BOOTSTRAP PATH
+# Current: backend/app/core/kernel/node.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+sys.path.append(backend_root)
+
+from app.core.config import settings
+from app.core.kernel.bus import is_memory_transport
+from app.core.kernel.consumer import StreamConsumer
+
+logger = logging.getLogger("kernel.node")
+
+StreamConsumerFactory = Callable[[], StreamConsumer]
+
+# Stream consumers hosted by the node. Domains register a factory at import time:
+#
+#   @stream_consumer
+#   def billing_projection():
+#       return StreamConsumer("billing-projection", billing_handlers)
+_stream_consumers: List[StreamConsumerFactory] = []
+
+def stream_consumer(factory: StreamConsumerFactory) -> StreamConsumerFactory:
+    """Registers a StreamConsumer factory to run inside the single node."""
+    _stream_consumers.append(factory)
+    return factory
+
+class SingleNode:
+    """
+    Relay (outbox -> memory bus), Worker (outbox -> side effects) and Stream Consumers
+    (memory bus -> handlers) as tasks of one event loop.
+    The memory transport is forced: with Kafka the components belong in separate processes.
+    """
+
+    def __init__(self, consumers: Optional[List[StreamConsumer]] = None):
+        if not is_memory_transport():
+            logger.warning(f"🧪 [Node] EVENT_BUS_TRANSPORT={settings.EVENT_BUS_TRANSPORT!r}: switching to 'memory' for this process.")
+            settings.EVENT_BUS_TRANSPORT = "memory"
+
+        # Imported here: both modules configure logging and import the domain handlers.
+        from app.core.kernel.relay import KafkaRelay
+        from app.core.kernel.worker import BackgroundWorker
+
+        self.relay = KafkaRelay()
+        self.worker = BackgroundWorker()
+        self.consumers = consumers if consumers is not None else [factory() for factory in _stream_consumers]
+
+    async def start(self):
+        logger.info(f"🏠 [Node] Starting relay, worker and {len(self.consumers)} stream consumer(s) on the memory bus.")
+        tasks = [
+            asyncio.create_task(self.relay.start(), name="relay"),
+            asyncio.create_task(self.worker.start(), name="worker"),
+            *[asyncio.create_task(consumer.start(), name=consumer.group_id) for consumer in self.consumers]
+        ]
+        try:
+            # A component that returns (or crashes) takes the node down: the bus would lose a side.
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.critical(f"🔥 [Node] '{task.get_name()}' crashed: {task.exception()}")
+                else:
+                    logger.warning(f"⚠️ [Node] '{task.get_name()}' stopped.")
+        finally:
+            await self.stop(tasks)
+
+    async def stop(self, tasks: List[asyncio.Task]):
+        self.relay.is_running = False
+        self.worker.is_running = False
+        for consumer in self.consumers:
+            await consumer.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("🛑 [Node] Shutdown complete.")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [NODE] %(message)s")
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    try:
+        asyncio.run(SingleNode().start())
+    except KeyboardInterrupt:
+        logger.info("🛑 Node stopped manually.")
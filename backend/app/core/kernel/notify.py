@@ -0,0 +1,133 @@
+# FILEPATH: backend/app/core/kernel/notify.py
+# @file: Outbox Wakeup Channel (Postgres LISTEN/NOTIFY)
+# @author: The Engineer
+# @description: Push-based wakeup for the Outbox consumers (Relay, Worker).
+#              Writers fire NOTIFY inside the transaction that adds outbox rows
+#              (Postgres delivers it on COMMIT). Consumers block on LISTEN and
+#              keep an adaptive poll only as a safety net.
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.kernel.models import SystemOutbox
+
+logger = logging.getLogger("kernel.notify")
+
+class OutboxNotifier:
+    """
+    The Emitter. Hooks 'after_flush' and fires one NOTIFY per transaction that wrote outbox rows.
+    Postgres folds identical notifications within a transaction, so repeated flushes are free.
+    """
+
+    @staticmethod
+    def register(session_class_or_factory):
+        if not settings.OUTBOX_NOTIFY_ENABLED:
+            return
+        event.listen(session_class_or_factory, 'after_flush', OutboxNotifier.after_flush)
+        logger.info(f"📣 [Notify] Outbox wakeup armed on channel '{settings.OUTBOX_NOTIFY_CHANNEL}'.")
+
+    @staticmethod
+    def after_flush(session: Session, flush_context):
+        # 'session.new' still holds the pre-flush state here.
+        if not any(isinstance(obj, SystemOutbox) for obj in session.new):
+            return
+        OutboxNotifier.notify(session)
+
+    @staticmethod
+    def notify(session: Session):
+        """Queues a NOTIFY on the session's current transaction (sync Session API)."""
+        try:
+            connection = session.connection()
+            if connection.dialect.name != "postgresql":
+                return
+            connection.execute(text("SELECT pg_notify(:channel, '')"), {"channel": settings.OUTBOX_NOTIFY_CHANNEL})
+        except Exception as e:
+            # A missed wakeup only costs latency (the fallback poll picks the rows up).
+            logger.warning(f"⚠️ [Notify] Could not queue wakeup: {e}")
+
+class OutboxWakeup:
+    """
+    The Listener. Owns a dedicated asyncpg connection subscribed to the outbox channel.
+
+    Usage (consumer loop):
+        wakeup = OutboxWakeup()
+        await wakeup.start()
+        while running:
+            processed = await process_batch()
+            await wakeup.wait(had_work=processed > 0)
+
+    POLLING FALLBACK:
+    - After a productive batch the loop continues immediately (drain mode).
+    - When idle, the wait doubles from OUTBOX_POLL_INTERVAL_MIN up to the ceiling:
+      OUTBOX_POLL_INTERVAL_MAX while LISTEN is healthy, OUTBOX_POLL_INTERVAL_FALLBACK otherwise.
+    """
+
+    def __init__(self, channel: Optional[str] = None):
+        self.channel = channel or settings.OUTBOX_NOTIFY_CHANNEL
+        self.min_interval = settings.OUTBOX_POLL_INTERVAL_MIN
+        self.max_interval = settings.OUTBOX_POLL_INTERVAL_MAX
+        self.fallback_interval = settings.OUTBOX_POLL_INTERVAL_FALLBACK
+        self._interval = self.min_interval
+        self._signal = asyncio.Event()
+        self._conn = None
+
+    @property
+    def is_listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self):
+        if not settings.OUTBOX_NOTIFY_ENABLED:
+            logger.info("⏱️ [Notify] Push wakeup disabled. Using adaptive polling only.")
+            return
+        await self._connect()
+
+    async def _connect(self):
+        url = make_url(settings.DATABASE_URL)
+        if not url.drivername.startswith("postgresql"):
+            return
+        try:
+            import asyncpg
+            dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+            self._conn = await asyncpg.connect(dsn)
+            await self._conn.add_listener(self.channel, self._on_notify)
+            logger.info(f"👂 [Notify] LISTEN '{self.channel}' established.")
+        except Exception as e:
+            self._conn = None
+            logger.warning(f"⚠️ [Notify] LISTEN unavailable ({e}). Falling back to adaptive polling.")
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._signal.set()
+
+    async def wait(self, had_work: bool = False):
+        """Returns when new rows may be available (notification, drain mode, or poll timeout)."""
+        if had_work:
+            self._interval = self.min_interval
+            return
+
+        if not self.is_listening and settings.OUTBOX_NOTIFY_ENABLED and self._conn is not None:
+            logger.warning("⚠️ [Notify] LISTEN connection lost. Reconnecting...")
+            self._conn = None
+            await self._connect()
+
+        ceiling = self.max_interval if self.is_listening else self.fallback_interval
+        try:
+            await asyncio.wait_for(self._signal.wait(), timeout=self._interval)
+            self._interval = self.min_interval
+        except asyncio.TimeoutError:
+            self._interval = min(self._interval * 2, ceiling)
+        finally:
+            self._signal.clear()
+
+    async def stop(self):
+        if self._conn is not None:
+            try:
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
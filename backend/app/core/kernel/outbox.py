@@ -0,0 +1,495 @@
+# FILEPATH: backend/app/core/kernel/outbox.py
+# @file: Outbox Store (Log Cursors & Shard Leases)
+# @author: The Engineer
+# @description: Shared data-access layer for the Transactional Outbox.
+#              The outbox is an append-only log. Every consumer (Relay, Worker, Projections)
+#              reads forward from its own checkpoint with range scans; no outbox row is ever updated.
+# UPDATED: Replaced per-row leases with per-shard leases on consumer checkpoints.
+# UPDATED: Failed events are retried with exponential backoff + jitter, then dead-lettered.
+# UPDATED: Fair shares count heartbeating members (system_outbox_members), not shard holders.
+# UPDATED: Retries are parked per partition_key; a failing key no longer stalls its whole shard.
+
+import math
+import os
+import random
+import socket
+import uuid
+import logging
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, delete, func, tuple_, or_, case, literal, BigInteger
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.kernel.models import SystemOutbox, OutboxCheckpoint, OutboxDeadLetter, OutboxMember, OutboxParkedEvent
+
+logger = logging.getLogger("kernel.outbox")
+
+# (txid, seq) of the last processed event
+LogPosition = Tuple[int, int]
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with 'equal jitter': half of the capped delay is fixed, half is random.
+    attempts=1 -> 0.5..1s, 2 -> 1..2s, 3 -> 2..4s ... capped at OUTBOX_RETRY_MAX_SECONDS.
+    """
+    delay = min(settings.OUTBOX_RETRY_MAX_SECONDS, settings.OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class OutboxStore:
+    """
+    The Cursor Protocol.
+
+    ORDERING INVARIANT:
+    Events are sharded by partition_key. A consumer instance must hold the lease on a
+    shard's checkpoint before reading it, so every partition_key is drained by one
+    instance at a time, in log order.
+
+    VISIBILITY HORIZON:
+    Rows are read only below txid_snapshot_xmin() (the oldest in-flight transaction),
+    ordered by (txid, seq). Rows committed later always sort after the checkpoint.
+
+    RETRIES (per partition_key):
+    A failed event is parked: it and every later event of its partition_key are copied to
+    'system_outbox_parked' and the shard checkpoint moves on, so only that key waits. The key's
+    head row carries the attempt count and 'next_attempt_at'; while a key is parked, its new
+    events are appended behind the head (log order is kept). After OUTBOX_MAX_ATTEMPTS the head
+    is copied to the dead-letter store and the next parked event of the key becomes due.
+    """
+
+    @staticmethod
+    async def ensure_checkpoints(db: AsyncSession, consumer: str):
+        """Creates the (consumer, shard) cursor rows at the start of the log if missing."""
+        stmt = insert(OutboxCheckpoint).values([
+            {"consumer": consumer, "shard": shard, "last_txid": 0, "last_seq": 0}
+            for shard in range(settings.OUTBOX_SHARDS)
+        ]).on_conflict_do_nothing(index_elements=["consumer", "shard"])
+        await db.execute(stmt)
+        await db.commit()
+
+    @staticmethod
+    async def lease_shards(
+        db: AsyncSession,
+        consumer: str,
+        owner: str,
+        lease_seconds: int = 30
+    ) -> List[OutboxCheckpoint]:
+        """
+        Renews this instance's shard leases and takes free shards up to its fair share.
+        Fair share = ceil(shards / live members). Every instance heartbeats its membership row
+        first, so a newcomer holding no shard is counted at once: incumbents shed down to the
+        new share on their next round and the newcomer adopts the released shards on its next
+        one. A crashed instance's shards are adopted on lease expiry.
+        The lease is committed immediately.
+        """
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=lease_seconds)
+        is_live = OutboxCheckpoint.lease_until > now
+
+        # 1. MEMBERSHIP HEARTBEAT + FAIR SHARE
+        heartbeat = insert(OutboxMember).values(consumer=consumer, owner=owner, heartbeat_until=until)
+        await db.execute(heartbeat.on_conflict_do_update(
+            index_elements=["consumer", "owner"],
+            set_={"heartbeat_until": heartbeat.excluded.heartbeat_until}
+        ))
+        await db.execute(
+            delete(OutboxMember)
+            .where(OutboxMember.consumer == consumer, OutboxMember.heartbeat_until <= now)
+            .execution_options(synchronize_session=False)
+        )
+        members_stmt = select(func.count()).select_from(OutboxMember).where(OutboxMember.consumer == consumer)
+        live_instances = max(1, (await db.execute(members_stmt)).scalar())
+        fair_share = math.ceil(settings.OUTBOX_SHARDS / live_instances)
+
+        # 2. KEEP / SHED OWN SHARDS
+        mine_stmt = select(OutboxCheckpoint.shard).where(
+            OutboxCheckpoint.consumer == consumer,
+            OutboxCheckpoint.leased_by == owner,
+            is_live
+        ).order_by(OutboxCheckpoint.shard)
+        mine = list((await db.execute(mine_stmt)).scalars().all())
+        keep, shed = mine[:fair_share], mine[fair_share:]
+
+        if shed:
+            await db.execute(
+                update(OutboxCheckpoint)
+                .where(OutboxCheckpoint.consumer == consumer, OutboxCheckpoint.shard.in_(shed))
+                .values(leased_by=None, lease_until=None)
+                .execution_options(synchronize_session=False)
+            )
+
+        # 3. ADOPT FREE SHARDS (never leased, released, or expired)
+        adopted = []
+        deficit = fair_share - len(keep)
+        if deficit > 0:
+            free_stmt = select(OutboxCheckpoint.shard).where(
+                OutboxCheckpoint.consumer == consumer,
+                or_(OutboxCheckpoint.lease_until.is_(None), OutboxCheckpoint.lease_until <= now)
+            ).order_by(OutboxCheckpoint.shard).limit(deficit).with_for_update(skip_locked=True)
+            adopted = list((await db.execute(free_stmt)).scalars().all())
+
+        owned = keep + adopted
+        checkpoints = []
+        if owned:
+            await db.execute(
+                update(OutboxCheckpoint)
+                .where(OutboxCheckpoint.consumer == consumer, OutboxCheckpoint.shard.in_(owned))
+                .values(leased_by=owner, lease_until=until)
+                .execution_options(synchronize_session=False)
+            )
+            cp_stmt = select(OutboxCheckpoint).where(
+                OutboxCheckpoint.consumer == consumer,
+                OutboxCheckpoint.shard.in_(owned)
+            ).order_by(OutboxCheckpoint.shard)
+            checkpoints = list((await db.execute(cp_stmt)).scalars().all())
+
+        await db.commit()
+        if adopted or shed:
+            logger.info(f"🧭 [Outbox] {consumer}/{owner}: owns {len(owned)} shards (+{len(adopted)} / -{len(shed)}).")
+        return checkpoints
+
+    @staticmethod
+    async def read(
+        db: AsyncSession,
+        shard: int,
+        after: LogPosition,
+        limit: int = 100,
+        consumer: Optional[str] = None
+    ) -> List[SystemOutbox]:
+        """
+        Range scan: the next 'limit' events of a shard after a position, below the horizon.
+        With 'consumer', replays addressed to other consumers are skipped.
+        """
+        horizon = select(func.txid_snapshot_xmin(func.txid_current_snapshot())).scalar_subquery()
+        stmt = select(SystemOutbox).where(
+            SystemOutbox.shard == shard,
+            tuple_(SystemOutbox.txid, SystemOutbox.seq) > tuple_(literal(after[0], BigInteger), literal(after[1], BigInteger)),
+            SystemOutbox.txid < horizon
+        )
+        if consumer:
+            stmt = stmt.where(or_(SystemOutbox.target_consumer.is_(None), SystemOutbox.target_consumer == consumer))
+        stmt = stmt.order_by(SystemOutbox.txid, SystemOutbox.seq).limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def advance(
+        db: AsyncSession,
+        consumer: str,
+        owner: str,
+        positions: Dict[int, LogPosition]
+    ) -> int:
+        """
+        Moves the checkpoints of several shards forward in ONE UPDATE.
+        Only shards still leased by 'owner' move. Returns the number of shards advanced.
+        """
+        if not positions:
+            return 0
+
+        txid_case = case(
+            *[(OutboxCheckpoint.shard == shard, literal(pos[0], BigInteger)) for shard, pos in positions.items()],
+            else_=OutboxCheckpoint.last_txid
+        )
+        seq_case = case(
+            *[(OutboxCheckpoint.shard == shard, literal(pos[1], BigInteger)) for shard, pos in positions.items()],
+            else_=OutboxCheckpoint.last_seq
+        )
+
+        result = await db.execute(
+            update(OutboxCheckpoint)
+            .where(
+                OutboxCheckpoint.consumer == consumer,
+                OutboxCheckpoint.shard.in_(list(positions.keys())),
+                OutboxCheckpoint.leased_by == owner
+            )
+            .values(last_txid=txid_case, last_seq=seq_case, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def owned_shards(db: AsyncSession, consumer: str, owner: str) -> Set[int]:
+        """
+        The shards still leased by 'owner', locked for the rest of the transaction.
+        Parking and checkpointing only touch these, so a shard adopted mid-batch is left to its new owner.
+        """
+        stmt = select(OutboxCheckpoint.shard).where(
+            OutboxCheckpoint.consumer == consumer,
+            OutboxCheckpoint.leased_by == owner
+        ).with_for_update()
+        return set((await db.execute(stmt)).scalars().all())
+
+    @staticmethod
+    async def parked_heads(db: AsyncSession, consumer: str, shards: List[int]) -> Dict[str, OutboxParkedEvent]:
+        """The head (oldest parked event) of every parked partition_key in the given shards."""
+        if not shards:
+            return {}
+        head_ids = select(func.min(OutboxParkedEvent.id)).where(
+            OutboxParkedEvent.consumer == consumer,
+            OutboxParkedEvent.shard.in_(shards)
+        ).group_by(OutboxParkedEvent.partition_key)
+        stmt = select(OutboxParkedEvent).where(OutboxParkedEvent.id.in_(head_ids))
+        return {row.partition_key: row for row in (await db.execute(stmt)).scalars().all()}
+
+    @staticmethod
+    async def read_parked(db: AsyncSession, consumer: str, keys: List[str], limit: int = 100) -> List[OutboxParkedEvent]:
+        """Parked events of the given keys, oldest first."""
+        if not keys or limit <= 0:
+            return []
+        stmt = select(OutboxParkedEvent).where(
+            OutboxParkedEvent.consumer == consumer,
+            OutboxParkedEvent.partition_key.in_(keys)
+        ).order_by(OutboxParkedEvent.id).limit(limit)
+        return list((await db.execute(stmt)).scalars().all())
+
+    @staticmethod
+    def park(
+        db: AsyncSession,
+        consumer: str,
+        event: SystemOutbox,
+        attempts: int = 0,
+        next_attempt_at: Optional[datetime] = None,
+        error: Optional[str] = None
+    ):
+        """Appends an event to its key's parked queue (same transaction as the checkpoint move)."""
+        db.add(OutboxParkedEvent(
+            consumer=consumer,
+            shard=event.shard,
+            outbox_id=event.id,
+            outbox_seq=event.seq,
+            outbox_txid=event.txid,
+            event_name=event.event_name,
+            partition_key=event.partition_key,
+            trace_id=event.trace_id,
+            payload=event.payload,
+            entity_id=event.entity_id,
+            created_at=event.created_at,
+            attempts=attempts,
+            next_attempt_at=next_attempt_at,
+            last_error=error
+        ))
+
+    @staticmethod
+    async def reschedule(db: AsyncSession, parked_id: int, attempts: int, next_attempt_at: datetime, error: str):
+        """Records a failed attempt on a parked head row."""
+        await db.execute(
+            update(OutboxParkedEvent)
+            .where(OutboxParkedEvent.id == parked_id)
+            .values(attempts=attempts, next_attempt_at=next_attempt_at, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def unpark(db: AsyncSession, parked_id: int):
+        """Removes a parked event once it succeeded or was dead-lettered."""
+        await db.execute(
+            delete(OutboxParkedEvent)
+            .where(OutboxParkedEvent.id == parked_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def dead_letter(db: AsyncSession, consumer: str, event: SystemOutbox, attempts: int, error: str):
+        """Copies an exhausted event to the dead-letter store (same transaction as the checkpoint move)."""
+        db.add(OutboxDeadLetter(
+            consumer=consumer,
+            outbox_id=event.id,
+            outbox_seq=event.seq,
+            event_name=event.event_name,
+            partition_key=event.partition_key,
+            trace_id=event.trace_id,
+            payload=event.payload,
+            entity_id=event.entity_id,
+            created_at=event.created_at,
+            attempts=attempts,
+            last_error=error
+        ))
+
+    @staticmethod
+    async def release(db: AsyncSession, consumer: str, owner: str):
+        """Gives up all shards and the membership of this instance (graceful shutdown)."""
+        await db.execute(
+            update(OutboxCheckpoint)
+            .where(OutboxCheckpoint.consumer == consumer, OutboxCheckpoint.leased_by == owner)
+            .values(leased_by=None, lease_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(OutboxMember)
+            .where(OutboxMember.consumer == consumer, OutboxMember.owner == owner)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+class OutboxCursor:
+    """
+    One consumer instance reading the outbox log.
+
+    Usage:
+        cursor = OutboxCursor("relay", batch_size=100)
+        await cursor.open(db)
+        batches = await cursor.poll(db)                  # {shard: [events...]}
+        ... process ...
+        await cursor.settle(db, batches, succeeded_ids, {failed_id: "error"})
+    """
+
+    def __init__(self, consumer: str, batch_size: int = 100, lease_seconds: int = None):
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds or settings.OUTBOX_LEASE_SECONDS
+        # Unique per process so leases of a crashed instance are never mistaken for ours.
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+        self._turn = 0
+        # State of the last poll, consumed by settle()
+        self._read: Dict[int, List[SystemOutbox]] = {}           # shard -> events read from the log
+        self._replays: Dict[int, OutboxParkedEvent] = {}         # outbox id -> parked row handed out
+        self._parked_keys: Set[str] = set()                      # keys parked at poll time
+
+    async def open(self, db: AsyncSession):
+        await OutboxStore.ensure_checkpoints(db, self.consumer)
+
+    async def poll(self, db: AsyncSession) -> Dict[int, List[SystemOutbox]]:
+        """
+        Renews shard leases and reads up to 'batch_size' events across the owned shards.
+        Parked keys whose head is due come first (their parked events, in order). New log events
+        of a parked key are not returned: settle() appends them to the key's parked queue.
+        """
+        checkpoints = await OutboxStore.lease_shards(db, self.consumer, self.owner, self.lease_seconds)
+
+        now = datetime.utcnow()
+        heads = await OutboxStore.parked_heads(db, self.consumer, [cp.shard for cp in checkpoints])
+        due = [key for key, head in heads.items() if head.next_attempt_at is None or head.next_attempt_at <= now]
+        self._parked_keys = set(heads)
+
+        batches: Dict[int, List[SystemOutbox]] = {}
+        budget = self.batch_size
+
+        # 1. DUE PARKED KEYS
+        self._replays = {}
+        for row in await OutboxStore.read_parked(db, self.consumer, due, limit=budget):
+            self._replays[row.outbox_id] = row
+            batches.setdefault(row.shard, []).append(row.to_event())
+        budget -= len(self._replays)
+
+        # 2. LOG (rotate the starting shard so a busy shard cannot starve the others of the budget)
+        if checkpoints:
+            turn = self._turn % len(checkpoints)
+            checkpoints = checkpoints[turn:] + checkpoints[:turn]
+            self._turn += 1
+
+        self._read = {}
+        for cp in checkpoints:
+            if budget <= 0:
+                break
+            events = await OutboxStore.read(db, cp.shard, (cp.last_txid, cp.last_seq), limit=budget, consumer=self.consumer)
+            if events:
+                self._read[cp.shard] = events
+                fresh = [event for event in events if event.partition_key not in self._parked_keys]
+                if fresh:
+                    batches.setdefault(cp.shard, []).extend(fresh)
+                budget -= len(events)
+
+        await db.commit()  # Read-only; ends the snapshot (expire_on_commit=False keeps the rows loaded).
+        return batches
+
+    async def commit(self, db: AsyncSession, processed: Dict[int, SystemOutbox]) -> int:
+        """Advances each shard's checkpoint to the last processed event of that shard (no retries)."""
+        positions = {shard: (event.txid, event.seq) for shard, event in processed.items() if event is not None}
+        advanced = await OutboxStore.advance(db, self.consumer, self.owner, positions)
+        await db.commit()
+        if advanced < len(positions):
+            logger.warning(f"⚠️ [Outbox] {self.consumer}: {len(positions) - advanced} shard leases expired mid-batch (events will be re-delivered).")
+        return advanced
+
+    async def settle(
+        self,
+        db: AsyncSession,
+        batches: Dict[int, List[SystemOutbox]],
+        succeeded: Iterable[int],
+        errors: Dict[int, str]
+    ) -> int:
+        """
+        Checkpoints the last polled batch from per-event outcomes, in ONE transaction.
+        - Parked events: a succeeded one leaves the queue; the first failed one is rescheduled on the
+          key's head (or dead-lettered once attempts are exhausted).
+        - Log events: every shard advances to the end of what was read. An event of a key that is
+          parked, or that fails here (first event not in 'succeeded'), is parked with the rest of its key.
+        Events without an entry in 'errors' (held back, never attempted) are parked as due at once.
+        Shards whose lease was lost meanwhile are left untouched. Returns the number of shards advanced.
+        """
+        succeeded = set(succeeded)
+        owned = await OutboxStore.owned_shards(db, self.consumer, self.owner)
+
+        # 1. PARKED KEYS (outcomes of the replayed heads)
+        lanes: Dict[str, List[OutboxParkedEvent]] = defaultdict(list)
+        for shard_events in batches.values():
+            for event in shard_events:
+                row = self._replays.get(event.id)
+                if row is not None and row.shard in owned:
+                    lanes[row.partition_key].append(row)
+
+        for rows in lanes.values():
+            for row in rows:
+                if row.outbox_id in succeeded:
+                    await OutboxStore.unpark(db, row.id)
+                    continue
+                if row.outbox_id in errors:
+                    await self._retry(db, row, row.attempts + 1, errors[row.outbox_id])
+                break
+
+        # 2. LOG (advance every shard; park failed keys behind their first failure)
+        parked = set(self._parked_keys)
+        positions: Dict[int, LogPosition] = {}
+        for shard, events in self._read.items():
+            if shard not in owned:
+                continue
+            for event in events:
+                key = event.partition_key
+                if key in parked:
+                    OutboxStore.park(db, self.consumer, event)
+                elif event.id not in succeeded:
+                    parked.add(key)
+                    if event.id in errors:
+                        await self._retry(db, event, 1, errors[event.id])
+                    else:
+                        OutboxStore.park(db, self.consumer, event)
+            positions[shard] = (events[-1].txid, events[-1].seq)
+
+        advanced = await OutboxStore.advance(db, self.consumer, self.owner, positions)
+        await db.commit()
+
+        lost = (set(self._read) | {row.shard for row in self._replays.values()}) - owned
+        if lost:
+            logger.warning(f"⚠️ [Outbox] {self.consumer}: leases on shards {sorted(lost)} expired mid-batch (events will be re-delivered).")
+        self._read, self._replays = {}, {}
+        return advanced
+
+    async def _retry(self, db: AsyncSession, event, attempts: int, error: str):
+        """
+        Schedules the next attempt of a failed event: a parked head row is rescheduled in place,
+        a log event is parked as the new head of its key. Exhausted events are dead-lettered
+        instead; the next parked event of the key is then due at once.
+        """
+        is_parked = isinstance(event, OutboxParkedEvent)
+        outbox_event = event.to_event() if is_parked else event
+
+        if attempts >= self.max_attempts:
+            OutboxStore.dead_letter(db, self.consumer, outbox_event, attempts, error)
+            if is_parked:
+                await OutboxStore.unpark(db, event.id)
+            logger.error(f"💀 [Outbox] {self.consumer}: Event {outbox_event.id} ({outbox_event.event_name}) dead-lettered after {attempts} attempts: {error}")
+            return
+
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(attempts))
+        if is_parked:
+            await OutboxStore.reschedule(db, event.id, attempts, next_attempt_at, error)
+        else:
+            OutboxStore.park(db, self.consumer, event, attempts=attempts, next_attempt_at=next_attempt_at, error=error)
+        logger.warning(f"🔁 [Outbox] {self.consumer}: key '{outbox_event.partition_key}' parked, retry {attempts}/{self.max_attempts} at {next_attempt_at:%H:%M:%S}.")
+
+    async def close(self, db: AsyncSession):
+        await OutboxStore.release(db, self.consumer, self.owner)
@@ -2,16 +2,24 @@
 # @file: The Kafka Relay (Transactional Outbox Pump)
 # @author: The Engineer
 # @description: Polls the Database Outbox and pushes events to Kafka.
+# UPDATED: Reads the outbox log through its own 'relay' checkpoints (shard leases).
+#          Any number of relays can run side by side.
+# UPDATED: Pipelined publishing. A batch is enqueued with send() and acked in one round.
+# UPDATED: Woken by Postgres NOTIFY instead of a fixed 2s poll.
+# UPDATED: Failed shards back off exponentially; exhausted events go to the dead-letter store.
+# UPDATED: Transport from kernel/bus.py (Kafka, or the in-process broker when EVENT_BUS_TRANSPORT=memory).
+# UPDATED: Topic routing by domain / event prefix; metadata travels as Kafka headers.
+# UPDATED: Prepares the outbox partitions at startup (kernel/retention.py).
+# UPDATED: Retries are parked per partition_key; a failed send no longer holds back its whole shard.
+# UPDATED: Pipelined publishing holds the later events of a failed key (same guard as sequential).
+# UPDATED: Refuses to run standalone on the memory transport (see kernel/node.py).
 
 import asyncio
 import logging
 import json
 import sys
 import os
-from datetime import datetime
-from aiokafka import AIOKafkaProducer
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Tuple
 
 # ⚡ BOOTSTRAP PATH (FIXED)
 # We need to add 'backend' to sys.path, not 'Flodock'.
@@ -27,7 +35,11 @@ sys.path.append(backend_root)
 # Now we can import 'app'
 from app.core.database.session import AsyncSessionLocal
 from app.core.config import settings
-from app.core.kernel.models import SystemOutbox
+from app.core.kernel.outbox import OutboxCursor
+from app.core.kernel.notify import OutboxWakeup
+from app.core.kernel.bus import create_producer, is_memory_transport
+from app.core.kernel.routing import topic_router, event_headers
+from app.core.kernel.retention import prepare_outbox
 
 # Setup dedicated logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [RELAY] %(message)s")
@@ -37,21 +49,35 @@ class KafkaRelay:
     def __init__(self):
         self.is_running = True
         self.producer = None
-        self.poll_interval = 2.0
-        self.batch_size = 100
+        self.wakeup = OutboxWakeup()
+        self.pipelined = settings.OUTBOX_RELAY_PIPELINED
+        self.cursor = OutboxCursor("relay", batch_size=settings.OUTBOX_RELAY_BATCH_SIZE)
+        self.router = topic_router
 
     async def connect_kafka(self):
         while self.is_running:
             try:
                 servers = getattr(settings, "KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
-                logger.info(f"🔌 [Relay] Connecting to Kafka at {servers}...")
-                
-                self.producer = AIOKafkaProducer(
+                if is_memory_transport():
+                    logger.info("🔌 [Relay] Using the in-process event bus (no broker).")
+                else:
+                    logger.info(f"🔌 [Relay] Connecting to Kafka at {servers}...")
+
+                self.producer = create_producer(
                     bootstrap_servers=servers,
-                    value_serializer=lambda v: json.dumps(v).encode('utf-8')
+                    value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+                    # ⚡ THROUGHPUT: Let the client coalesce a batch into few requests.
+                    linger_ms=settings.KAFKA_LINGER_MS,
+                    max_batch_size=settings.KAFKA_MAX_BATCH_SIZE,
+                    compression_type=settings.KAFKA_COMPRESSION_TYPE,
+                    # Idempotence keeps per-partition order intact when the client retries.
+                    enable_idempotence=settings.KAFKA_ENABLE_IDEMPOTENCE
                 )
                 await self.producer.start()
-                logger.info("✅ [Relay] Kafka Connection ESTABLISHED.")
+                if is_memory_transport():
+                    logger.info("🧪 [Relay] In-process event bus ready (only consumers of this process receive events).")
+                else:
+                    logger.info("✅ [Relay] Kafka Connection ESTABLISHED.")
                 return True
             except Exception as e:
                 logger.warning(f"⚠️ [Relay] Connection Failed: {e}. Retrying in 5s...")
@@ -61,87 +87,163 @@ class KafkaRelay:
     async def start(self):
         print("-" * 40)
         print("🚀 STARTING DATA RELAY (Outbox -> Kafka)")
+        print(f"   Relay ID: {self.cursor.owner}")
         print("-" * 40)
         
         if not await self.connect_kafka():
             return
 
+        await prepare_outbox()
+        await self.wakeup.start()
+        async with AsyncSessionLocal() as db:
+            await self.cursor.open(db)
+
         try:
             while self.is_running:
-                await self.process_batch()
-                await asyncio.sleep(self.poll_interval)
-                
+                processed = await self.process_batch()
+                await self.wakeup.wait(had_work=processed > 0)
+
         except Exception as e:
             logger.critical(f"🔥 [Relay] CRASH: {e}", exc_info=True)
         finally:
+            await self.wakeup.stop()
+            async with AsyncSessionLocal() as db:
+                await self.cursor.close(db)
             if self.producer:
                 await self.producer.stop()
             logger.info("🛑 [Relay] Shutdown complete.")
 
-    async def process_batch(self):
+    async def process_batch(self) -> int:
+        """Reads, publishes and checkpoints one batch. Returns the number of events read."""
+        # 1. READ (shard leases renewed, range scan from our checkpoints)
         async with AsyncSessionLocal() as db:
             try:
-                # Poll Pending
-                stmt = select(SystemOutbox).where(
-                    SystemOutbox.status == 'PENDING'
-                ).order_by(SystemOutbox.created_at).limit(self.batch_size)
-                
-                result = await db.execute(stmt)
-                events = result.scalars().all()
-
-                if not events:
-                    return
-
-                logger.info(f"⚡ [Relay] Processing batch of {len(events)} events...")
-                success_ids = []
-                fail_ids = []
-
-                for event in events:
-                    try:
-                        prefix = getattr(settings, "KAFKA_TOPIC_PREFIX", "flodock")
-                        topic = f"{prefix}.events"
-                        
-                        payload = event.to_dict()
-                        key_str = event.partition_key or "global"
-                        
-                        await self.producer.send_and_wait(
-                            topic, 
-                            value=payload, 
-                            key=key_str.encode('utf-8')
-                        )
-                        success_ids.append(event.id)
-                        logger.debug(f"   -> Sent {event.event_name} (ID: {event.id})")
-                        
-                    except Exception as e:
-                        logger.error(f"   ❌ Failed to send Event {event.id}: {e}")
-                        fail_ids.append(event.id)
+                batches = await self.cursor.poll(db)
+            except Exception as e:
+                logger.error(f"⚠️ [Relay] Read Error: {e}")
+                await db.rollback()
+                return 0
 
-                if success_ids:
-                    await db.execute(
-                        update(SystemOutbox)
-                        .where(SystemOutbox.id.in_(success_ids))
-                        .values(status='PUBLISHED', processed_at=datetime.utcnow())
-                    )
-                
-                if fail_ids:
-                    await db.execute(
-                        update(SystemOutbox)
-                        .where(SystemOutbox.id.in_(fail_ids))
-                        .values(status='FAILED', retry_count=SystemOutbox.retry_count + 1)
-                    )
-
-                await db.commit()
+        events = [event for shard_events in batches.values() for event in shard_events]
+        if not events:
+            return 0
+
+        logger.info(f"⚡ [Relay] Processing batch of {len(events)} events across {len(batches)} shards...")
+
+        # 2. PUBLISH
+        if self.pipelined:
+            success_ids, failures, held_ids = await self.publish_pipelined(events)
+        else:
+            success_ids, failures, held_ids = await self.publish_sequential(events)
+
+        # 3. CHECKPOINT (one transaction; every shard advances)
+        # A failed event parks its partition_key: retried after a backoff, or dead-lettered.
+        async with AsyncSessionLocal() as db:
+            try:
+                await self.cursor.settle(db, batches, success_ids, failures)
                 if success_ids:
                     logger.info(f"✅ [Relay] Batch Complete. {len(success_ids)} Published.")
+                if failures:
+                    logger.warning(f"⚠️ [Relay] {len(failures)} failed, {len(held_ids)} held. Keys are parked for retry.")
 
             except Exception as e:
                 logger.error(f"⚠️ [Relay] DB Error: {e}")
                 await db.rollback()
 
+        return len(events)
+
+    def _topic(self, event_name: str = "") -> str:
+        return self.router.topic_for(event_name)
+
+    async def publish_sequential(self, events) -> Tuple[List[int], Dict[int, str], List[int]]:
+        """
+        One broker round trip per event. Kept for debugging and for brokers without idempotence.
+        Returns: (success_ids, failures {id: error}, held_ids)
+        """
+        success_ids, failures, held_ids = [], {}, []
+        broken_keys = set()
+
+        for event in events:
+            key_str = event.partition_key or "global"
+
+            # ⚡ ORDERING GUARD: Once a key fails, its later events wait behind it in the parked queue.
+            if key_str in broken_keys:
+                held_ids.append(event.id)
+                continue
+
+            try:
+                await self.producer.send_and_wait(
+                    self._topic(event.event_name),
+                    value=event.to_dict(),
+                    key=key_str.encode('utf-8'),
+                    headers=event_headers(event)
+                )
+                success_ids.append(event.id)
+                logger.debug(f"   -> Sent {event.event_name} (ID: {event.id})")
+
+            except Exception as e:
+                logger.error(f"   ❌ Failed to send Event {event.id}: {e}")
+                failures[event.id] = str(e)
+                broken_keys.add(key_str)
+
+        return success_ids, failures, held_ids
+
+    async def publish_pipelined(self, events) -> Tuple[List[int], Dict[int, str], List[int]]:
+        """
+        Enqueues the whole batch with send() and gathers the delivery futures.
+        The producer coalesces records per partition (linger/batch size), so a batch costs
+        a handful of round trips instead of one per event.
+        Returns: (success_ids, failures {id: error}, held_ids)
+        """
+        futures = []
+
+        # A. ENQUEUE (send() only buffers; it returns the delivery future)
+        for event in events:
+            key_str = event.partition_key or "global"
+            try:
+                fut = await self.producer.send(
+                    self._topic(event.event_name),
+                    value=event.to_dict(),
+                    key=key_str.encode('utf-8'),
+                    headers=event_headers(event)
+                )
+            except Exception as e:
+                fut = asyncio.get_running_loop().create_future()
+                fut.set_exception(e)
+            futures.append(fut)
+
+        # B. AWAIT DELIVERY REPORTS
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+        # C. CLASSIFY IN LOG ORDER
+        # ⚡ ORDERING GUARD: after a key's first failure its later events are held, even if their
+        # send was acked. They are re-sent behind the retried event (consumers dedupe by event id).
+        success_ids, failures, held_ids = [], {}, []
+        broken_keys = set()
+        for event, outcome in zip(events, outcomes):
+            key_str = event.partition_key or "global"
+            if key_str in broken_keys:
+                held_ids.append(event.id)
+            elif isinstance(outcome, BaseException):
+                logger.error(f"   ❌ Failed to send Event {event.id}: {outcome}")
+                failures[event.id] = str(outcome)
+                broken_keys.add(key_str)
+            else:
+                success_ids.append(event.id)
+
+        return success_ids, failures, held_ids
+
 if __name__ == "__main__":
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        
+
+    # ⚡ GUARD: A standalone relay on the memory bus publishes into a broker no other process can
+    # read, while still advancing its checkpoints: every event would be lost.
+    if is_memory_transport():
+        logger.critical("🛑 [Relay] EVENT_BUS_TRANSPORT=memory: refusing to run standalone. "
+                        "Use the single-node runner instead: python app/core/kernel/node.py")
+        sys.exit(1)
+
     relay = KafkaRelay()
     try:
         asyncio.run(relay.start())
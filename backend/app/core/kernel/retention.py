@@ -0,0 +1,299 @@
+# FILEPATH: backend/app/core/kernel/retention.py
+# @file: Outbox Retention (Partition Janitor)
+# @author: The Engineer
+# @description: Keeps 'system_outbox' bounded.
+#              1. Pre-creates upcoming daily partitions.
+#              2. Streams expired partitions to compressed files (gzip JSONL) on local disk.
+#              3. Detaches and drops them in bulk (no row-by-row DELETE).
+#              A partition is only retired once every consumer checkpoint has moved past it.
+#              4. Prunes the stream consumers' idempotency inbox with the same window.
+# UPDATED: Drains the DEFAULT partition into daily partitions (rows there are otherwise never
+#          retired and block the creation of their day's partition) and alerts when it fills.
+# UPDATED: prepare() runs at API / Relay / Worker startup; the Worker schedules the janitor.
+#          Passes are serialized across processes with a Postgres advisory lock.
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# ⚡ BOOTSTRAP PATH
+# Current: backend/app/core/kernel/retention.py
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+sys.path.append(backend_root)
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database.session import AsyncSessionLocal, engine
+
+logger = logging.getLogger("kernel.retention")
+
+PARTITION_PREFIX = "system_outbox_p"
+DEFAULT_PARTITION = "system_outbox_default"
+JANITOR_LOCK_KEY = 0x0F10D0C5  # pg_advisory_lock key: one janitor pass at a time, cluster-wide
+_PARTITION_PATTERN = re.compile(r"^system_outbox_p(\d{8})$")
+
+class OutboxRetention:
+    """
+    The Partition Janitor.
+    Partitions are daily: system_outbox_pYYYYMMDD covers [day, day + 1).
+    """
+
+    @staticmethod
+    def partition_name(day: date) -> str:
+        return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+    @staticmethod
+    def partition_day(name: str) -> Optional[date]:
+        match = _PARTITION_PATTERN.match(name)
+        return datetime.strptime(match.group(1), "%Y%m%d").date() if match else None
+
+    @staticmethod
+    async def ensure_partitions(db: AsyncSession, days_ahead: int = None) -> List[str]:
+        """Creates today's partition and the next 'days_ahead' ones if they do not exist."""
+        days_ahead = settings.OUTBOX_PARTITION_PREMAKE_DAYS if days_ahead is None else days_ahead
+        today = datetime.utcnow().date()
+        created = []
+
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            name = OutboxRetention.partition_name(day)
+            try:
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF system_outbox "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+                await db.commit()
+                created.append(name)
+            except Exception as e:
+                # Typically: the DEFAULT partition already holds rows for that day.
+                await db.rollback()
+                logger.error(f"⚠️ [Retention] Could not create partition {name}: {e}")
+
+        return created
+
+    @staticmethod
+    async def drain_default(db: AsyncSession) -> int:
+        """
+        Moves rows that landed in the DEFAULT partition into their daily partitions.
+        DETACH DEFAULT -> CREATE the missing day partitions -> re-INSERT the rows (same seq/txid,
+        so checkpoints are unaffected) -> DROP + re-create an empty DEFAULT. One transaction:
+        concurrent inserts wait on the parent's lock for its duration.
+        Returns the number of rows moved.
+        """
+        pending = (await db.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}"))).scalar()
+        if not pending:
+            await db.commit()
+            return 0
+
+        logger.critical(
+            f"🚨 [Retention] {pending} outbox rows in {DEFAULT_PARTITION}: daily partitions were missing. Draining."
+        )
+        try:
+            await db.execute(text(f"ALTER TABLE system_outbox DETACH PARTITION {DEFAULT_PARTITION}"))
+            days = (await db.execute(text(
+                f"SELECT DISTINCT created_at::date FROM {DEFAULT_PARTITION} WHERE created_at IS NOT NULL"
+            ))).scalars().all()
+            for day in days:
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {OutboxRetention.partition_name(day)} PARTITION OF system_outbox "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+            await db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION}_new PARTITION OF system_outbox DEFAULT"))
+            await db.execute(text(f"INSERT INTO system_outbox SELECT * FROM {DEFAULT_PARTITION}"))
+            await db.execute(text(f"DROP TABLE {DEFAULT_PARTITION}"))
+            await db.execute(text(f"ALTER TABLE {DEFAULT_PARTITION}_new RENAME TO {DEFAULT_PARTITION}"))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        logger.warning(f"📥 [Retention] Drained {pending} rows from {DEFAULT_PARTITION} into {len(days)} daily partitions.")
+        return pending
+
+    @staticmethod
+    async def prepare(db: AsyncSession) -> List[str]:
+        """Startup hook (before the first outbox insert): drain DEFAULT, then pre-create partitions."""
+        await OutboxRetention.drain_default(db)
+        return await OutboxRetention.ensure_partitions(db)
+
+    @staticmethod
+    async def list_partitions(db: AsyncSession) -> List[Tuple[str, date]]:
+        """All daily partitions attached to system_outbox, oldest first."""
+        result = await db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'system_outbox'"
+        ))
+        partitions = []
+        for (name,) in result.all():
+            day = OutboxRetention.partition_day(name)
+            if day:
+                partitions.append((name, day))
+        return sorted(partitions, key=lambda item: item[1])
+
+    @staticmethod
+    async def is_fully_consumed(db: AsyncSession, partition: str) -> bool:
+        """True if no consumer checkpoint still sits before any row of the partition."""
+        result = await db.execute(text(
+            f"SELECT 1 FROM {partition} o "
+            f"JOIN system_outbox_checkpoints c ON c.shard = o.shard "
+            f"AND (o.target_consumer IS NULL OR o.target_consumer = c.consumer) "
+            f"WHERE (o.txid, o.seq) > (c.last_txid, c.last_seq) LIMIT 1"
+        ))
+        return result.first() is None
+
+    @staticmethod
+    async def archive_partition(db: AsyncSession, partition: str, archive_dir: str = None, chunk_size: int = 1000) -> Tuple[str, int]:
+        """
+        Streams a partition to '<archive_dir>/<partition>.jsonl.gz' with a server-side cursor.
+        Writes to a temp file first, so a crash never leaves a truncated archive behind.
+        Returns: (path, row_count)
+        """
+        archive_dir = archive_dir or settings.OUTBOX_ARCHIVE_DIR
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{partition}.jsonl.gz")
+        tmp_path = f"{path}.tmp"
+
+        rows = 0
+        stream = await db.stream(
+            text(f"SELECT * FROM {partition} ORDER BY txid, seq").execution_options(yield_per=chunk_size)
+        )
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+            async for chunk in stream.mappings().partitions(chunk_size):
+                for row in chunk:
+                    fh.write(json.dumps(dict(row), default=str) + "\n")
+                rows += len(chunk)
+
+        os.replace(tmp_path, path)
+        return path, rows
+
+    @staticmethod
+    async def drop_partition(db: AsyncSession, partition: str):
+        """Detaches and drops a whole partition (metadata-only, no row deletes)."""
+        await db.execute(text(f"ALTER TABLE system_outbox DETACH PARTITION {partition}"))
+        await db.execute(text(f"DROP TABLE {partition}"))
+        await db.commit()
+
+    @staticmethod
+    async def run(db: AsyncSession, retention_days: int = None, archive: bool = None) -> Dict[str, List[str]]:
+        """
+        One janitor pass. Returns a summary of created / archived / dropped / kept partitions.
+        """
+        retention_days = settings.OUTBOX_RETENTION_DAYS if retention_days is None else retention_days
+        archive = settings.OUTBOX_ARCHIVE_ENABLED if archive is None else archive
+        cutoff = datetime.utcnow().date() - timedelta(days=retention_days)
+
+        summary = {"created": [], "archived": [], "dropped": [], "kept": [], "drained": 0}
+        try:
+            summary["drained"] = await OutboxRetention.drain_default(db)
+        except Exception as e:
+            logger.error(f"🔥 [Retention] Failed to drain {DEFAULT_PARTITION}: {e}")
+        summary["created"] = await OutboxRetention.ensure_partitions(db)
+
+        for name, day in await OutboxRetention.list_partitions(db):
+            if day >= cutoff:
+                continue
+
+            if not await OutboxRetention.is_fully_consumed(db, name):
+                logger.warning(f"⏳ [Retention] {name} is past retention but not yet consumed by every cursor. Keeping.")
+                summary["kept"].append(name)
+                continue
+
+            try:
+                if archive:
+                    path, rows = await OutboxRetention.archive_partition(db, name)
+                    logger.info(f"📦 [Retention] Archived {name}: {rows} rows -> {path}")
+                    summary["archived"].append(name)
+
+                await OutboxRetention.drop_partition(db, name)
+                logger.info(f"🗑️ [Retention] Dropped {name}")
+                summary["dropped"].append(name)
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"🔥 [Retention] Failed to retire {name}: {e}")
+                summary["kept"].append(name)
+
+        # Consumer inbox ids outlive their outbox rows only for the same retention window.
+        try:
+            result = await db.execute(
+                text("DELETE FROM system_consumer_inbox WHERE processed_at < :cutoff"),
+                {"cutoff": datetime.combine(cutoff, datetime.min.time())}
+            )
+            await db.commit()
+            if result.rowcount:
+                logger.info(f"🧽 [Retention] Pruned {result.rowcount} consumer inbox entries.")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"🔥 [Retention] Failed to prune the consumer inbox: {e}")
+
+        return summary
+
+async def run_pass() -> Optional[Dict[str, List[str]]]:
+    """One janitor pass under the cluster-wide advisory lock. None if another process holds it."""
+    async with engine.connect() as lock_conn:
+        locked = (await lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": JANITOR_LOCK_KEY})).scalar()
+        if not locked:
+            logger.info("⏭️ [Retention] Another janitor is running. Skipping this pass.")
+            return None
+        try:
+            async with AsyncSessionLocal() as db:
+                return await OutboxRetention.run(db)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": JANITOR_LOCK_KEY})
+            await lock_conn.commit()
+
+async def prepare_outbox():
+    """
+    Startup hook for every outbox writer / reader process. Never fatal.
+    Waits for the janitor lock: processes starting together (API, Relay, Worker, or both in the
+    single-node runner) would otherwise race on the same CREATE TABLE ... PARTITION OF.
+    """
+    try:
+        async with engine.connect() as lock_conn:
+            await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": JANITOR_LOCK_KEY})
+            try:
+                async with AsyncSessionLocal() as db:
+                    created = await OutboxRetention.prepare(db)
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": JANITOR_LOCK_KEY})
+                await lock_conn.commit()
+        logger.info(f"🗓️ [Retention] Outbox partitions ready ({len(created)} ensured).")
+    except Exception as e:
+        logger.error(f"🔥 [Retention] Could not prepare outbox partitions: {e}")
+
+async def run_forever(once: bool = False):
+    logger.info("🧹 [Retention] Outbox janitor started.")
+    while True:
+        try:
+            summary = await run_pass()
+            if summary is not None:
+                logger.info(
+                    f"✅ [Retention] Pass complete. drained={summary['drained']} created={len(summary['created'])} "
+                    f"archived={len(summary['archived'])} dropped={len(summary['dropped'])} kept={len(summary['kept'])}"
+                )
+        except Exception as e:
+            logger.error(f"🔥 [Retention] Pass failed: {e}", exc_info=True)
+
+        if once:
+            return
+        await asyncio.sleep(settings.OUTBOX_RETENTION_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [RETENTION] %(message)s")
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    try:
+        asyncio.run(run_forever(once="--once" in sys.argv))
+    except KeyboardInterrupt:
+        pass
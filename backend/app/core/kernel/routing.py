@@ -0,0 +1,96 @@
+# FILEPATH: backend/app/core/kernel/routing.py
+# @file: Topic Router & Event Headers
+# @author: The Engineer
+# @description: Decides which topic an outbox event is published to, and which metadata travels
+#              as Kafka headers (event_name, domain, trace_id, schema version, event id).
+#              Consumers read the headers to filter and route without decoding the body.
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger("kernel.routing")
+
+# Header names (values are UTF-8 bytes)
+HEADER_EVENT_NAME = "event_name"
+HEADER_DOMAIN = "domain"
+HEADER_TRACE_ID = "trace_id"
+HEADER_SCHEMA_VERSION = "schema_version"
+HEADER_EVENT_ID = "event_id"
+
+DEFAULT_SCHEMA_VERSION = "1.0.0"
+
+class TopicRouter:
+    """
+    Routes event names to topics '{KAFKA_TOPIC_PREFIX}.{suffix}'.
+
+    ROUTES (KAFKA_TOPIC_ROUTES):
+        {"USER:": "user", "WORKFLOW:": "workflow", "USER:LOGIN": "audit"}
+    - 'USER:LOGIN' matches that event name only (wins over prefixes).
+    - 'USER:'      matches the whole domain (longest prefix wins).
+    Unrouted events go to '{prefix}.events'.
+    """
+
+    def __init__(self, prefix: Optional[str] = None, routes: Optional[Dict[str, str]] = None):
+        self.prefix = prefix or getattr(settings, "KAFKA_TOPIC_PREFIX", "flodock")
+        routes = settings.KAFKA_TOPIC_ROUTES if routes is None else routes
+        self.default_topic = f"{self.prefix}.events"
+
+        self._exact: Dict[str, str] = {}
+        self._prefixes: List[Tuple[str, str]] = []
+        for pattern, suffix in routes.items():
+            topic = f"{self.prefix}.{suffix}"
+            if pattern.endswith(":"):
+                self._prefixes.append((pattern, topic))
+            else:
+                self._exact[pattern] = topic
+        self._prefixes.sort(key=lambda item: len(item[0]), reverse=True)
+        self._cache: Dict[str, str] = {}
+
+    def topic_for(self, event_name: str) -> str:
+        topic = self._cache.get(event_name)
+        if topic is None:
+            topic = self._exact.get(event_name)
+            if topic is None:
+                topic = next((t for p, t in self._prefixes if event_name.startswith(p)), self.default_topic)
+            self._cache[event_name] = topic
+        return topic
+
+    def topics(self) -> List[str]:
+        """Every topic this router can publish to (default first)."""
+        topics = [self.default_topic]
+        for topic in list(self._exact.values()) + [t for _, t in self._prefixes]:
+            if topic not in topics:
+                topics.append(topic)
+        return topics
+
+def event_domain(event_name: str, payload: Any = None) -> str:
+    if isinstance(payload, dict) and payload.get("domain"):
+        return str(payload["domain"])
+    return event_name.split(":", 1)[0]
+
+def schema_version(payload: Any) -> str:
+    """Kernel envelopes carry 'meta.version'; CDC payloads are the baseline schema."""
+    if isinstance(payload, dict) and isinstance(payload.get("meta"), dict):
+        return str(payload["meta"].get("version") or DEFAULT_SCHEMA_VERSION)
+    return DEFAULT_SCHEMA_VERSION
+
+def event_headers(event) -> List[Tuple[str, bytes]]:
+    """Kafka headers of an outbox event."""
+    headers = [
+        (HEADER_EVENT_NAME, event.event_name.encode("utf-8")),
+        (HEADER_DOMAIN, event_domain(event.event_name, event.payload).encode("utf-8")),
+        (HEADER_SCHEMA_VERSION, schema_version(event.payload).encode("utf-8")),
+        (HEADER_EVENT_ID, str(event.id).encode("utf-8")),
+    ]
+    if event.trace_id:
+        headers.append((HEADER_TRACE_ID, event.trace_id.encode("utf-8")))
+    return headers
+
+def read_headers(headers: Optional[Sequence[Tuple[str, bytes]]]) -> Dict[str, str]:
+    """Decodes record headers into a dict (later duplicates win)."""
+    return {key: value.decode("utf-8") for key, value in (headers or ()) if value is not None}
+
+# Global Instance
+topic_router = TopicRouter()
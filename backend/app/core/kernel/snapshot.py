@@ -0,0 +1,103 @@
+# FILEPATH: backend/app/core/kernel/snapshot.py
+# @file: Entity Snapshots (Interceptor)
+# @author: The Engineer
+# @description: One pass over an object per flush, shared by Governance, Workflow and CDC.
+#              - Column keys are resolved once per mapped class (no mapper walk per object).
+#              - Only modified attributes (InstanceState.committed_state) are diffed,
+#                relationships are not: they never reach the CDC payload as data.
+#              - The JSON-ready CDC changeset is built in the same pass as the raw one.
+
+from datetime import datetime, date
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+
+# Mapped class -> column attribute keys (mapper order)
+_COLUMN_KEYS: Dict[type, Tuple[str, ...]] = {}
+
+def column_keys(obj: Any) -> Tuple[str, ...]:
+    cls = type(obj)
+    keys = _COLUMN_KEYS.get(cls)
+    if keys is None:
+        keys = tuple(attr.key for attr in inspect(cls).column_attrs)
+        _COLUMN_KEYS[cls] = keys
+    return keys
+
+def json_friendly(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {k: json_friendly(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [json_friendly(v) for v in data]
+    elif isinstance(data, (datetime, date)):
+        return data.isoformat()
+    return data
+
+def _json_value(value: Any) -> Any:
+    # Scalars (the common case) are returned as-is, containers are copied.
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json_friendly(value)
+
+class EntitySnapshot:
+    """
+    changeset:  { key: {"old": .., "new": ..} }  (raw values, Policy envelope / Workflow)
+    cdc_changes: same shape, JSON-ready             (Outbox payload)
+    host / frozen: column values, built on first use (the fast path never needs them)
+    """
+
+    __slots__ = ("obj", "changeset", "cdc_changes", "_host")
+
+    def __init__(self, obj: Any, changeset: Dict[str, dict], cdc_changes: Dict[str, dict]):
+        self.obj = obj
+        self.changeset = changeset
+        self.cdc_changes = cdc_changes
+        self._host: Optional[Dict[str, Any]] = None
+
+    @property
+    def host(self) -> Dict[str, Any]:
+        if self._host is None:
+            obj = self.obj
+            self._host = {key: getattr(obj, key) for key in column_keys(obj)}
+        return self._host
+
+    @property
+    def frozen(self) -> SimpleNamespace:
+        """Detached read-only view (context providers, sidecar lookups)."""
+        return SimpleNamespace(**self.host)
+
+def changeset_of(obj: Any) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """(raw changeset, JSON-ready changeset) of the column attributes changed since load."""
+    state = inspect(obj)
+    keys = column_keys(obj)
+    changeset: Dict[str, dict] = {}
+    cdc_changes: Dict[str, dict] = {}
+
+    if state.key is None:
+        # Pending: every value that was set is an addition.
+        values = state.dict
+        for key in keys:
+            if key in values:
+                new = values[key]
+                changeset[key] = {"old": None, "new": new}
+                cdc_changes[key] = {"old": None, "new": _json_value(new)}
+        return changeset, cdc_changes
+
+    committed = state.committed_state
+    if not committed:
+        return changeset, cdc_changes
+    attrs = state.attrs
+    for key in keys:
+        if key not in committed:
+            continue
+        history = attrs[key].history
+        if history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            changeset[key] = {"old": old, "new": new}
+            cdc_changes[key] = {"old": _json_value(old), "new": _json_value(new)}
+    return changeset, cdc_changes
+
+def take_snapshot(obj: Any) -> EntitySnapshot:
+    changeset, cdc_changes = changeset_of(obj)
+    return EntitySnapshot(obj, changeset, cdc_changes)
@@ -3,23 +3,37 @@
 # @author The Engineer
 # @description The Pulse Engine. Polls the Transactional Outbox and executes Side Effects.
 #              Guarantees "At Least Once" delivery.
+# UPDATED: Woken by Postgres NOTIFY; adaptive polling is only the fallback.
+# UPDATED: Reads the outbox log through its own 'worker' checkpoints. No longer flips row status,
+#          so it no longer competes with the Relay for events.
+# UPDATED: Handlers come from the EventHandlerRegistry; partition_keys run concurrently (bounded),
+#          events of one partition_key still run in log order.
+# UPDATED: Failed events are retried with backoff (per shard), then dead-lettered.
+# UPDATED: Prepares the outbox partitions at startup and schedules the retention janitor.
+# UPDATED: A failed event parks only its partition_key; the rest of the shard keeps flowing.
 
 import asyncio
 import logging
 import sys
 import os
-import json
-from datetime import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 
 # ⚡ BOOTSTRAP PATH
 # Ensure we can import from the root 'backend' folder
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../.."))
 
-from sqlalchemy import select, update, func
-from sqlalchemy.ext.asyncio import AsyncSession
-
+from app.core.config import settings
 from app.core.database.session import AsyncSessionLocal
 from app.core.kernel.models import SystemOutbox
+from app.core.kernel.outbox import OutboxCursor
+from app.core.kernel.notify import OutboxWakeup
+from app.core.kernel.handlers import event_handlers
+from app.core.kernel.retention import prepare_outbox, run_forever as run_janitor
+
+# ⚡ HANDLER REGISTRATION (The Handshake)
+# Importing these modules executes their @event_handlers.on decorators.
+import app.domains.auth.handlers
 
 # Setup Logging
 logging.basicConfig(
@@ -30,88 +44,107 @@ logging.basicConfig(
 logger = logging.getLogger("flodock.worker")
 
 class BackgroundWorker:
-    def __init__(self):
+    def __init__(self, concurrency: int = None):
         self.is_running = True
-        self.poll_interval = 2.0 # Seconds
+        self.wakeup = OutboxWakeup()
+        self.cursor = OutboxCursor("worker", batch_size=settings.WORKER_BATCH_SIZE)
+        self.handlers = event_handlers
+        # Bounded pool: at most 'concurrency' partition_keys execute at once.
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._janitor: Optional[asyncio.Task] = None
 
     async def start(self):
         logger.info("💓 The Heart is beating. Waiting for events...")
-        
-        while self.is_running:
-            try:
-                await self.process_batch()
-            except Exception as e:
-                logger.error(f"🔥 Arrhythmia (Crash): {e}", exc_info=True)
-                # Don't crash the loop, just pause
-                await asyncio.sleep(5)
-            
-            await asyncio.sleep(self.poll_interval)
-
-    async def process_batch(self):
+        await prepare_outbox()
+        if settings.OUTBOX_RETENTION_IN_WORKER:
+            self._janitor = asyncio.create_task(run_janitor())
+        await self.wakeup.start()
         async with AsyncSessionLocal() as db:
-            # 1. FETCH PENDING (Limit 10 to prevent clogging)
-            stmt = select(SystemOutbox).where(
-                SystemOutbox.status == 'PENDING'
-            ).order_by(SystemOutbox.created_at).limit(10)
-            
-            result = await db.execute(stmt)
-            events = result.scalars().all()
+            await self.cursor.open(db)
 
-            if not events:
-                return # Pulse normal.
+        try:
+            while self.is_running:
+                processed = 0
+                try:
+                    processed = await self.process_batch()
+                except Exception as e:
+                    logger.error(f"🔥 Arrhythmia (Crash): {e}", exc_info=True)
+                    # Don't crash the loop, just pause
+                    await asyncio.sleep(5)
+
+                await self.wakeup.wait(had_work=processed > 0)
+        finally:
+            if self._janitor:
+                self._janitor.cancel()
+            await self.wakeup.stop()
+            async with AsyncSessionLocal() as db:
+                await self.cursor.close(db)
+
+    async def process_batch(self) -> int:
+        # 1. READ FORWARD FROM OUR CHECKPOINTS
+        async with AsyncSessionLocal() as db:
+            batches = await self.cursor.poll(db)
 
-            logger.info(f"⚡ Processing batch of {len(events)} events...")
+        events = [event for shard_events in batches.values() for event in shard_events]
+        if not events:
+            return 0 # Pulse normal.
 
-            for event in events:
-                await self.handle_event(db, event)
+        logger.info(f"⚡ Processing batch of {len(events)} events...")
+
+        # 2. EXECUTE (concurrent across partition_keys, in log order within one)
+        succeeded, errors = await self.dispatch(events)
+
+        # 3. CHECKPOINT (a failed event parks its partition_key until the next attempt)
+        async with AsyncSessionLocal() as db:
+            await self.cursor.settle(db, batches, succeeded, errors)
 
-            await db.commit()
+        return len(events)
 
-    async def handle_event(self, db: AsyncSession, event: SystemOutbox):
+    async def dispatch(self, events: List[SystemOutbox]) -> Tuple[Set[int], Dict[int, str]]:
         """
-        The Switchboard. Routes events to their specific handlers.
+        Splits the batch into per-partition_key lanes and runs the lanes on the bounded pool.
+        Ordering: a lane is sequential and stops at its first failure (later events of that key
+        wait for the retry). The shard lease guarantees no other instance holds the same key.
+        Returns: (succeeded_ids, errors {id: error})
         """
-        start_time = datetime.utcnow()
+        lanes: Dict[str, List[SystemOutbox]] = defaultdict(list)
+        for event in events:
+            lanes[event.partition_key].append(event)
+
+        succeeded: Set[int] = set()
+        errors: Dict[int, str] = {}
+        await asyncio.gather(*(self._run_lane(lane, succeeded, errors) for lane in lanes.values()))
+        return succeeded, errors
+
+    async def _run_lane(self, lane: List[SystemOutbox], succeeded: Set[int], errors: Dict[int, str]):
+        async with self._slots:
+            for event in lane:
+                error = await self.handle_event(event)
+                if error is not None:
+                    errors[event.id] = error
+                    return
+                succeeded.add(event.id)
+
+    async def handle_event(self, event: SystemOutbox) -> Optional[str]:
+        """
+        The Switchboard. Routes events to their registered handlers.
+        Returns None on success, or the error message on failure.
+        """
+        handlers = self.handlers.resolve(event.event_name)
+        if not handlers:
+            return None
+
         try:
-            # ⚡ ROUTING LOGIC
             logger.info(f"   ▶️  Executing: {event.event_name} (ID: {event.id})")
-            
-            # --- HANDLER: WORKFLOW TRANSITIONS ---
-            if event.event_name.startswith("WORKFLOW:"):
-                await self._handle_workflow_action(event)
-            
-            # --- HANDLER: AUDIT ---
-            elif event.event_name.startswith("USER:"):
-                 logger.info(f"      👤 Audit Logged: {event.payload.get('data', {}).get('email')}")
-
-            # --- MARK SUCCESS ---
-            event.status = 'PROCESSED'
-            event.processed_at = datetime.utcnow()
-            event.error_log = None # Clear previous errors if any
+            for handler in handlers:
+                await handler(event)
+            return None
 
         except Exception as e:
-            # --- MARK FAILURE ---
-            logger.error(f"      ❌ Failed: {e}")
-            event.status = 'FAILED'
-            event.retry_count += 1
-            event.error_log = str(e)
-    
-    async def _handle_workflow_action(self, event: SystemOutbox):
-        """
-        Executes business logic triggered by State Changes.
-        """
-        action = event.payload.get('data', {}).get('action')
-        entity_id = event.entity_id
-        
-        if action == 'send_email':
-            # In a real app, this calls SendGrid/SES
-            logger.info(f"      📧 [MOCK] Sending Email for Entity #{entity_id}")
-            
-        elif action == 'notify_slack':
-            logger.info(f"      💬 [MOCK] Posting to Slack for Entity #{entity_id}")
-            
-        else:
-            logger.warning(f"      ⚠️  Unknown Action: {action}")
+            # --- FAILURE ---
+            logger.error(f"      ❌ Failed: {event.event_name} (ID: {event.id}): {e}")
+            return f"{type(e).__name__}: {e}"
 
 # --- ENTRY POINT ---
 if __name__ == "__main__":
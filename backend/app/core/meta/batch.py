@@ -0,0 +1,157 @@
+# FILEPATH: backend/app/core/meta/batch.py
+# @file: Column-wise Rule Evaluation (Batch Mode)
+# @author: The Engineer
+# @description: Evaluates one compiled rule over many envelopes at once (PolicyEngine.evaluate_batch).
+#              Simple rules (field <op> literal, combined with &&, ||, !) run column-wise: each field
+#              path is extracted once per batch and compared as a column (NumPy for numeric ordering
+#              when installed). Every other rule falls back to per-envelope search().
+#              Masks are three-valued (True / False / CRASH) so a rule that would raise for one
+#              entity in PolicyEngine.evaluate produces the same "Rule crashed" warning here.
+
+import logging
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# ⚡ DEPENDENCY CHECK: NumPy is optional (pure-Python columns otherwise)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from app.core.kernel.actions import LogicResult
+from app.core.meta.compiled import CompiledRule
+from app.core.meta.compiler import _comparable, _equals, _get, _is_false, _is_number
+
+logger = logging.getLogger("core.meta.batch")
+
+CRASH = object()    # Mask value: evaluating the rule raised for this entity
+FLOAT_SAFE = 2 ** 53
+
+Mask = List[Any]
+Columns = Dict[Tuple[str, ...], List[Any]]
+
+@dataclass
+class BatchResult:
+    results: List[LogicResult]
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+_ORDERING = {'lt': operator.lt, 'gt': operator.gt, 'lte': operator.le, 'gte': operator.ge}
+
+def _path(node: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    if node['type'] == 'field':
+        return (node['value'],)
+    if node['type'] == 'subexpression' and all(child['type'] == 'field' for child in node['children']):
+        return tuple(child['value'] for child in node['children'])
+    return None
+
+def _column(keys: Tuple[str, ...], envelopes: Sequence[Any], columns: Columns) -> List[Any]:
+    """Field path over every envelope, extracted once per batch (shared by all rules)."""
+    column = columns.get(keys)
+    if column is None:
+        column = []
+        append = column.append
+        for value in envelopes:
+            for key in keys:
+                value = _get(value, key)
+            append(value)
+        columns[keys] = column
+    return column
+
+def _compare_numeric(column: List[Any], op: str, literal: Any) -> Optional[Mask]:
+    """NumPy path for '<field> <ordering> <number>'. None if the column is not plain numbers."""
+    if not HAS_NUMPY or not _is_number(literal) or abs(literal) >= FLOAT_SAFE:
+        return None
+    nan = float("nan")
+    values = []
+    for v in column:
+        if _is_number(v):
+            if abs(v) >= FLOAT_SAFE:
+                return None     # Precision: compare in Python
+            values.append(v)
+        elif isinstance(v, str):
+            return None         # str <op> number raises: needs per-entity CRASH markers
+        else:
+            values.append(nan)  # Not comparable -> None -> no match
+    return _ORDERING[op](np.asarray(values, dtype=float), literal).tolist()
+
+def _compare(column: List[Any], op: str, literal: Any, literal_left: bool) -> Mask:
+    if op == 'eq':
+        return [_equals(literal, v) if literal_left else _equals(v, literal) for v in column]
+    if op == 'ne':
+        return [not (_equals(literal, v) if literal_left else _equals(v, literal)) for v in column]
+
+    if not literal_left:
+        mask = _compare_numeric(column, op, literal)
+        if mask is not None:
+            return mask
+
+    compare = _ORDERING[op]
+    literal_ok = _comparable(literal)
+    mask: Mask = []
+    for v in column:
+        if not (literal_ok and _comparable(v)):
+            mask.append(None)
+            continue
+        try:
+            mask.append(compare(literal, v) if literal_left else compare(v, literal))
+        except Exception:
+            mask.append(CRASH)
+    return mask
+
+def _mask(node: Dict[str, Any], envelopes: Sequence[Any], columns: Columns) -> Optional[Mask]:
+    """Column-wise truth values of a boolean rule, or None if the rule is not 'simple'."""
+    kind = node['type']
+    if kind == 'comparator':
+        op = node['value']
+        if op not in ('eq', 'ne') and op not in _ORDERING:
+            return None
+        left, right = node['children']
+        left_path, right_path = _path(left), _path(right)
+        if left_path is not None and right['type'] == 'literal':
+            return _compare(_column(left_path, envelopes, columns), op, right['value'], False)
+        if right_path is not None and left['type'] == 'literal':
+            return _compare(_column(right_path, envelopes, columns), op, left['value'], True)
+        return None
+
+    if kind in ('and_expression', 'or_expression'):
+        left = _mask(node['children'][0], envelopes, columns)
+        if left is None:
+            return None
+        right = _mask(node['children'][1], envelopes, columns)
+        if right is None:
+            return None
+        if kind == 'and_expression':
+            # Right side is only evaluated (and can only crash) if the left side is truthy
+            return [l if (l is CRASH or _is_false(l)) else r for l, r in zip(left, right)]
+        return [r if (l is not CRASH and _is_false(l)) else l for l, r in zip(left, right)]
+
+    if kind == 'not_expression':
+        child = _mask(node['children'][0], envelopes, columns)
+        if child is None:
+            return None
+        return [c if c is CRASH else not c for c in child]
+
+    return None
+
+def rule_mask(rule: CompiledRule, envelopes: Sequence[Any], columns: Columns) -> Tuple[Mask, bool]:
+    """
+    Returns (mask, vectorised). mask[i] is the rule's result for envelope i (truthy = match)
+    or CRASH if evaluating it raised.
+    """
+    if rule.error is None:
+        parsed = getattr(rule.expression, "parsed", None)
+        if isinstance(parsed, dict):
+            mask = _mask(parsed, envelopes, columns)
+            if mask is not None:
+                return mask, True
+
+    mask = []
+    for envelope in envelopes:
+        try:
+            mask.append(rule.search(envelope))
+        except Exception:
+            mask.append(CRASH)
+    return mask, False
@@ -0,0 +1,248 @@
+# FILEPATH: backend/app/core/meta/cache.py
+# @file: Policy Binding Cache
+# @author: The Engineer
+# @description: Per-domain cache of the effective policy set (active bindings -> active policies,
+#              priority ordered, compiled). Saves stop re-querying PolicyBinding/PolicyDefinition.
+#              DomainCache is the shared base (also used by the state machine registry).
+#              INVALIDATION:
+#              1. Local: MetaService.invalidate_cache() drops the domain (or ALL) after commit.
+#              2. Cluster: the same call fires pg_notify(POLICY_CACHE_CHANNEL, domain); every process
+#                 running a PolicyCacheListener drops its copy.
+#              3. Safety net: entries expire after POLICY_CACHE_TTL_SECONDS (processes without a
+#                 listener, direct DB edits, seeds).
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, desc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.meta.compiled import CompiledPolicy, compile_policy
+from app.core.meta.models import PolicyBinding
+
+logger = logging.getLogger("core.meta.cache")
+
+ALL_DOMAINS = "ALL"
+
+class DomainCache:
+    """
+    Base for per-domain caches (policies, state machines).
+    Thread-safe: read by the AsyncBridge sidecar loops, invalidated from the API loop.
+    A load that races an invalidation of the same domain is returned but not stored.
+    Subclasses implement 'load(db, domain_keys)'.
+    """
+
+    name = "domain"
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.POLICY_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        # Called with the domain after every invalidation (derived caches, e.g. the capability map)
+        self._subscribers: List[Callable[[str], None]] = []
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _token(self, domain: str) -> Tuple[int, int]:
+        return self._epoch, self._versions.get(domain, 0)
+
+    async def get_many(self, db: AsyncSession, domain_keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Returns: { domain_key: entry } for every requested key.
+        Misses are loaded together in ONE call to 'load'.
+        """
+        now = time.monotonic()
+        result: Dict[str, Any] = {}
+        missing = []
+
+        with self._lock:
+            for key in dict.fromkeys(domain_keys):
+                entry = self._entries.get(key)
+                if entry is not None and (not self.ttl or now - entry[0] < self.ttl):
+                    result[key] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(key)
+                    self.misses += 1
+            tokens = {key: self._token(key) for key in missing}
+
+        if missing:
+            loaded = await self.load(db, missing)
+            with self._lock:
+                for key, value in loaded.items():
+                    if self._token(key) == tokens[key]:
+                        self._entries[key] = (now, value)
+            result.update(loaded)
+
+        return result
+
+    async def load(self, db: AsyncSession, domain_keys: Sequence[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def subscribe(self, callback: Callable[[str], None]):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def invalidate(self, domain: str = ALL_DOMAINS):
+        """Drops one domain ('ALL' = everything). Local process only."""
+        with self._lock:
+            if domain == ALL_DOMAINS:
+                self._epoch += 1
+                self._entries.clear()
+            else:
+                self._versions[domain] = self._versions.get(domain, 0) + 1
+                self._entries.pop(domain, None)
+            self.invalidations += 1
+        for callback in self._subscribers:
+            callback(domain)
+
+    async def broadcast(self, domain: str = ALL_DOMAINS):
+        """Invalidates locally and tells the other processes (call AFTER the change is committed)."""
+        self.invalidate(domain)
+        await notify_invalidation(domain)
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "domains": len(self._entries),
+            "ttl_seconds": self.ttl
+        }
+
+async def notify_invalidation(domain: str):
+    """pg_notify(POLICY_CACHE_CHANNEL, domain): every listening process drops the domain from all its caches."""
+    if not settings.POLICY_CACHE_NOTIFY_ENABLED or not make_url(settings.DATABASE_URL).drivername.startswith("postgresql"):
+        return
+    # Imported here: the session module is not needed by cache readers on the sidecar loops.
+    from app.core.database.session import engine
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_notify(:channel, :domain)"), {"channel": settings.POLICY_CACHE_CHANNEL, "domain": domain})
+            await conn.commit()
+    except Exception as e:
+        # Other processes converge at the latest after POLICY_CACHE_TTL_SECONDS.
+        logger.warning(f"⚠️ [PolicyCache] Invalidation broadcast failed for '{domain}': {e}")
+
+class PolicyCache(DomainCache):
+    """Entries: (CompiledPolicy, ...) per domain, highest binding priority first."""
+
+    name = "policies"
+
+    async def get_many(self, db: AsyncSession, domain_keys: Iterable[str]) -> Dict[str, Sequence[CompiledPolicy]]:
+        return await super().get_many(db, domain_keys)
+
+    async def load(self, db: AsyncSession, domain_keys: Sequence[str]) -> Dict[str, Tuple[CompiledPolicy, ...]]:
+        """⚡ DB IO: Active bindings of the domains, highest priority first, compiled."""
+        policies = {key: [] for key in domain_keys}
+        stmt = select(PolicyBinding).options(
+            selectinload(PolicyBinding.policy)
+        ).where(
+            PolicyBinding.target_domain.in_(list(domain_keys)),
+            PolicyBinding.is_active == True
+        ).order_by(desc(PolicyBinding.priority))
+
+        bindings = (await db.execute(stmt)).scalars().all()
+        for b in bindings:
+            if b.policy_id and b.policy and b.policy.is_active:
+                policies[b.target_domain].append(compile_policy(b.policy))
+        return {key: tuple(items) for key, items in policies.items()}
+
+class PolicyCacheListener:
+    """
+    LISTEN side of the cluster invalidation. One dedicated asyncpg connection per process.
+    A notification drops the domain from every attached cache.
+    If the connection drops, the caches are flushed (notifications may have been missed)
+    and the listener reconnects with backoff.
+    """
+
+    def __init__(self, cache: DomainCache, channel: Optional[str] = None):
+        self.caches: List[DomainCache] = [cache]
+        self.channel = channel or settings.POLICY_CACHE_CHANNEL
+        self._conn = None
+        self._reconnect: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    @property
+    def is_listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def attach(self, cache: DomainCache):
+        if cache not in self.caches:
+            self.caches.append(cache)
+
+    def _invalidate(self, domain: str):
+        for cache in self.caches:
+            cache.invalidate(domain)
+
+    async def start(self):
+        if not settings.POLICY_CACHE_NOTIFY_ENABLED:
+            return
+        self._stopped = False
+        await self._connect()
+
+    async def _connect(self) -> bool:
+        url = make_url(settings.DATABASE_URL)
+        if not url.drivername.startswith("postgresql"):
+            return False
+        try:
+            import asyncpg
+            dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+            self._conn = await asyncpg.connect(dsn)
+            await self._conn.add_listener(self.channel, self._on_notify)
+            self._conn.add_termination_listener(self._on_terminate)
+            logger.info(f"👂 [PolicyCache] LISTEN '{self.channel}' established.")
+            return True
+        except Exception as e:
+            self._conn = None
+            logger.warning(f"⚠️ [PolicyCache] LISTEN unavailable ({e}). Relying on TTL ({settings.POLICY_CACHE_TTL_SECONDS}s).")
+            return False
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._invalidate(payload or ALL_DOMAINS)
+        logger.debug(f"🔥 [PolicyCache] Remote invalidation: {payload or ALL_DOMAINS}")
+
+    def _on_terminate(self, connection):
+        if self._stopped:
+            return
+        logger.warning("⚠️ [PolicyCache] LISTEN connection lost. Flushing cache and reconnecting...")
+        self._conn = None
+        self._invalidate(ALL_DOMAINS)
+        if self._reconnect is None or self._reconnect.done():
+            self._reconnect = asyncio.get_running_loop().create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        delay = 1.0
+        while not self._stopped and not await self._connect():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+        # Anything changed while we were deaf is unknown.
+        self._invalidate(ALL_DOMAINS)
+
+    async def stop(self):
+        self._stopped = True
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        if self._conn is not None:
+            try:
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+# Global Instances
+policy_cache = PolicyCache()
+policy_cache_listener = PolicyCacheListener(policy_cache)
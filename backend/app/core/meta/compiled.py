@@ -0,0 +1,275 @@
+# FILEPATH: backend/app/core/meta/compiled.py
+# @file: Compiled Policies
+# @author: The Engineer
+# @description: Immutable, pre-parsed form of a PolicyDefinition.
+#              JMESPath expressions are compiled once (when the policy enters the cache),
+#              not on every save. Detached from the ORM: safe to share across threads/loops.
+# UPDATED: Bounded LRU caches (hit-rate stats): parsed expressions keyed by their source, and
+#          compiled programs keyed by policy id + version. Value references (e.g. 'actor.id')
+#          are precompiled too, so evaluation never parses a string.
+# UPDATED: Native backend (compiler.py). Expressions in the supported subset run as Python
+#          closures; the rest keeps the JMESPath interpreter (POLICY_NATIVE_COMPILER).
+# UPDATED: Read-sets. Each rule records the envelope paths it reads (condition + value reference);
+#          policies tagged 'eval:changeset' skip rules untouched by an update's changeset.
+# UPDATED: Running cost/selectivity per rule (RuleStats) for the early-exit probe order.
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+import jmespath
+
+from app.core.config import settings
+from app.core.meta.compiler import Path, compile_native, read_paths
+from app.core.meta.constants import PolicyResolutionStrategy, RuleActionType, POLICY_TAG_CHANGESET_AWARE
+
+logger = logging.getLogger("core.meta.compiled")
+
+# Value references resolved against the envelope (matches the 'Value Source' of the Policy Editor)
+VALUE_ROOTS = ('host.', 'meta.', 'system.', 'actor.', 'session.', 'context.')
+
+# Envelope namespaces that only change through the entity's own changeset.
+# Everything else (actor, system, session, changeset, context providers) is volatile.
+STABLE_NAMESPACES = frozenset({'host', 'meta'})
+
+class LRUCache:
+    """Small thread-safe LRU with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any], valid: Optional[Callable[[Any], bool]] = None) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None and (valid is None or valid(value)):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Built outside the lock: compiling is CPU work, a duplicate build is harmless.
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            return list(self._data.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "max_size": self.maxsize
+        }
+
+expression_cache = LRUCache(settings.POLICY_EXPRESSION_CACHE_SIZE)
+program_cache = LRUCache(settings.POLICY_PROGRAM_CACHE_SIZE)
+backend_counts = {"native": 0, "interpreted": 0}
+
+def _build_expression(source: str) -> Any:
+    parsed = jmespath.compile(source)
+    if settings.POLICY_NATIVE_COMPILER:
+        native = compile_native(source, parsed.parsed)
+        if native is not None:
+            backend_counts["native"] += 1
+            return native
+    backend_counts["interpreted"] += 1
+    return parsed
+
+def compile_expression(source: str) -> Any:
+    """
+    Source -> object with 'search(data)' (NativeExpression or jmespath ParsedResult),
+    memoized by source text. Raises on syntax errors (nothing is cached then).
+    """
+    return expression_cache.get_or_build(source, lambda: _build_expression(source))
+
+def compile_value(value: Any) -> Any:
+    """Parsed expression for a value reference ('actor.id'), None for literals or unparsable strings."""
+    if not isinstance(value, str) or not value.startswith(VALUE_ROOTS):
+        return None
+    try:
+        return compile_expression(value)
+    except Exception:
+        # Falls back to the string literal (as before)
+        return None
+
+class RuleStats:
+    """Running evaluation cost (EWMA, ns) and match rate of one compiled rule. Lock-free: approximate."""
+
+    __slots__ = ("calls", "matches", "cost_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.matches = 0
+        self.cost_ns = 0.0
+
+    def record(self, elapsed_ns: int, matched: bool):
+        self.calls += 1
+        self.matches += matched
+        self.cost_ns = elapsed_ns if self.calls == 1 else self.cost_ns * 0.9 + elapsed_ns * 0.1
+
+    @property
+    def rank(self) -> float:
+        """Expected cost per decisive match (lower runs first). Unmeasured rules go first, once."""
+        if not self.calls:
+            return 0.0
+        match_rate = (self.matches + 1) / (self.calls + 2)
+        return self.cost_ns / match_rate
+
+@dataclass(frozen=True)
+class CompiledRule:
+    logic: str
+    action: str
+    message: str
+    value: Any = None
+    target: Optional[str] = None
+    expression: Any = None              # jmespath ParsedResult
+    error: Optional[Exception] = None   # Compile failure (re-raised at evaluation: Fail-Open warning)
+    value_expression: Any = None        # Parsed 'value' if it is a reference (e.g. 'actor.id')
+    reads: Optional[FrozenSet[Path]] = None   # Envelope paths read (None = unknown: always evaluate)
+    stats: RuleStats = field(default_factory=RuleStats, compare=False, repr=False)
+
+    def search(self, data: Any) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.expression.search(data)
+
+    def affected_by(self, changed: Iterable[Path]) -> bool:
+        """
+        False only if every path the rule reads is a stable host/meta path that no changed
+        path overlaps. Unknown, volatile and constant rules are always affected.
+        """
+        reads = self.reads
+        if not reads:
+            return True
+        for path in reads:
+            if len(path) < 2 or path[0] not in STABLE_NAMESPACES:
+                return True
+        for path in reads:
+            for change in changed:
+                size = min(len(path), len(change))
+                if path[:size] == change[:size]:
+                    return True
+        return False
+
+    def resolve_value(self, data: Any) -> Any:
+        """The rule's value, or what its reference points to in the envelope."""
+        if self.value_expression is None:
+            return self.value
+        try:
+            return self.value_expression.search(data)
+        except Exception:
+            return self.value
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """Duck-types the PolicyDefinition attributes the PolicyEngine reads (key, is_active, rules)."""
+    id: Optional[int]
+    key: str
+    name: Optional[str]
+    resolution: str
+    is_active: bool
+    rules: Tuple[CompiledRule, ...]
+    version: Tuple[int, int, int] = (0, 0, 0)
+    changeset_aware: bool = False       # Tagged POLICY_TAG_CHANGESET_AWARE (opt-in)
+    source: Any = field(default=None, compare=False, repr=False)   # Rules compiled from (in-place edit check)
+
+def compile_rule(rule: Any, policy_key: str) -> CompiledRule:
+    rule = rule if isinstance(rule, dict) else {}
+    logic = rule.get("logic", "")
+    expression, error, reads = None, None, None
+    try:
+        expression = compile_expression(logic)
+    except Exception as e:
+        error = e
+        logger.warning(f"⚠️ [Compiler] Rule in '{policy_key}' does not compile: {e}")
+
+    value_expression = compile_value(rule.get("value"))
+    if expression is not None:
+        reads = read_paths(expression.parsed)
+        if value_expression is not None:
+            reads = reads | read_paths(value_expression.parsed)
+
+    return CompiledRule(
+        logic=logic,
+        action=rule.get("action", RuleActionType.BLOCK),
+        message=rule.get("message", f"Policy '{policy_key}' violation."),
+        value=rule.get("value"),
+        target=rule.get("target"),
+        expression=expression,
+        error=error,
+        value_expression=value_expression,
+        reads=reads
+    )
+
+def _changeset_aware(policy: Any) -> bool:
+    tags = getattr(policy, "tags", None)
+    return isinstance(tags, list) and POLICY_TAG_CHANGESET_AWARE in tags
+
+def _build_policy(policy: Any, version: Tuple[int, int, int]) -> CompiledPolicy:
+    rules = policy.rules if isinstance(policy.rules, list) else []
+    return CompiledPolicy(
+        id=getattr(policy, "id", None),
+        key=policy.key,
+        name=getattr(policy, "name", None),
+        resolution=getattr(policy, "resolution", None) or PolicyResolutionStrategy.ALL_MUST_PASS,
+        is_active=bool(policy.is_active),
+        rules=tuple(compile_rule(rule, policy.key) for rule in rules),
+        version=version,
+        changeset_aware=_changeset_aware(policy),
+        source=copy.deepcopy(rules)
+    )
+
+def compile_policy(policy: Any) -> CompiledPolicy:
+    """
+    PolicyDefinition (or an already compiled policy) -> CompiledPolicy.
+    Persisted policies are memoized by (id, version). A hit is only reused if the rules and flags
+    still match, so an in-place edit without a version bump is recompiled, never served stale.
+    Transient policies (no id: transition guards, simulations) reuse their parsed expressions only.
+    """
+    if isinstance(policy, CompiledPolicy):
+        return policy
+    version = (
+        getattr(policy, "version_major", None) or 0,
+        getattr(policy, "version_minor", None) or 0,
+        getattr(policy, "version_patch", None) or 0
+    )
+    policy_id = getattr(policy, "id", None)
+    if policy_id is None:
+        return _build_policy(policy, version)
+
+    def valid(compiled: CompiledPolicy) -> bool:
+        return (
+            compiled.source == policy.rules
+            and compiled.key == policy.key
+            and compiled.is_active == bool(policy.is_active)
+            and compiled.changeset_aware == _changeset_aware(policy)
+            and compiled.resolution == (getattr(policy, "resolution", None) or PolicyResolutionStrategy.ALL_MUST_PASS)
+        )
+
+    return program_cache.get_or_build((policy_id, version), lambda: _build_policy(policy, version), valid)
+
+def compiler_stats() -> Dict[str, object]:
+    return {"programs": program_cache.stats(), "expressions": expression_cache.stats(), "backends": dict(backend_counts)}
@@ -0,0 +1,265 @@
+# FILEPATH: backend/app/core/meta/compiler.py
+# @file: Rule Compiler (JMESPath subset -> Python closures)
+# @author: The Engineer
+# @description: Native backend for policy rules. Translates the JMESPath subset our rules use
+#              (field paths, literals, comparisons, &&, ||, !, contains(), length()) into nested
+#              Python closures once, at compile time. Evaluation is then plain function calls,
+#              no AST walk and no visitor dispatch.
+#              Semantics mirror jmespath's TreeInterpreter (truthiness, bool/number equality,
+#              ordering only on numbers/strings). Anything outside the subset returns None from
+#              compile_native() and the caller keeps the interpreter.
+#              read_paths() reports which envelope paths an expression reads (changeset-aware selection).
+
+import logging
+from numbers import Number
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from jmespath import functions as jp_functions
+
+logger = logging.getLogger("core.meta.compiler")
+
+Program = Callable[[Any], Any]
+
+# Type-checked fallback (identical errors to the interpreter) for the non-trivial argument types.
+_functions = jp_functions.Functions()
+
+class Unsupported(Exception):
+    """The expression uses a construct the native backend does not translate."""
+
+class NativeExpression:
+    """Drop-in for jmespath's ParsedResult: exposes 'expression', 'parsed' and 'search(data)'."""
+
+    __slots__ = ("expression", "parsed", "_program")
+    backend = "native"
+
+    def __init__(self, expression: str, parsed: Dict[str, Any], program: Program):
+        self.expression = expression
+        self.parsed = parsed
+        self._program = program
+
+    def search(self, value: Any, options: Any = None) -> Any:
+        return self._program(value)
+
+    def __repr__(self):
+        return f"NativeExpression({self.expression!r})"
+
+# --- JMESPath semantics (see jmespath.visitor) ---
+
+def _is_number(x: Any) -> bool:
+    kind = type(x)
+    if kind is int or kind is float:
+        return True
+    return kind is not bool and isinstance(x, Number)
+
+def _is_false(x: Any) -> bool:
+    return x == '' or x == [] or x == {} or x is None or x is False
+
+def _equals(x: Any, y: Any) -> bool:
+    # 0/1 never equal False/True in JMESPath
+    if _is_number(x) and x in (0, 1):
+        if isinstance(y, bool):
+            return False
+    elif _is_number(y) and y in (0, 1):
+        if isinstance(x, bool):
+            return False
+    return x == y
+
+def _comparable(x: Any) -> bool:
+    return _is_number(x) or isinstance(x, str)
+
+def _get(value: Any, key: str) -> Any:
+    if type(value) is dict:
+        return value.get(key)
+    try:
+        return value.get(key)
+    except AttributeError:
+        return None
+
+# --- COMPILER ---
+
+def _field(node: Dict[str, Any]) -> Program:
+    key = node['value']
+    return lambda value: _get(value, key)
+
+def _subexpression(node: Dict[str, Any]) -> Program:
+    children = node['children']
+    if all(child['type'] == 'field' for child in children):
+        keys = tuple(child['value'] for child in children)
+        if len(keys) == 2:
+            first, second = keys
+            def path2(value):
+                return _get(_get(value, first), second)
+            return path2
+
+        def path(value):
+            for key in keys:
+                value = _get(value, key)
+            return value
+        return path
+
+    programs = tuple(_compile(child) for child in children)
+    def chain(value):
+        for program in programs:
+            value = program(value)
+        return value
+    return chain
+
+def _literal(node: Dict[str, Any]) -> Program:
+    constant = node['value']
+    return lambda value: constant
+
+def _identity(node: Dict[str, Any]) -> Program:
+    return lambda value: value
+
+_ORDERING = {
+    'lt': lambda a, b: a < b,
+    'gt': lambda a, b: a > b,
+    'lte': lambda a, b: a <= b,
+    'gte': lambda a, b: a >= b,
+}
+
+def _comparator(node: Dict[str, Any]) -> Program:
+    op = node['value']
+    left, right = (_compile(child) for child in node['children'])
+    if op == 'eq':
+        return lambda value: _equals(left(value), right(value))
+    if op == 'ne':
+        return lambda value: not _equals(left(value), right(value))
+
+    compare = _ORDERING.get(op)
+    if compare is None:
+        raise Unsupported(f"comparator '{op}'")
+    def ordering(value):
+        a, b = left(value), right(value)
+        if not (_comparable(a) and _comparable(b)):
+            return None
+        return compare(a, b)
+    return ordering
+
+def _and(node: Dict[str, Any]) -> Program:
+    left, right = (_compile(child) for child in node['children'])
+    def and_(value):
+        matched = left(value)
+        if _is_false(matched):
+            return matched
+        return right(value)
+    return and_
+
+def _or(node: Dict[str, Any]) -> Program:
+    left, right = (_compile(child) for child in node['children'])
+    def or_(value):
+        matched = left(value)
+        if _is_false(matched):
+            return right(value)
+        return matched
+    return or_
+
+def _not(node: Dict[str, Any]) -> Program:
+    child = _compile(node['children'][0])
+    def not_(value):
+        original = child(value)
+        if _is_number(original) and original == 0:
+            return False
+        return not original
+    return not_
+
+def _contains(args) -> Program:
+    subject, search = args
+    def contains(value):
+        haystack, needle = subject(value), search(value)
+        if type(haystack) is str or type(haystack) is list:
+            return needle in haystack
+        return _functions.call_function('contains', [haystack, needle])
+    return contains
+
+def _length(args) -> Program:
+    (subject,) = args
+    def length(value):
+        arg = subject(value)
+        if type(arg) is str or type(arg) is list or type(arg) is dict:
+            return len(arg)
+        return _functions.call_function('length', [arg])
+    return length
+
+_FUNCTIONS = {'contains': (2, _contains), 'length': (1, _length)}
+
+def _function(node: Dict[str, Any]) -> Program:
+    spec = _FUNCTIONS.get(node['value'])
+    if spec is None or len(node['children']) != spec[0]:
+        # Unknown name or wrong arity: the interpreter raises the proper error.
+        raise Unsupported(f"function '{node['value']}'")
+    return spec[1](tuple(_compile(child) for child in node['children']))
+
+_NODES = {
+    'field': _field,
+    'subexpression': _subexpression,
+    'literal': _literal,
+    'current': _identity,
+    'identity': _identity,
+    'comparator': _comparator,
+    'and_expression': _and,
+    'or_expression': _or,
+    'not_expression': _not,
+    'function_expression': _function,
+}
+
+def _compile(node: Dict[str, Any]) -> Program:
+    builder = _NODES.get(node['type'])
+    if builder is None:
+        raise Unsupported(node['type'])
+    return builder(node)
+
+# --- READ-SET ANALYSIS ---
+
+Path = Tuple[str, ...]
+
+# Evaluated against the same value as their parent: reads are the union of the children's
+_PASS_THROUGH = {'comparator', 'and_expression', 'or_expression', 'not_expression',
+                 'function_expression', 'multi_select_list', 'multi_select_dict', 'key_val_pair'}
+# First child is evaluated against the parent's value, the rest against what it produced
+_DERIVED = {'index_expression', 'projection', 'filter_projection', 'value_projection', 'flatten', 'pipe'}
+
+def _reads(node: Dict[str, Any]) -> Set[Path]:
+    kind = node['type']
+    if kind == 'field':
+        return {(node['value'],)}
+    if kind == 'subexpression':
+        children = node['children']
+        prefix = []
+        for child in children:
+            if child['type'] != 'field':
+                break
+            prefix.append(child['value'])
+        if not prefix:
+            return _reads(children[0])
+        if len(prefix) == len(children):
+            return {tuple(prefix)}
+        # The next child is evaluated against the value at the prefix; later ones only see its result
+        below = _reads(children[len(prefix)]) or {()}
+        return {tuple(prefix) + path for path in below}
+    if kind in ('literal', 'expref', 'index', 'slice'):
+        return set()
+    if kind in _PASS_THROUGH:
+        reads: Set[Path] = set()
+        for child in node.get('children', []):
+            reads |= _reads(child)
+        return reads
+    if kind in _DERIVED:
+        return _reads(node['children'][0])
+    # '@' / unknown constructs at this level: the whole value
+    return {()}
+
+def read_paths(parsed: Dict[str, Any]) -> FrozenSet[Path]:
+    """
+    Envelope paths an expression can read, as prefixes: ('host', 'status'), ('actor',) ...
+    An empty tuple means 'the whole envelope'.
+    """
+    return frozenset(_reads(parsed))
+
+def compile_native(expression: str, parsed: Dict[str, Any]) -> Optional[NativeExpression]:
+    """jmespath AST -> NativeExpression, or None if the expression is outside the subset."""
+    try:
+        return NativeExpression(expression, parsed, _compile(parsed))
+    except Unsupported as e:
+        logger.debug(f"🐢 [Compiler] Interpreted (unsupported {e}): {expression}")
+        return None
@@ -120,6 +120,9 @@ class PolicyResolutionStrategy(str, Enum):
     PRIORITY_OVERRIDE = "PRIORITY_OVERRIDE"
     WEIGHTED_SCORE = "WEIGHTED_SCORE"
 
+# Policy tags with engine meaning
+POLICY_TAG_CHANGESET_AWARE = "eval:changeset"   # On updates, skip rules whose read-set is unchanged
+
 @unique
 class ViewEngineType(str, Enum):
     """The Renderer."""
@@ -4,15 +4,29 @@
 # @description The Runtime Processor for Level 5 Policy Enforcement.
 #              UPDATED: Added 'Value Resolution' for SET_VALUE and TRIGGER_EVENT.
 #              This allows policies to use variables (e.g. actor.id) instead of just static strings.
+#              UPDATED: Evaluates CompiledPolicy objects (pre-parsed JMESPath). Raw PolicyDefinitions
+#              are compiled on the fly.
+#              UPDATED: Raw policies go through the LRU program cache (compiled.py); value references
+#              are precompiled per rule. No expression is parsed at evaluation time.
+#              UPDATED: evaluate_batch() for bulk imports / dry-runs (column-wise, see batch.py).
+#              UPDATED: Changeset-aware selection. With 'changed' paths, opted-in policies skip rules
+#              whose read-set the update did not touch.
+#              UPDATED: Early exit (ALL_MUST_PASS). BLOCK rules are probed first, cheapest/most selective
+#              first (running RuleStats); the first match decides. Otherwise results are unchanged.
+#              UPDATED: Rule timings feed the profiler's latency histograms (profiler.py). explain=True
+#              attaches a per-policy / per-rule breakdown to the verdict (LogicResult.trace).
 
-import jmespath
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
 from datetime import datetime
 
 from app.core.kernel.actions import LogicResult
+from app.core.meta.batch import BatchResult, CRASH, HAS_NUMPY, rule_mask
 from app.core.meta.models import PolicyDefinition
+from app.core.meta.compiled import CompiledPolicy, CompiledRule, Path, compile_policy
 from app.core.meta.constants import PolicyResolutionStrategy, RuleActionType
+from app.core.meta.profiler import rule_profiler
 
 logger = logging.getLogger("core.meta.engine")
 
@@ -23,16 +37,32 @@ class PolicyEngine:
     Output: LogicResult (Pass/Fail + Messages)
     """
 
+    def __init__(self):
+        # Changeset-aware selection counters
+        self.rules_evaluated = 0
+        self.rules_skipped = 0
+        self.early_exits = 0
+
     def evaluate(
         self, 
         entity: Dict[str, Any], 
         policies: List[PolicyDefinition], 
         strategy: str = PolicyResolutionStrategy.ALL_MUST_PASS,
-        context_override: Optional[Dict[str, Any]] = None
+        context_override: Optional[Dict[str, Any]] = None,
+        changed: Optional[Iterable[Path]] = None,
+        early_exit: bool = False,
+        explain: bool = False
     ) -> LogicResult:
         """
         The Main Entry Point.
         Evaluates a set of policies against an entity.
+        'changed': envelope paths modified by this save, e.g. {("host", "status")}. Policies tagged
+        'eval:changeset' then skip rules that read none of them. None = evaluate every rule.
+        'early_exit' (ALL_MUST_PASS only): for callers that discard everything but the first error on
+        a block (the Interceptor). A blocked verdict then carries only the first blocking message;
+        a passing verdict is identical to a full evaluation.
+        'explain': attach a per-policy / per-rule breakdown (timings, results, resolved values,
+        paths read) as result.trace. Every rule runs: early exit is ignored.
         """
         start_time = datetime.now()
         
@@ -43,122 +73,321 @@ class PolicyEngine:
             data_context = entity if isinstance(entity, dict) else self._serialize(entity)
         
         # Strategy: Pass object directly. Rules should be written as `host.weight > 10`.
+
+        # ⚡ EARLY EXIT: Probe BLOCK rules first; one match decides ALL_MUST_PASS.
+        probed = None
+        if early_exit and not explain and strategy == PolicyResolutionStrategy.ALL_MUST_PASS:
+            policies = [compile_policy(policy) for policy in policies if policy.is_active]
+            blocked, probed = self._probe_blocks(policies, data_context, changed)
+            if blocked is not None:
+                self.early_exits += 1
+                duration = (datetime.now() - start_time).total_seconds() * 1000
+                self._log_summary(blocked, len(policies), duration)
+                return blocked
         
         combined_result = LogicResult(is_valid=True)
         executed_count = 0
         violation_count = 0
+        policy_traces = [] if explain else None
 
         # 2. Iterate Policies
         for policy in policies:
             if not policy.is_active:
                 continue
 
-            policy_result = self._evaluate_single_policy(policy, data_context)
+            rule_traces = [] if explain else None
+            started = time.perf_counter_ns()
+            policy_result = self._evaluate_single_policy(policy, data_context, changed, probed, rule_traces)
             executed_count += 1
+            if explain:
+                policy_traces.append({
+                    "key": policy.key,
+                    "name": getattr(policy, "name", None),
+                    "is_valid": policy_result.is_valid,
+                    "duration_us": round((time.perf_counter_ns() - started) / 1000, 2),
+                    "rules": rule_traces
+                })
 
             # 3. Merge Results based on Governance Strategy
-            if not policy_result.is_valid:
+            if self._merge_policy_result(combined_result, policy_result):
                 violation_count += 1
-                combined_result.blocking_errors.extend(policy_result.blocking_errors)
-                combined_result.is_valid = False # Temporarily mark false, Strategy decides final
-            
-            combined_result.warnings.extend(policy_result.warnings)
-            combined_result.mutations.extend(policy_result.mutations)
-            combined_result.side_effects.extend(policy_result.side_effects)
 
         # 4. Apply Resolution Strategy ( The Judge )
         final_verdict = self._apply_strategy(strategy, combined_result, executed_count, violation_count)
         
         duration = (datetime.now() - start_time).total_seconds() * 1000
+        if explain:
+            final_verdict.trace = {
+                "strategy": str(getattr(strategy, "value", strategy)),
+                "is_valid": final_verdict.is_valid,
+                "duration_ms": round(duration, 3),
+                "policies": policy_traces
+            }
         self._log_summary(final_verdict, executed_count, duration)
         
         return final_verdict
 
-    def _evaluate_single_policy(self, policy: PolicyDefinition, data: Any) -> LogicResult:
+    def evaluate_batch(
+        self,
+        entities: Sequence[Any],
+        policies: List[PolicyDefinition],
+        strategy: str = PolicyResolutionStrategy.ALL_MUST_PASS,
+        context: Optional[Dict[str, Any]] = None
+    ) -> BatchResult:
+        """
+        Bulk Entry Point (imports, dry-runs): same verdicts as calling evaluate() per entity,
+        computed rule by rule over the whole batch (see batch.py).
+        Without 'context' each entity is its own envelope (dicts as-is, models serialized), like
+        evaluate(entity=...). With 'context' each entity becomes {**context, "host": entity}.
+        """
+        start_time = datetime.now()
+
+        envelopes = []
+        for entity in entities:
+            data = entity if isinstance(entity, dict) else self._serialize(entity)
+            envelopes.append({**context, "host": data} if context is not None else data)
+
+        count = len(envelopes)
+        combined = [LogicResult(is_valid=True) for _ in range(count)]
+        violations = [0] * count
+        executed_count = 0
+        columns = {}
+        rule_stats = []
+        vectorised = 0
+
+        for policy in policies:
+            if not policy.is_active:
+                continue
+            executed_count += 1
+            compiled: CompiledPolicy = compile_policy(policy)
+            # Effects go straight into the combined results (same order as evaluate()).
+            # Only BLOCK invalidates, so a policy is violated for the entities a BLOCK rule matched.
+            violated = set()
+
+            for index, rule in enumerate(compiled.rules):
+                mask, is_vector = rule_mask(rule, envelopes, columns)
+                vectorised += is_vector
+                matched = crashed = 0
+                for i, outcome in enumerate(mask):
+                    if outcome is CRASH:
+                        crashed += 1
+                        self._rule_crashed(combined[i], policy.key, None, log=False)
+                    elif outcome:
+                        matched += 1
+                        try:
+                            self._apply_action(combined[i], rule, envelopes[i])
+                        except Exception as e:
+                            crashed += 1
+                            self._rule_crashed(combined[i], policy.key, e, log=False)
+                        else:
+                            if rule.action == RuleActionType.BLOCK:
+                                violated.add(i)
+                if crashed:
+                    logger.error(f"🔥 [PolicyEngine] Rule #{index + 1} of '{policy.key}' crashed for {crashed}/{count} entities.")
+                rule_stats.append({
+                    "policy": policy.key,
+                    "rule": index,
+                    "action": rule.action,
+                    "matched": matched,
+                    "crashed": crashed,
+                    "vectorised": is_vector
+                })
+
+            for i in violated:
+                violations[i] += 1
+
+        results = [self._apply_strategy(strategy, combined[i], executed_count, violations[i]) for i in range(count)]
+
+        duration = (datetime.now() - start_time).total_seconds() * 1000
+        blocked = sum(1 for r in results if not r.is_valid)
+        stats = {
+            "entities": count,
+            "policies": executed_count,
+            "passed": count - blocked,
+            "blocked": blocked,
+            "warned": sum(1 for r in results if r.warnings),
+            "mutated": sum(1 for r in results if r.mutations),
+            "rules": rule_stats,
+            "vectorised_rules": vectorised,
+            "interpreted_rules": len(rule_stats) - vectorised,
+            "numpy": HAS_NUMPY,
+            "duration_ms": round(duration, 2)
+        }
+        logger.info(f"📦 [PolicyEngine] BATCH {count} entities | {executed_count} Policies | {blocked} blocked | {duration:.2f}ms")
+        return BatchResult(results=results, stats=stats)
+
+    def _merge_policy_result(self, combined_result: LogicResult, policy_result: LogicResult) -> bool:
+        """Folds one policy's result into the combined one. Returns True if the policy was violated."""
+        violated = not policy_result.is_valid
+        if violated:
+            combined_result.blocking_errors.extend(policy_result.blocking_errors)
+            combined_result.is_valid = False # Temporarily mark false, Strategy decides final
+        
+        combined_result.warnings.extend(policy_result.warnings)
+        combined_result.mutations.extend(policy_result.mutations)
+        combined_result.side_effects.extend(policy_result.side_effects)
+        return violated
+
+    def _probe_blocks(
+        self, policies: Sequence[CompiledPolicy], data: Any, changed: Optional[Iterable[Path]]
+    ) -> Tuple[Optional[LogicResult], Dict[int, Optional[Exception]]]:
+        """
+        Runs the BLOCK rules of all policies in RuleStats rank order.
+        Returns (blocked verdict, None) on the first match, else (None, { id(rule): crash or None })
+        so the full pass can replay these outcomes in the original order without re-running them.
+        """
+        probes = []
+        for policy in policies:
+            selective = changed is not None and policy.changeset_aware
+            for index, rule in enumerate(policy.rules):
+                if rule.action == RuleActionType.BLOCK and not (selective and not rule.affected_by(changed)):
+                    probes.append((policy, index, rule))
+        probes.sort(key=lambda probe: probe[2].stats.rank)
+
+        outcomes: Dict[int, Optional[Exception]] = {}
+        for policy, index, rule in probes:
+            self.rules_evaluated += 1
+            started = time.perf_counter_ns()
+            try:
+                matched, crash = bool(rule.search(data)), None
+            except Exception as e:
+                matched, crash = False, e
+            elapsed = time.perf_counter_ns() - started
+            rule.stats.record(elapsed, matched)
+            rule_profiler.record(policy, index, rule, elapsed, matched, crash is not None)
+            if matched:
+                return LogicResult(is_valid=False, blocking_errors=[rule.message]), {}
+            outcomes[id(rule)] = crash
+        return None, outcomes
+
+    def _evaluate_single_policy(
+        self,
+        policy: PolicyDefinition,
+        data: Any,
+        changed: Optional[Iterable[Path]] = None,
+        probed: Optional[Dict[int, Optional[Exception]]] = None,
+        trace: Optional[List[Dict[str, Any]]] = None
+    ) -> LogicResult:
         """
         Executes one Policy Bundle (which may contain multiple Rules).
+        'probed': outcomes of rules already run by _probe_blocks (not matched; crash or None).
+        'trace': explain mode, receives one entry per rule (see _trace_rule).
         """
         result = LogicResult(is_valid=True)
         
         # Policies store rules as a JSONB list: [{ "logic": "...", "action": "BLOCK", ... }]
-        rules = policy.rules if isinstance(policy.rules, list) else []
+        # The cache hands over CompiledPolicy objects; anything else is compiled here.
+        compiled: CompiledPolicy = compile_policy(policy)
+        selective = changed is not None and compiled.changeset_aware
         
-        for rule in rules:
+        for index, rule in enumerate(compiled.rules):
+            if selective and not rule.affected_by(changed):
+                self.rules_skipped += 1
+                if trace is not None:
+                    trace.append(self._trace_rule(index, rule, skipped="changeset"))
+                continue
+            if probed and id(rule) in probed:
+                if probed[id(rule)] is not None:
+                    self._rule_crashed(result, policy.key, probed[id(rule)])
+                continue
+            self.rules_evaluated += 1
+            is_match, error = None, None
+            started = time.perf_counter_ns()
             try:
-                logic_expr = rule.get("logic", "")
-                action = rule.get("action", RuleActionType.BLOCK)
-                message = rule.get("message", f"Policy '{policy.key}' violation.")
-                
-                # A. Execute JMESPath
+                # A. Execute JMESPath (pre-compiled)
                 # Boolean expressions: `host.age > 18` returns True/False.
-                is_match = jmespath.search(logic_expr, data)
+                is_match = rule.search(data)
                 
                 # B. Handle Match (Triggered)
                 if is_match:
-                    # ⚡ RESOLVE DYNAMIC VALUES
-                    # If action involves data, we must check if the value is a reference (e.g. actor.id)
-                    raw_value = rule.get("value")
-                    resolved_value = self._resolve_value(raw_value, data)
-
-                    if action == RuleActionType.BLOCK:
-                        result.is_valid = False
-                        result.blocking_errors.append(message)
-                    
-                    elif action == RuleActionType.WARN:
-                        result.warnings.append(message)
-                    
-                    elif action == RuleActionType.SET_VALUE:
-                        result.mutations.append({
-                            "target": rule.get("target"),
-                            "value": resolved_value # 👈 NOW RESOLVED
-                        })
-
-                    elif action == RuleActionType.TRIGGER_EVENT:
-                        result.side_effects.append({
-                            "type": "TRIGGER_EVENT",
-                            "value": {
-                                "event": rule.get("value", {}).get("event"),
-                                "payload": rule.get("value", {}).get("payload") # TODO: recursive resolve here if needed
-                            }
-                        })
-                        
-                    elif action == RuleActionType.TRANSITION:
-                        result.side_effects.append({
-                            "type": "TRANSITION",
-                            "value": resolved_value
-                        })
+                    self._apply_action(result, rule, data)
 
             except Exception as e:
-                # SAFEGUARD: Bad rule syntax should not crash the system.
-                logger.error(f"🔥 [PolicyEngine] Rule Crash in '{policy.key}': {e}")
-                
-                # ⚡ FAIL OPEN: Treat crash as WARNING, not BLOCK.
-                result.warnings.append(f"System Governance Warning: Rule crashed in '{policy.key}'. Logic ignored.")
+                error = e
+                self._rule_crashed(result, policy.key, e)
+
+            elapsed = time.perf_counter_ns() - started
+            rule_profiler.record(compiled, index, rule, elapsed, is_match, error is not None)
+            if trace is not None:
+                trace.append(self._trace_rule(index, rule, data, is_match, error, elapsed))
         
         return result
 
-    def _resolve_value(self, value: Any, context: Dict[str, Any]) -> Any:
-        """
-        Detects if a value is a reference (e.g. 'actor.id') and resolves it against the context.
-        """
-        if not isinstance(value, str):
-            return value
-        
-        # Heuristic: If it looks like a known context path, try to resolve it.
-        # This matches the 'Value Source' logic in the Frontend Policy Editor.
-        KNOWN_ROOTS = ['host.', 'meta.', 'system.', 'actor.', 'session.', 'context.']
-        
-        if any(value.startswith(root) for root in KNOWN_ROOTS):
+    def _trace_rule(
+        self,
+        index: int,
+        rule: CompiledRule,
+        data: Any = None,
+        outcome: Any = None,
+        error: Optional[Exception] = None,
+        elapsed_ns: int = 0,
+        skipped: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Explain entry for one rule: what it read, what it returned, what it would do."""
+        matched = bool(outcome) and error is None
+        resolved_value = None
+        if matched and rule.value is not None:
             try:
-                resolved = jmespath.search(value, context)
-                # If resolution works, return it. If it returns None, it might mean the field is missing,
-                # but we return None rather than the string literal "actor.id".
-                return resolved
+                resolved_value = rule.resolve_value(data)
             except Exception:
-                # If JMESPath crashes, fallback to the string literal
-                return value
+                resolved_value = rule.value
+        return {
+            "rule": index,
+            "logic": rule.logic,
+            "action": getattr(rule.action, "value", rule.action),
+            "reads": sorted(".".join(path) or "*" for path in rule.reads) if rule.reads is not None else None,
+            "result": outcome,
+            "matched": matched,
+            "resolved_value": resolved_value,
+            "error": str(error) if error is not None else None,
+            "skipped": skipped,
+            "duration_us": round(elapsed_ns / 1000, 2)
+        }
+
+    def _apply_action(self, result: LogicResult, rule: CompiledRule, data: Any):
+        """Records the effect of a matched rule."""
+        action = rule.action
+        message = rule.message
+
+        # ⚡ RESOLVE DYNAMIC VALUES
+        # If action involves data, we must check if the value is a reference (e.g. actor.id)
+        resolved_value = rule.resolve_value(data)
+
+        if action == RuleActionType.BLOCK:
+            result.is_valid = False
+            result.blocking_errors.append(message)
         
-        return value
+        elif action == RuleActionType.WARN:
+            result.warnings.append(message)
+        
+        elif action == RuleActionType.SET_VALUE:
+            result.mutations.append({
+                "target": rule.target,
+                "value": resolved_value # 👈 NOW RESOLVED
+            })
+
+        elif action == RuleActionType.TRIGGER_EVENT:
+            result.side_effects.append({
+                "type": "TRIGGER_EVENT",
+                "value": {
+                    "event": (rule.value or {}).get("event"),
+                    "payload": (rule.value or {}).get("payload") # TODO: recursive resolve here if needed
+                }
+            })
+            
+        elif action == RuleActionType.TRANSITION:
+            result.side_effects.append({
+                "type": "TRANSITION",
+                "value": resolved_value
+            })
+
+    def _rule_crashed(self, result: LogicResult, policy_key: str, error: Optional[Exception], log: bool = True):
+        # SAFEGUARD: Bad rule syntax should not crash the system.
+        if log:
+            logger.error(f"🔥 [PolicyEngine] Rule Crash in '{policy_key}': {error}")
+        
+        # ⚡ FAIL OPEN: Treat crash as WARNING, not BLOCK.
+        result.warnings.append(f"System Governance Warning: Rule crashed in '{policy_key}'. Logic ignored.")
 
     def _apply_strategy(self, strategy: str, result: LogicResult, total: int, violations: int) -> LogicResult:
         """
@@ -192,6 +421,15 @@ class PolicyEngine:
             return {c.name: getattr(entity, c.name) for c in entity.__table__.columns}
         return str(entity)
 
+    def stats(self) -> Dict[str, Any]:
+        total = self.rules_evaluated + self.rules_skipped
+        return {
+            "rules_evaluated": self.rules_evaluated,
+            "rules_skipped": self.rules_skipped,
+            "skip_ratio": round(self.rules_skipped / total, 4) if total else None,
+            "early_exits": self.early_exits
+        }
+
     def _log_summary(self, result: LogicResult, count: int, duration: float):
         if not result.is_valid:
             logger.info(f"🚫 [PolicyEngine] BLOCKED ({len(result.blocking_errors)} errors) | {count} Policies | {duration:.2f}ms")
@@ -3,9 +3,12 @@
 # @author The Engineer (ansav8@gmail.com)
 # @description A pure Python engine that executes XState v5 JSON definitions.
 #              Calculates: f(Current State, Event) -> Next State
+#              UPDATED: Runs on a compiled StateMachine (shared with the Interceptor and Workflow API).
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+
+from app.core.meta.features.states.logic.machine import StateMachine
 
 logger = logging.getLogger("core.meta.simulator.interpreter")
 
@@ -15,11 +18,15 @@ class XStateInterpreter:
     Decouples the 'Definition' (JSON) from the 'Execution' (Python).
     """
 
-    def __init__(self, machine_definition: Dict[str, Any]):
-        self.definition = machine_definition
-        self.states = machine_definition.get("states", {})
-        self.initial_state = machine_definition.get("initial")
-        self.id = machine_definition.get("id", "anonymous_machine")
+    def __init__(self, machine_definition: Union[Dict[str, Any], StateMachine]):
+        # Accepts the XState JSON or an already compiled machine (StateMachineRegistry)
+        if isinstance(machine_definition, StateMachine):
+            self.machine = machine_definition
+        else:
+            self.machine = StateMachine(machine_definition)
+        self.states = self.machine.states
+        self.initial_state = self.machine.initial_state
+        self.id = self.machine.id
 
     def get_initial_state(self) -> str:
         """Returns the starting state of the machine."""
@@ -38,37 +45,19 @@ class XStateInterpreter:
             logger.error(f"❌ [Interpreter] State '{current_state}' not found in machine '{self.id}'.")
             return None
 
-        # 2. Look for Transitions ('on' block)
-        transitions = state_node.get("on", {})
-        
-        # 3. Match Event
-        # XState allows 'on': { "EVENT": "TARGET" } OR 'on': { "EVENT": { "target": "TARGET" } }
-        transition_config = transitions.get(event)
+        # 2. Match Event (O(1) lookup in the compiled machine)
+        # XState allows 'on': { "EVENT": "TARGET" }, { "EVENT": { "target": "TARGET" } } and guarded
+        # arrays [{ "target": "T1", "guard": "cond" }] (first candidate wins, guards are not evaluated here).
+        # TODO: Implement Guard Logic evaluation here.
+        transition_config = self.machine.get_event_config(current_state, event)
 
         if not transition_config:
             logger.warning(f"⚠️ [Interpreter] No transition found for event '{event}' in state '{current_state}'.")
             return None
 
-        # 4. Resolve Target
-        target_state = None
-        
-        if isinstance(transition_config, str):
-            # Short syntax: "EVENT": "TARGET"
-            target_state = transition_config
-        
-        elif isinstance(transition_config, dict):
-            # Object syntax: "EVENT": { "target": "TARGET", "actions": [...] }
-            target_state = transition_config.get("target")
-        
-        elif isinstance(transition_config, list):
-            # Array syntax (Guards): "EVENT": [{ "target": "T1", "guard": "cond" }]
-            # For Phase 1, we just take the first unconditional match or the first one.
-            # TODO: Implement Guard Logic evaluation here.
-            first_match = transition_config[0]
-            if isinstance(first_match, dict):
-                target_state = first_match.get("target")
+        target_state = transition_config.get("target")
 
-        # 5. Final Validation
+        # 3. Final Validation
         if target_state and target_state in self.states:
             logger.info(f"✅ [Interpreter] Transition: {current_state} + {event} -> {target_state}")
             return target_state
@@ -3,6 +3,7 @@
 # @author The Engineer (ansav8@gmail.com)
 # @description Orchestrates the "Load -> Transition -> Intercept -> Rollback" cycle.
 #              UPDATED: 'inspect_entity' now FLATTENS custom_attributes to match UI expectations.
+#              UPDATED: Machines come compiled from the StateMachineRegistry.
 
 import logging
 from datetime import datetime
@@ -16,7 +17,7 @@ from app.core.kernel.registry import domain_registry
 from app.core.kernel.models import SystemOutbox
 
 # Meta Features
-from app.core.meta.features.states.service import StateService
+from app.core.meta.features.states.logic.registry import state_registry
 from app.core.meta.features.simulator.logic.interpreter import XStateInterpreter
 from app.core.meta.features.simulator.schemas import SimulationRequest, SimulationResult
 
@@ -93,13 +94,12 @@ class RuntimeService:
         # Capture Pre-State
         current_state = getattr(entity, 'status', 'idle')
         
-        # 3. Load State Machine
-        machines = await StateService.get_machines(db, request.domain)
-        if not machines:
+        # 3. Load State Machine (compiled, from the registry)
+        active_machine_def = await state_registry.get_machine(db, request.domain)
+        if not active_machine_def:
             raise ValueError(f"No State Machine defined for domain '{request.domain}'.")
         
-        active_machine_def = machines[0] 
-        interpreter = XStateInterpreter(active_machine_def.transitions)
+        interpreter = XStateInterpreter(active_machine_def.machine)
 
         # 4. Calculate Transition
         next_state = interpreter.transition(current_state, request.event)
@@ -4,33 +4,33 @@
 # @author: The Engineer (ansav8@gmail.com)
 # @description: Decoupled Workflow Enforcer. No longer imports Governance directly.
 # @security-level: LEVEL 9 (Strict Decoupling)
+# UPDATED: fetch_definitions_many() loads the state machines of several domains at once.
+# UPDATED: Definitions come compiled from the StateMachineRegistry (no StateMachine per object).
 
 import logging
-from typing import List, Any, Optional, Dict
+from typing import List, Any, Optional, Dict, Iterable, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy.inspection import inspect
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.meta.models import StateDefinition
 from app.core.kernel.models import SystemOutbox
-from app.core.meta.features.states.logic.machine import StateMachine
+from app.core.meta.features.states.logic.registry import state_registry, CompiledStateMachine
 
 logger = logging.getLogger("core.meta.states.enforcer")
 
 class StateEnforcer:
     @staticmethod
-    async def fetch_definitions(db: AsyncSession, domain: str) -> List[StateDefinition]:
-        """⚡ SIDECAR IO: Fetches active state machines for a domain."""
-        stmt = select(StateDefinition).where(
-            StateDefinition.entity_key == domain,
-            StateDefinition.is_active == True
-        )
-        result = await db.execute(stmt)
-        return result.scalars().all()
+    async def fetch_definitions(db: AsyncSession, domain: str) -> Sequence[CompiledStateMachine]:
+        """⚡ SIDECAR IO (cache misses only): Active state machines for a domain."""
+        return (await state_registry.get_many(db, [domain]))[domain]
 
     @staticmethod
-    def enforce_logic(obj: Any, definitions: List[StateDefinition], session_for_side_effects: Session):
+    async def fetch_definitions_many(db: AsyncSession, domains: Iterable[str]) -> Dict[str, Sequence[CompiledStateMachine]]:
+        """⚡ SIDECAR IO (cache misses only): Active state machines of several domains, ONE query for all misses."""
+        return await state_registry.get_many(db, domains)
+
+    @staticmethod
+    def enforce_logic(obj: Any, definitions: Sequence[Any], session_for_side_effects: Session):
         """
         @description: CPU LOGIC: Evaluates transitions. 
         Emits transition data into the object context for Signal Interception.
@@ -42,6 +42,7 @@ class StateEnforcer:
         domain = type(obj).__name__.upper()
 
         for definition in definitions:
+            definition = state_registry.compile(definition)
             target_field = getattr(definition, 'governed_field', 'status')
             if not hasattr(obj, target_field):
                 continue
@@ -58,7 +59,7 @@ class StateEnforcer:
 
             logger.info(f"🔄 [Enforcer] Transition Request {domain} | {target_field}: '{old_value}' -> '{new_value}'")
 
-            machine = StateMachine(definition.transitions)
+            machine = definition.machine
             config = machine.get_transition_config(old_value, new_value)
             
             if not config:
@@ -3,9 +3,11 @@
 # @author The Engineer (ansav8@gmail.com)
 # @description A pure Python implementation of XState transition logic.
 #              UPDATED: Added 'get_state_node' to support Node Entry Actions (Jobs).
+#              UPDATED: (from, to) edge index and (state, event) lookups are O(1). Instances are
+#              built once per definition version by the StateMachineRegistry and shared read-only.
 
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 
 logger = logging.getLogger("core.meta.states.machine")
 
@@ -25,6 +27,8 @@ class StateMachine:
         
         # Cache strict transitions for O(1) lookup
         self._transition_map: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # (from_state, to_state) -> config of the first event linking them
+        self._edge_index: Dict[Tuple[str, str], Dict[str, Any]] = {}
         self._build_lookup_table()
 
     def _normalize_transition(self, target: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
@@ -34,6 +38,10 @@ class StateMachine:
         """
         if isinstance(target, str):
             return {"target": target, "guard": None, "actions": []}
+        if isinstance(target, list):
+            # Array syntax (guarded candidates): the first one wins, as in the XStateInterpreter.
+            first = target[0] if target else {}
+            return self._normalize_transition(first) if isinstance(first, (str, dict)) else {}
         return target
 
     def _build_lookup_table(self):
@@ -45,6 +53,8 @@ class StateMachine:
             for event, raw_target in transitions.items():
                 config = self._normalize_transition(raw_target)
                 self._transition_map[state_key][event] = config
+                if config.get("target") is not None:
+                    self._edge_index.setdefault((state_key, config["target"]), config)
 
     def get_transition_config(self, current_state: str, next_state: str) -> Optional[Dict[str, Any]]:
         """
@@ -55,11 +65,21 @@ class StateMachine:
                 return {"target": next_state, "guard": None, "actions": []}
             return None
 
-        possible_events = self._transition_map.get(current_state, {})
-        for event, config in possible_events.items():
-            if config.get("target") == next_state:
-                return config 
-        return None
+        return self._edge_index.get((current_state, next_state))
+
+    def transitions_from(self, state: str) -> Dict[str, Dict[str, Any]]:
+        """{ event: config } of the outgoing transitions of a state."""
+        return self._transition_map.get(state, {})
+
+    def get_event_config(self, state: str, event: str) -> Optional[Dict[str, Any]]:
+        """Configuration of 'event' fired in 'state' (None if not allowed)."""
+        return self._transition_map.get(state, {}).get(event)
+
+    def next_state(self, state: str, event: str) -> Optional[str]:
+        """f(state, event) -> target state (None if the event is not allowed or the target is unknown)."""
+        config = self.get_event_config(state, event)
+        target = config.get("target") if config else None
+        return target if target in self.states else None
 
     def validate_transition_structure(self, current_state: str, next_state: str) -> bool:
         config = self.get_transition_config(current_state, next_state)
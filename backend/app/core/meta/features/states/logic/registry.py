@@ -0,0 +1,125 @@
+# FILEPATH: backend/app/core/meta/features/states/logic/registry.py
+# @file: State Machine Registry (Compiled Workflows)
+# @author: The Engineer
+# @description: Versioned registry of compiled state machines.
+#              - Compiled machines are keyed by (entity_key, scope, version): a definition is parsed
+#                into a StateMachine once, not once per object per flush.
+#              - The active set per domain is cached (DomainCache: TTL + LISTEN/NOTIFY invalidation).
+#              Shared by the Interceptor (StateEnforcer), the Workflow API and the Simulator.
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.meta.cache import DomainCache, ALL_DOMAINS, policy_cache_listener
+from app.core.meta.models import StateDefinition
+from app.core.meta.features.states.logic.machine import StateMachine
+
+logger = logging.getLogger("core.meta.states.registry")
+
+MachineKey = Tuple[str, str, Tuple[int, int, int]]
+
+@dataclass(frozen=True)
+class CompiledStateMachine:
+    """Detached copy of a StateDefinition (same attribute names) plus its compiled machine."""
+    id: int
+    entity_key: str
+    scope: str
+    name: Optional[str]
+    governed_field: str
+    initial_state: Optional[str]
+    version: Tuple[int, int, int]
+    transitions: Dict[str, Any] = field(repr=False)
+    machine: StateMachine = field(repr=False, compare=False)
+
+    @property
+    def key(self) -> MachineKey:
+        return self.entity_key, self.scope, self.version
+
+    @property
+    def version_display(self) -> str:
+        return ".".join(str(part) for part in self.version)
+
+class StateMachineRegistry(DomainCache):
+    """
+    Entries: (CompiledStateMachine, ...) per domain (active definitions only).
+
+    Usage:
+        machines = await state_registry.get_many(db, ["INVOICE"])      # { "INVOICE": (...) }
+        compiled = await state_registry.get_machine(db, "INVOICE", "LIFECYCLE")
+        compiled.machine.get_transition_config("DRAFT", "SENT")
+    """
+
+    name = "state_machines"
+
+    def __init__(self, ttl: Optional[float] = None):
+        super().__init__(ttl)
+        self._machines: Dict[MachineKey, CompiledStateMachine] = {}
+        self._compile_lock = threading.Lock()
+
+    def compile(self, definition: Any) -> CompiledStateMachine:
+        """StateDefinition -> CompiledStateMachine (reused while the same row/version is cached)."""
+        if isinstance(definition, CompiledStateMachine):
+            return definition
+
+        version = (definition.version_major or 0, definition.version_minor or 0, definition.version_patch or 0)
+        key = (definition.entity_key, definition.scope, version)
+        compiled = self._machines.get(key)
+        if compiled is not None and compiled.id == definition.id:
+            return compiled
+
+        transitions = definition.transitions or {}
+        compiled = CompiledStateMachine(
+            id=definition.id,
+            entity_key=definition.entity_key,
+            scope=definition.scope,
+            name=definition.name,
+            governed_field=getattr(definition, "governed_field", None) or "status",
+            initial_state=definition.initial_state,
+            version=version,
+            transitions=transitions,
+            machine=StateMachine(transitions)
+        )
+        with self._compile_lock:
+            self._machines[key] = compiled
+        logger.debug(f"🧬 [StateRegistry] Compiled {definition.entity_key}/{definition.scope} v{compiled.version_display}")
+        return compiled
+
+    async def load(self, db: AsyncSession, domain_keys: Sequence[str]) -> Dict[str, Tuple[CompiledStateMachine, ...]]:
+        """⚡ DB IO: Active state machines of the domains in ONE query."""
+        machines = {key: [] for key in domain_keys}
+        stmt = select(StateDefinition).where(
+            StateDefinition.entity_key.in_(list(domain_keys)),
+            StateDefinition.is_active == True
+        ).order_by(StateDefinition.id)
+        for definition in (await db.execute(stmt)).scalars().all():
+            machines[definition.entity_key].append(self.compile(definition))
+        return {key: tuple(items) for key, items in machines.items()}
+
+    async def get_machine(self, db: AsyncSession, domain: str, scope: Optional[str] = None) -> Optional[CompiledStateMachine]:
+        """Active machine of a domain/scope (first active one of the domain if no scope is given)."""
+        machines = (await self.get_many(db, [domain]))[domain]
+        if scope is None:
+            return machines[0] if machines else None
+        return next((m for m in machines if m.scope == scope), None)
+
+    def invalidate(self, domain: str = ALL_DOMAINS):
+        super().invalidate(domain)
+        with self._compile_lock:
+            if domain == ALL_DOMAINS:
+                self._machines.clear()
+            else:
+                # Versions can be re-issued after a delete: drop the domain's compiled versions too.
+                for key in [k for k in self._machines if k[0] == domain]:
+                    del self._machines[key]
+
+    def stats(self) -> Dict[str, object]:
+        return {**super().stats(), "compiled_versions": len(self._machines)}
+
+# Global Instance (invalidated together with the policy cache on NOTIFY)
+state_registry = StateMachineRegistry()
+policy_cache_listener.attach(state_registry)
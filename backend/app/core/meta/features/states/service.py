@@ -4,6 +4,7 @@
 # @description: Manages Lifecycle Flows.
 # @security-level: LEVEL 9 (Safety Interlocks)
 # @updated: Restored 'get_workflow_types' and wired 'ScopeValidator.validate'.
+# UPDATED: create_machine/delete_machine invalidate the StateMachineRegistry (local + NOTIFY).
 
 import logging
 from typing import List, Optional
@@ -15,6 +16,7 @@ from app.core.meta.features.states.models import WorkflowType # ⚡ RESTORED IMP
 from app.domains.system.models import KernelScope 
 from app.core.meta.features.states.schemas import StateMachineCreate
 from app.core.meta.features.states.logic.validator import ScopeValidator
+from app.core.meta.features.states.logic.registry import state_registry
 
 logger = logging.getLogger("core.meta.states")
 
@@ -120,6 +122,7 @@ class StateService:
             db.add(db_obj)
             await db.commit()
             await db.refresh(db_obj)
+            await state_registry.broadcast(payload.domain)
             
             logger.info(f"✅ [StateEngine] Ratified Version {new_major}.{new_minor}.{new_patch}: {payload.domain}/{payload.scope}")
             return db_obj
@@ -206,7 +209,9 @@ class StateService:
             logger.error(f"🔥 [StateEngine] Dependency Check Failed: {e}")
             raise ValueError("System Error during dependency check.")
 
+        entity_key = workflow.entity_key
         await db.delete(workflow)
         await db.commit()
+        await state_registry.broadcast(entity_key)
         return True
 
@@ -0,0 +1,121 @@
+# FILEPATH: backend/app/core/meta/profiler.py
+# @file: Policy Rule Profiler
+# @author: The Engineer
+# @description: Continuously aggregated latency histograms per rule (policy key, version, rule index).
+#              Fed by PolicyEngine on every rule evaluation (POLICY_PROFILE_ENABLED), queried by
+#              GET /system/policies/hot-rules to find the rules that make saves slow.
+#              Fixed log-scale buckets: recording is a bisect + a few integer increments.
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.meta.compiled import LRUCache
+
+# Bucket upper bounds in microseconds (last bucket: everything above)
+BUCKETS_US: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+RuleKey = Tuple[str, str, int, str]
+
+class RuleHistogram:
+    __slots__ = ("policy", "version", "index", "logic", "action", "counts", "count", "matches", "errors", "total_us", "max_us", "_lock")
+
+    def __init__(self, policy: str, version: str, index: int, logic: str, action: str):
+        self.policy = policy
+        self.version = version
+        self.index = index
+        self.logic = logic
+        self.action = action
+        self.counts = [0] * (len(BUCKETS_US) + 1)
+        self.count = 0
+        self.matches = 0
+        self.errors = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_us: float, matched: bool, error: bool):
+        with self._lock:
+            self.counts[bisect_left(BUCKETS_US, elapsed_us)] += 1
+            self.count += 1
+            self.matches += matched
+            self.errors += error
+            self.total_us += elapsed_us
+            if elapsed_us > self.max_us:
+                self.max_us = elapsed_us
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return BUCKETS_US[i] if i < len(BUCKETS_US) else round(self.max_us, 2)
+        return round(self.max_us, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "version": self.version,
+            "rule": self.index,
+            "logic": self.logic,
+            "action": self.action,
+            "count": self.count,
+            "matches": self.matches,
+            "errors": self.errors,
+            "total_ms": round(self.total_us / 1000, 3),
+            "mean_us": round(self.total_us / self.count, 2) if self.count else None,
+            "p50_us": self.percentile(0.50),
+            "p95_us": self.percentile(0.95),
+            "p99_us": self.percentile(0.99),
+            "max_us": round(self.max_us, 2),
+            "buckets_us": {**{f"le_{bound}": n for bound, n in zip(BUCKETS_US, self.counts)}, "overflow": self.counts[-1]}
+        }
+
+class RuleProfiler:
+    """
+    Usage (PolicyEngine):
+        rule_profiler.record(compiled_policy, index, rule, elapsed_ns, matched, error)
+    Bounded: the least recently evaluated rules are evicted past POLICY_PROFILE_MAX_RULES.
+    """
+
+    SORT_KEYS = {
+        "total": lambda h: h.total_us,
+        "mean": lambda h: h.total_us / h.count if h.count else 0.0,
+        "p99": lambda h: h.percentile(0.99) or 0.0,
+        "max": lambda h: h.max_us,
+        "count": lambda h: h.count,
+    }
+
+    def __init__(self, max_rules: Optional[int] = None):
+        self.enabled = settings.POLICY_PROFILE_ENABLED
+        self._rules = LRUCache(max_rules or settings.POLICY_PROFILE_MAX_RULES)
+
+    def record(self, policy: Any, index: int, rule: Any, elapsed_ns: int, matched: bool, error: bool = False):
+        if not self.enabled:
+            return
+        version = ".".join(str(part) for part in getattr(policy, "version", ()) or ())
+        key: RuleKey = (policy.key, version, index, rule.logic)
+        histogram = self._rules.get_or_build(key, lambda: RuleHistogram(policy.key, version, index, rule.logic, getattr(rule.action, "value", rule.action)))
+        histogram.record(elapsed_ns / 1000, bool(matched), error)
+
+    def hot_rules(self, limit: int = 20, sort: str = "total", policy: Optional[str] = None) -> List[Dict[str, Any]]:
+        sort_key = self.SORT_KEYS.get(sort, self.SORT_KEYS["total"])
+        histograms = self._rules.values()
+        if policy:
+            histograms = [h for h in histograms if h.policy == policy]
+        histograms.sort(key=sort_key, reverse=True)
+        return [h.to_dict() for h in histograms[:limit]]
+
+    def reset(self):
+        self._rules.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "rules": self._rules.stats()["size"], "max_rules": self._rules.maxsize}
+
+# Global Instance
+rule_profiler = RuleProfiler()
@@ -202,6 +202,7 @@ class RuleRead(RuleCreate):
 class DryRunRequest(BaseModel):
     policy: PolicyBase
     context: Dict[str, Any] = Field(default_factory=dict)
+    explain: bool = False   # Per-rule breakdown (timings, results, resolved values, paths read)
 
 class DryRunResult(BaseModel):
     is_valid: bool
@@ -209,6 +210,16 @@ class DryRunResult(BaseModel):
     warnings: List[str] = []
     mutations: List[Dict[str, Any]] = []
     side_effects: List[Dict[str, Any]] = []
+    explain: Optional[Dict[str, Any]] = None
+
+class DryRunBatchRequest(BaseModel):
+    policy: PolicyBase
+    entities: List[Dict[str, Any]] = Field(default_factory=list)  # Host rows (envelope 'host')
+    context: Dict[str, Any] = Field(default_factory=dict)         # Shared envelope (actor, system, ...)
+
+class DryRunBatchResult(BaseModel):
+    results: List[DryRunResult] = []
+    stats: Dict[str, Any] = Field(default_factory=dict)
 
 # ==============================================================================
 #  5. DUMB UI MANIFEST (Switchboard V2)
@@ -4,10 +4,10 @@
 # @description: Orchestrates the Lifecycle of Definitions.
 # @security-level: LEVEL 9 (Safety Interlocks)
 # @updated: Integrated Manifest-Driven Switchboard logic and KernelRelay (SystemOutbox) emission.
+# UPDATED: invalidate_cache() drives the compiled policy cache (local + cluster-wide NOTIFY).
 
 import logging
 import json
-import jmespath
 from typing import List, Optional, Dict, Any
 
 from sqlalchemy import select, delete, or_, desc, update
@@ -30,6 +30,8 @@ from app.core.meta.schemas import (
 )
 from app.core.meta.constants import ScopeType
 from app.core.meta.engine import policy_engine
+from app.core.meta.cache import policy_cache
+from app.core.meta.compiled import compile_expression
 from app.core.kernel.registry import domain_registry 
 from app.core.kernel.models import SystemOutbox # ⚡ Event Relay
 
@@ -46,7 +48,8 @@ class MetaService:
             logic = rule.get("logic", "")
             if not logic: continue 
             try:
-                jmespath.compile(logic)
+                # Compiles (and caches) the rule program at save time
+                compile_expression(logic)
             except Exception as e:
                 raise ValueError(f"Rule #{i+1} has invalid syntax: {logic}. Error: {str(e)}")
 
@@ -134,19 +137,42 @@ class MetaService:
             raise e
 
     @staticmethod
-    def dry_run_policy(policy_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    def dry_run_policy(policy_data: Dict[str, Any], context: Dict[str, Any], explain: bool = False) -> Dict[str, Any]:
         temp_policy = PolicyDefinition(
             key="dry_run_temp",
             rules=policy_data.get("rules", []),
             is_active=True
         )
-        result = policy_engine.evaluate(entity={}, policies=[temp_policy], context_override=context)
+        result = policy_engine.evaluate(entity={}, policies=[temp_policy], context_override=context, explain=explain)
         return {
             "is_valid": result.is_valid,
             "blocking_errors": result.blocking_errors,
             "warnings": result.warnings,
             "mutations": result.mutations,
-            "side_effects": result.side_effects
+            "side_effects": result.side_effects,
+            "explain": result.trace
+        }
+
+    @staticmethod
+    def dry_run_policy_batch(policy_data: Dict[str, Any], entities: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[str, Any]:
+        temp_policy = PolicyDefinition(
+            key="dry_run_temp",
+            rules=policy_data.get("rules", []),
+            is_active=True
+        )
+        batch = policy_engine.evaluate_batch(entities, [temp_policy], context=context)
+        return {
+            "results": [
+                {
+                    "is_valid": result.is_valid,
+                    "blocking_errors": result.blocking_errors,
+                    "warnings": result.warnings,
+                    "mutations": result.mutations,
+                    "side_effects": result.side_effects
+                }
+                for result in batch.results
+            ],
+            "stats": batch.stats
         }
 
     @staticmethod
@@ -254,6 +280,7 @@ class MetaService:
         db_obj = result.scalars().first()
         if not db_obj: return None
 
+        old_domain = db_obj.target_domain  # A moved binding must leave the old domain's cache too
         update_data = payload.model_dump(exclude_unset=True, mode='json')
         for field, value in update_data.items(): setattr(db_obj, field, value)
         await db.commit()
@@ -266,7 +293,9 @@ class MetaService:
         result = await db.execute(query)
         loaded_obj = result.scalars().first()
         
-        await MetaService.invalidate_cache(db_obj.target_domain)
+        await MetaService.invalidate_cache(loaded_obj.target_domain)
+        if old_domain != loaded_obj.target_domain:
+            await MetaService.invalidate_cache(old_domain)
         
         # ⚡ KERNEL RELAY EMISSION
         event = SystemOutbox(
@@ -447,11 +476,14 @@ class MetaService:
         db_obj = result.scalars().first()
         if not db_obj: return None
 
+        old_domain = db_obj.domain
         update_data = payload.model_dump(exclude_unset=True, mode='json')
         for field, value in update_data.items(): setattr(db_obj, field, value)
         await db.commit()
         await db.refresh(db_obj)
         await MetaService.invalidate_cache(db_obj.domain)
+        if old_domain != db_obj.domain:
+            await MetaService.invalidate_cache(old_domain)
         return db_obj
 
     @staticmethod
@@ -559,4 +591,6 @@ class MetaService:
 
     @staticmethod
     async def invalidate_cache(domain: str):
+        # Local drop + pg_notify to the other workers (callers invoke this after commit)
+        await policy_cache.broadcast(domain)
         logger.info(f"🔥 [CACHE] Invalidated for Domain: {domain}")
@@ -5,89 +5,173 @@
 # while preserving the Request Context (User Identity).
 # @security-level: LEVEL 10 (Context Preservation)
 # @invariant: Must propagate ContextVars to the Sidecar Thread.
+# UPDATED: Persistent sidecar loops (small pool) instead of one new thread + event loop per call.
+#          Per-call timeout.
 
 import asyncio
+import atexit
+import concurrent.futures
+import itertools
+import os
 import threading
 import logging
 import contextvars
-from typing import Any, Coroutine, TypeVar
+from typing import Any, Coroutine, List, Optional, TypeVar
+
+from app.core.config import settings
 
 logger = logging.getLogger("core.utilities.bridge")
 
 T = TypeVar("T")
 
+class _Sidecar:
+    """One daemon thread running one event loop forever."""
+
+    def __init__(self, name: str):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        if not self.loop.is_running():
+            self.loop.close()
+
 class AsyncBridge:
     """
     The Connector between the Blocking DB Layer and the Non-Blocking Logic Layer.
     Implements the 'Sidecar Thread' pattern with Context Propagation.
+
+    SIDECAR POOL:
+    ASYNC_BRIDGE_LOOPS long-lived loop threads are started on first use (and again after a fork).
+    Calls are spread round robin. Resources bound to a loop (e.g. async DB engines) can be cached
+    per sidecar loop, because the loops live as long as the process.
     """
 
-    @staticmethod
-    def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    def __init__(self, loops: Optional[int] = None, timeout: Optional[float] = None):
+        self.size = loops or settings.ASYNC_BRIDGE_LOOPS
+        self.timeout = timeout if timeout is not None else settings.ASYNC_BRIDGE_TIMEOUT_SECONDS
+        self._sidecars: List[_Sidecar] = []
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _pool(self) -> List[_Sidecar]:
+        # Threads do not survive fork(): a forked worker starts its own pool.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._sidecars = [_Sidecar(f"async-bridge-{i}") for i in range(self.size)]
+                    self._pid = os.getpid()
+                    logger.info(f"🧵 [Bridge] Started {self.size} sidecar loop(s).")
+        return self._sidecars
+
+    def owns_loop(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """True for the persistent sidecar loops of this process."""
+        return self._pid == os.getpid() and any(sidecar.loop is loop for sidecar in self._sidecars)
+
+    def _in_sidecar(self) -> bool:
+        current = threading.current_thread()
+        return any(sidecar.thread is current for sidecar in self._sidecars)
+
+    def run_sync(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
         """
-        Executes a coroutine synchronously by spawning a fresh Event Loop in a separate thread.
+        Executes a coroutine synchronously on a sidecar loop and blocks until it finishes.
         Crucially, it CARRIES the ContextVars (User Identity) across the thread boundary.
+
+        Args:
+            coro: The coroutine to run.
+            timeout (float): Seconds to wait (default ASYNC_BRIDGE_TIMEOUT_SECONDS, 0 = no limit).
+                             On expiry the coroutine is cancelled and TimeoutError is raised.
         """
-        result: list[T] = []
-        error: list[Exception] = []
-        
+        timeout = self.timeout if timeout is None else timeout
+
+        # A sidecar blocking on itself would deadlock: nested calls get an isolated loop.
+        if self._in_sidecar():
+            return self._run_isolated(coro)
+
+        pool = self._pool()
+        sidecar = pool[next(self._turn) % len(pool)]
+
         # ⚡ 1. CAPTURE CONTEXT
         # Snapshot the current state (User, Request ID, etc.)
-        # This allows the background thread to "know" who initiated the save.
+        # This allows the sidecar to "know" who initiated the save.
+        ctx = contextvars.copy_context()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        task_ref: List[asyncio.Task] = []
+
+        def schedule():
+            # ⚡ 2. EXECUTE WITHIN CONTEXT
+            # create_task() snapshots the *current* context, so it is called inside ctx.run().
+            task = ctx.run(sidecar.loop.create_task, coro)
+            task_ref.append(task)
+
+            def done(t: asyncio.Task):
+                if future.done():
+                    return
+                if t.cancelled():
+                    future.cancel()
+                elif t.exception() is not None:
+                    future.set_exception(t.exception())
+                else:
+                    future.set_result(t.result())
+            task.add_done_callback(done)
+
+        sidecar.loop.call_soon_threadsafe(schedule)
+
+        # ⚡ 3. BLOCK UNTIL DONE (Gatekeeper behavior)
+        try:
+            return future.result(timeout=timeout or None)
+        except concurrent.futures.TimeoutError:
+            sidecar.loop.call_soon_threadsafe(lambda: task_ref and task_ref[0].cancel())
+            logger.error(f"⏱️ [Bridge] Sidecar call exceeded {timeout}s. Cancelled.")
+            raise TimeoutError(f"AsyncBridge call exceeded {timeout}s")
+        except concurrent.futures.CancelledError:
+            raise asyncio.CancelledError()
+        except Exception as e:
+            logger.error(f"🔥 [Bridge] Sidecar Crash: {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _run_isolated(coro: Coroutine[Any, Any, T]) -> T:
+        """Legacy path: a fresh thread + loop for one coroutine (context carried via ctx.run)."""
+        result: list = []
+        error: list = []
         ctx = contextvars.copy_context()
 
         def target():
+            loop = asyncio.new_event_loop()
             try:
-                # ⚡ 2. SETUP SIDECAR LOOP
-                loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
-                
-                # ⚡ 3. EXECUTE WITHIN CONTEXT
-                # We wrap the execution in ctx.run() so the coroutine sees the vars.
-                # Note: We must wrap the loop.run_until_complete call itself,
-                # or create a wrapper task that runs in context.
-                
-                # Best practice: ctx.run(task)
-                async def context_wrapper():
-                    return await coro
-
-                # The loop itself doesn't need the context, the coroutine does.
-                # However, ctx.run() takes a callable.
-                # We simply run the loop logic.
-                res = loop.run_until_complete(
-                    # This ensures the async task inherits the context
-                    # But simpler: we just run the whole block in context if possible.
-                    # Actually, contextvars context applies to the *thread* execution stack.
-                    # So executing ctx.run(func) sets the context for 'func'.
-                    context_wrapper()
-                )
-                
-                result.append(res)
-                loop.close()
-                
+                result.append(loop.run_until_complete(coro))
             except Exception as e:
                 logger.error(f"🔥 [Bridge] Sidecar Crash: {e}", exc_info=True)
                 error.append(e)
+            finally:
+                loop.close()
 
-        # ⚡ 4. SPAWN THREAD WITH CONTEXT
-        # We pass 'target' to ctx.run, so 'target' runs with the variables set.
-        # But we are starting a NEW thread. ctx.run() only works in the CURRENT thread.
-        # To pass context to a NEW thread, we must run ctx.run INSIDE the new thread.
-        
-        def thread_bootstrap():
-            # "Re-hydrate" the context inside the new thread
-            ctx.run(target)
-
-        thread = threading.Thread(target=thread_bootstrap)
+        thread = threading.Thread(target=lambda: ctx.run(target))
         thread.start()
-        
-        # Block until the Sidecar finishes (Gatekeeper behavior)
         thread.join()
 
         if error:
             raise error[0]
-        
         return result[0] if result else None
 
-async_bridge = AsyncBridge()
+    def shutdown(self):
+        """Stops the sidecar loops (process exit)."""
+        with self._lock:
+            if self._pid == os.getpid():
+                for sidecar in self._sidecars:
+                    sidecar.stop()
+            self._sidecars = []
+            self._pid = None
 
+async_bridge = AsyncBridge()
+atexit.register(async_bridge.shutdown)
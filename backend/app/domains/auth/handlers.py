@@ -0,0 +1,14 @@
+# FILEPATH: backend/app/domains/auth/handlers.py
+# @file Auth Domain Event Handlers
+# @description Side effects executed by the BackgroundWorker for USER:* events.
+
+import logging
+
+from app.core.kernel.handlers import event_handlers
+from app.core.kernel.models import SystemOutbox
+
+logger = logging.getLogger("domains.auth.handlers")
+
+@event_handlers.on("USER:")
+async def audit_user_event(event: SystemOutbox):
+    logger.info(f"      👤 Audit Logged: {event.payload.get('data', {}).get('email')}")
@@ -4,17 +4,21 @@
 # @author: The Engineer (ansav8@gmail.com)
 # @description: Decoupled Governance sidecar. Fetches and evaluates policies independently.
 # @security-level: LEVEL 9 (Strict Decoupling)
+# UPDATED: Lookups use the shared sidecar pool instead of an engine per call.
+# UPDATED: fetch_policies() loads the bindings of several domains at once (flush-level batching).
+# UPDATED: Policies come from the compiled per-domain cache (core/meta/cache.py).
+# UPDATED: evaluate() forwards the changed paths (changeset-aware rule selection) and early_exit.
 
 import logging
-from typing import Dict, Any, Tuple
-from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.database.sidecar import sidecar_pool
 from app.core.kernel.context.manager import context_manager
 from app.core.meta.engine import policy_engine
-from app.core.meta.models import PolicyBinding, PolicyDefinition
+from app.core.meta.cache import policy_cache
+from app.core.meta.compiled import CompiledPolicy, Path
+from app.core.meta.models import PolicyDefinition
 from app.core.kernel.actions import LogicResult
 
 logger = logging.getLogger("meta_v2.governance.enforcer")
@@ -23,44 +27,48 @@ class GovernanceEnforcer:
     @staticmethod
     async def fetch_and_evaluate(frozen_obj: Any, obj: Any, domain_key: str, context_envelope: Dict[str, Any]) -> Tuple[LogicResult, Dict[str, Any]]:
         """
-        ⚡ SIDECAR IO: Spawns an independent DB session to fetch Policies, 
+        ⚡ SIDECAR IO: Borrows a pooled sidecar DB session to fetch Policies,
         resolves the context, and executes the Universal Logic Engine.
+        (Single object. The Interceptor batches a whole flush via fetch_policies + evaluate.)
         """
-        ephemeral_engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
         try:
-            async with AsyncSession(ephemeral_engine) as sidecar_db:
+            async with sidecar_pool.session() as sidecar_db:
                 # 1. Resolve Environment Context
                 env_ctx = await context_manager.resolve(sidecar_db, frozen_obj)
                 if env_ctx:
                     context_envelope.update(env_ctx)
 
                 # 2. Fetch Active Bindings
-                stmt = select(PolicyBinding).options(
-                    selectinload(PolicyBinding.policy),
-                    selectinload(PolicyBinding.group)
-                ).where(
-                    PolicyBinding.target_domain == domain_key,
-                    PolicyBinding.is_active == True
-                ).order_by(desc(PolicyBinding.priority))
+                policies = (await GovernanceEnforcer.fetch_policies(sidecar_db, [domain_key]))[domain_key]
 
-                bindings = (await sidecar_db.execute(stmt)).scalars().all()
-                
-                policies = []
-                for b in bindings:
-                    if b.policy_id and b.policy and b.policy.is_active:
-                        policies.append(b.policy)
-
-                # 3. Evaluate (Or Pass gracefully if no rules)
-                if not policies:
-                    return LogicResult(is_valid=True), context_envelope
-
-                result = policy_engine.evaluate(entity=obj, policies=policies, context_override=context_envelope)
-                return result, context_envelope
+            # 3. Evaluate (Or Pass gracefully if no rules)
+            return GovernanceEnforcer.evaluate(obj, policies, context_envelope), context_envelope
         except Exception as e:
             logger.error(f"🔥 [GovernanceEnforcer] Database or Context Failure: {e}")
             raise e
-        finally:
-            await ephemeral_engine.dispose()
+
+    @staticmethod
+    async def fetch_policies(db: AsyncSession, domain_keys: Iterable[str]) -> Dict[str, Sequence[CompiledPolicy]]:
+        """
+        ⚡ SIDECAR IO (cache misses only): Active policies of several domains, ONE query for all misses.
+        Returns: { domain_key: (CompiledPolicy, ...) } in binding priority order (every key present).
+        """
+        return await policy_cache.get_many(db, domain_keys)
+
+    @staticmethod
+    def evaluate(
+        obj: Any,
+        policies: Sequence[CompiledPolicy],
+        context_envelope: Dict[str, Any],
+        changed: Optional[Iterable[Path]] = None,
+        early_exit: bool = False
+    ) -> LogicResult:
+        """CPU LOGIC: Evaluates preloaded policies against one object (pass if there are none)."""
+        if not policies:
+            return LogicResult(is_valid=True)
+        return policy_engine.evaluate(
+            entity=obj, policies=policies, context_override=context_envelope, changed=changed, early_exit=early_exit
+        )
 
     @staticmethod
     def evaluate_guard_sync(obj: Any, guard_expr: str, context_envelope: Dict[str, Any]) -> LogicResult:
@@ -4,6 +4,7 @@
 # @description: Configures FastAPI.
 # @security-level: LEVEL 10 (Enterprise Worker Safe)
 # @updated: Wires System Registry to ensure GLOBAL domain boots into RAM.
+# @updated: Outbox partitions are prepared at boot, before the first outbox insert.
 
 import logging
 import time
@@ -18,11 +19,14 @@ from sqlalchemy import select
 
 from app.core.config import settings
 from app.core.database.session import engine, AsyncSessionLocal
+from app.core.database.sidecar import sidecar_pool
+from app.core.meta.cache import policy_cache_listener
 
 from app.core.loader import load_domains
 from app.core.kernel.interceptor import LogicInterceptor
 from app.core.kernel.registry import domain_registry
 from app.core.kernel.enforcer import DomainEnforcer
+from app.core.kernel.retention import prepare_outbox
 
 # ⚡ MIDDLEWARE
 from app.middleware.context import ContextMiddleware
@@ -49,6 +53,8 @@ logger = logging.getLogger("flodock.main")
 async def lifespan(app: FastAPI):
     logger.info("🚀 [Flodock] Platform Starting...")
     LogicInterceptor.register(Session)
+    await policy_cache_listener.start()
+    await prepare_outbox()
     
     # ⚡ PHASE 1: KERNEL BOOT (Read-Only Cache Hydration)
     async with AsyncSessionLocal() as session:
@@ -66,6 +72,9 @@ async def lifespan(app: FastAPI):
     
     yield
     logger.info("🛑 [Flodock] Platform Shutting Down...")
+    await policy_cache_listener.stop()
+    await sidecar_pool.dispose()  # This loop's pool (committed cache reads of the validate stage)
+    sidecar_pool.dispose_all()
     await engine.dispose()
 
 def create_application() -> FastAPI:
@@ -2,65 +2,62 @@
 # @file: Kafka Event Viewer
 # @author: The Engineer
 # @description: Connects to the 'flodock.events' topic and prints messages.
+# UPDATED: Runs on the StreamConsumer runtime (batched getmany, manual commits).
+# UPDATED: Refuses to run standalone on the memory transport.
 
 import asyncio
 import logging
 import json
 import sys
 import os
-from aiokafka import AIOKafkaConsumer
 
 # ⚡ BOOTSTRAP PATH (FIXED)
 # Use the directory of this script (backend/) as the root for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.core.config import settings
+from app.core.kernel.handlers import EventHandlerRegistry
+from app.core.kernel.consumer import StreamConsumer, StreamEvent, MemoryIdempotencyStore
+from app.core.kernel.bus import is_memory_transport
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [CONSUMER] %(message)s")
 logger = logging.getLogger("kafka.consumer")
 
+# The viewer is a regular stream consumer with a single catch-all handler.
+viewer_handlers = EventHandlerRegistry()
+
+@viewer_handlers.on("*")
+async def print_event(event: StreamEvent):
+    domain = event.payload.get('domain', '?') if isinstance(event.payload, dict) else '?'
+    logger.info(f"📨 [{event.partition}@{event.offset}] {event.event_name} ({domain})")
+    print(json.dumps(event.payload, indent=2, default=str))
+    print("-" * 50)
+
 async def consume():
     servers = getattr(settings, "KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
-    prefix = getattr(settings, "KAFKA_TOPIC_PREFIX", "flodock")
-    topic = f"{prefix}.events"
-    
     logger.info(f"👂 [Consumer] Connecting to {servers}...")
-    logger.info(f"   Topic: {topic}")
 
-    consumer = AIOKafkaConsumer(
-        topic,
-        bootstrap_servers=servers,
-        group_id="flodock-cli-viewer-v1",
-        value_deserializer=lambda x: json.loads(x.decode('utf-8')),
-        auto_offset_reset="earliest"
+    runtime = StreamConsumer(
+        "flodock-cli-viewer-v1",
+        viewer_handlers,
+        concurrency=1,
+        # The viewer keeps no state in the database.
+        idempotency_store=MemoryIdempotencyStore()
     )
-
-    try:
-        await consumer.start()
-        logger.info("✅ [Consumer] Connected. Waiting for events...")
-        logger.info("------------------------------------------------")
-
-        async for msg in consumer:
-            payload = msg.value
-            event_name = payload.get('event_name', 'UNKNOWN')
-            
-            inner = payload.get('payload', {})
-            domain = inner.get('domain', '?') if isinstance(inner, dict) else '?'
-            
-            logger.info(f"📨 [{msg.offset}] {event_name} ({domain})")
-            print(json.dumps(payload, indent=2))
-            print("-" * 50)
-
-    except Exception as e:
-        logger.error(f"🔥 [Consumer] Error: {e}")
-    finally:
-        await consumer.stop()
+    logger.info(f"   Topic: {', '.join(runtime.topics)}")
+    await runtime.start()
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        
+
+    # The memory bus only exists inside one process: a standalone viewer would wait forever.
+    if is_memory_transport():
+        logger.critical("🛑 [Consumer] EVENT_BUS_TRANSPORT=memory: nothing to view from another process. "
+                        "Register the consumer with the single-node runner (app/core/kernel/node.py).")
+        sys.exit(1)
+
     try:
         asyncio.run(consume())
     except KeyboardInterrupt:
@@ -0,0 +1,154 @@
+# FILEPATH: backend/scripts/bench/policy_compiler.py
+# @file: Policy Rule Compiler Benchmark
+# @author: The Engineer
+# @description: Interpreted (jmespath) vs native (core/meta/compiler.py) rule evaluation.
+#              Corpus: every 'logic' / 'guard' expression found in the app's seeds.py modules,
+#              plus a synthetic rule set of growing depth. Every result is cross-checked against
+#              the interpreter before timing. No Database required.
+#
+# Usage:
+#   python scripts/bench/policy_compiler.py --iterations 20000
+
+import argparse
+import importlib
+import os
+import pkgutil
+import random
+import sys
+import time
+
+# ⚡ PATH INJECTION
+current_file = os.path.abspath(__file__)
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import jmespath
+
+import app
+from app.core.meta.compiler import compile_native
+
+SYNTHETIC = [
+    "host.amount > `1000`",
+    "host.status == 'DRAFT'",
+    "host.status != 'DRAFT' && host.amount >= `10`",
+    "host.is_system_user && host.role != 'admin'",
+    "contains(host.email, '@example.com') || contains(host.email, 'test')",
+    "length(host.tags) > `2` && contains(host.tags, 'vip')",
+    "!host.is_active || host.amount < `0`",
+    "meta.risk.score >= `0.75` && actor.role != 'admin' && system.environment == 'production'",
+    "changeset.status.new == 'APPROVED' && changeset.status.old != 'SUBMITTED'",
+    "host.a == `1` && host.b == `2` && host.c == `3` && host.d == `4` && host.e == `5`",
+]
+
+def collect_seed_expressions():
+    """'logic' and 'guard' strings from every seeds.py module under app/."""
+    found = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ("logic", "guard") and isinstance(value, str) and value:
+                    found.append(value)
+                else:
+                    walk(value)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                walk(item)
+
+    for module_info in pkgutil.walk_packages(app.__path__, prefix="app."):
+        if not module_info.name.endswith(".seeds"):
+            continue
+        try:
+            module = importlib.import_module(module_info.name)
+        except Exception as e:
+            print(f"   skip {module_info.name}: {e}")
+            continue
+        for name, value in vars(module).items():
+            if name.isupper():
+                walk(value)
+    return list(dict.fromkeys(found))
+
+def make_envelopes(count: int):
+    rng = random.Random(7)
+    statuses = ["DRAFT", "SUBMITTED", "APPROVED", "REJECTED"]
+    envelopes = []
+    for i in range(count):
+        envelopes.append({
+            "host": {
+                "id": i,
+                "amount": rng.choice([-5, 0, 10, 999, 1000, 1001, 5000.5]),
+                "status": rng.choice(statuses),
+                "is_active": rng.choice([True, False, None, 0, 1]),
+                "is_system_user": rng.choice([True, False]),
+                "role": rng.choice(["admin", "user", None]),
+                "email": rng.choice(["a@example.com", "ops@corp.io", "test.user@corp.io"]),
+                "tags": rng.choice([[], ["vip"], ["a", "b", "vip"], ["a", "b", "c"]]),
+                "a": 1, "b": 2, "c": rng.choice([3, True]), "d": 4, "e": 5,
+            },
+            "meta": {"risk": {"score": rng.random()}} if i % 3 else {},
+            "actor": {"id": 1, "role": rng.choice(["admin", "user"])},
+            "system": {"environment": rng.choice(["production", "development"])},
+            "changeset": {"status": {"old": rng.choice(statuses), "new": rng.choice(statuses)}},
+        })
+    return envelopes
+
+def outcome(expression, envelope):
+    try:
+        return ("ok", expression.search(envelope))
+    except Exception as e:
+        return ("error", type(e).__name__)
+
+def bench(name, expressions, envelopes, iterations):
+    interpreted = [jmespath.compile(source) for source in expressions]
+    native = [compile_native(source, parsed.parsed) for source, parsed in zip(expressions, interpreted)]
+    supported = [(i, n) for i, n in zip(interpreted, native) if n is not None]
+
+    mismatches = 0
+    for slow, fast in supported:
+        for envelope in envelopes:
+            if outcome(slow, envelope) != outcome(fast, envelope):
+                mismatches += 1
+                print(f"   ❌ MISMATCH {slow.expression!r}: {outcome(slow, envelope)} != {outcome(fast, envelope)}")
+                break
+
+    if not supported:
+        print(f"{name:<10} {len(expressions)} rules, none in the native subset")
+        return
+
+    rounds = max(1, iterations // len(envelopes))
+    timings = {}
+    for label, programs in (("interp", [s for s, _ in supported]), ("native", [f for _, f in supported])):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for envelope in envelopes:
+                for program in programs:
+                    try:
+                        program.search(envelope)
+                    except Exception:
+                        pass
+        timings[label] = time.perf_counter() - start
+
+    evaluations = rounds * len(envelopes) * len(supported)
+    print(f"{name:<10} {len(supported)}/{len(expressions)} native | "
+          f"interp {timings['interp'] / evaluations * 1e6:6.2f}us | "
+          f"native {timings['native'] / evaluations * 1e6:6.2f}us | "
+          f"x{timings['interp'] / timings['native']:.1f} | mismatches {mismatches}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Interpreted vs native policy rule evaluation.")
+    parser.add_argument("--iterations", type=int, default=20000, help="Envelope evaluations per rule set")
+    parser.add_argument("--envelopes", type=int, default=500)
+    args = parser.parse_args()
+
+    envelopes = make_envelopes(args.envelopes)
+    seeds = collect_seed_expressions()
+
+    print(f"📊 {args.envelopes} envelopes | {args.iterations} evaluations per rule")
+    print("-" * 90)
+    bench("seeds", seeds, envelopes, args.iterations)
+    bench("synthetic", SYNTHETIC, envelopes, args.iterations)
+    print("-" * 90)
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ import logging
 import json
 import sys
 import os
-from aiokafka import AIOKafkaConsumer
 
 # ⚡ PATH INJECTION (ROBUST)
 # File: .../backend/scripts/kafka/consume.py
@@ -21,6 +20,7 @@ if backend_dir not in sys.path:
 
 try:
     from app.core.config import settings
+    from app.core.kernel.bus import create_consumer
 except ImportError:
     print(f"❌ Python Import Error. Could not find 'app' module.")
     print(f"   Checked Path: {backend_dir}")
@@ -37,7 +37,7 @@ async def consume():
     
     logger.info(f"👂 [Consumer] Connecting to {servers}...")
     
-    consumer = AIOKafkaConsumer(
+    consumer = create_consumer(
         topic,
         bootstrap_servers=servers,
         group_id="flodock-cli-viewer-v1",
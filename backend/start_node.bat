@@ -0,0 +1,33 @@
+:: FILEPATH: backend/start_node.bat
+:: @file Single-Node Launcher
+:: @author The Engineer
+:: @description Starts Relay + Worker + Stream Consumers in one process (memory event bus).
+
+@ECHO OFF
+TITLE Flodock Single Node
+
+REM Ensure we are in backend root
+CD /D "%~dp0"
+
+REM ⚡ CRITICAL: Add the current directory (backend) to Python Path
+REM This ensures 'from app.core...' imports work correctly.
+SET PYTHONPATH=%~dp0
+
+REM Activate Virtual Env
+IF EXIST "venv\Scripts\activate.bat" (
+    CALL venv\Scripts\activate.bat
+) ELSE (
+    ECHO [WARNING] No venv found. Running global python...
+)
+
+ECHO ==========================================
+ECHO   🏠 FLODOCK SINGLE NODE (Memory Bus)
+ECHO ==========================================
+ECHO   Relay, Worker and Stream Consumers share one process.
+ECHO.
+
+SET EVENT_BUS_TRANSPORT=memory
+python app/core/kernel/node.py
+
+PAUSE
+
@@ -0,0 +1,54 @@
+# FILEPATH: backend/tests/kernel/test_deadletter_replay.py
+# @file: Dead Letter Replay Tests (Postgres)
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.kernel import deadletter
+from app.core.kernel.deadletter import DeadLetterStore
+from app.core.kernel.models import SystemOutbox, OutboxDeadLetter
+from tests.support import kernel_tables
+
+TABLES = [SystemOutbox.__table__, OutboxDeadLetter.__table__]
+
+async def _letters(db, *consumers):
+    letters = [
+        OutboxDeadLetter(
+            outbox_id=i + 1, outbox_seq=i + 1, consumer=consumer, event_name="TEST:STEP",
+            partition_key="A", payload={}, attempts=3, last_error="boom"
+        )
+        for i, consumer in enumerate(consumers)
+    ]
+    db.add_all(letters)
+    await db.commit()
+    return [letter.id for letter in letters]
+
+@pytest.mark.parametrize("rate", [0, -5])
+def test_replay_rejects_a_non_positive_rate(rate):
+    async def scenario():
+        with pytest.raises(ValueError):
+            await DeadLetterStore.replay(None, rate=rate)
+        with pytest.raises(ValueError):
+            DeadLetterStore.schedule_replay([1], rate=rate)
+
+    asyncio.run(scenario())
+
+def test_scheduled_replay_runs_in_its_own_session(postgres_url, monkeypatch):
+    async def scenario():
+        async with kernel_tables(postgres_url, TABLES) as sessions:
+            monkeypatch.setattr(deadletter, "AsyncSessionLocal", sessions)
+            async with sessions() as db:
+                ids = await _letters(db, "worker", "projection", "worker")
+                queued = await DeadLetterStore.pending_ids(db, consumer="worker")
+                assert queued == [ids[0], ids[2]]
+
+            await DeadLetterStore.schedule_replay(queued, rate=1000)
+
+            async with sessions() as db:
+                events = (await db.execute(select(SystemOutbox).order_by(SystemOutbox.id))).scalars().all()
+                assert [event.target_consumer for event in events] == ["worker", "worker"]
+                assert await DeadLetterStore.pending_ids(db) == [ids[1]]
+
+    asyncio.run(scenario())
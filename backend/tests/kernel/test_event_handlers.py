@@ -0,0 +1,116 @@
+# FILEPATH: backend/tests/kernel/test_event_handlers.py
+# @file: Event Handler Registry & Worker Dispatch Tests
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.kernel.handlers import EventHandlerRegistry
+
+def _registry(*patterns):
+    """A registry with one named no-op handler per pattern."""
+    registry = EventHandlerRegistry()
+    for pattern in patterns:
+        async def handler(event):
+            pass
+        handler.__name__ = pattern
+        registry.register(pattern, handler)
+    return registry
+
+def _names(handlers):
+    return [handler.__name__ for handler in handlers]
+
+def test_exact_prefix_and_wildcard_patterns():
+    registry = _registry("USER:CREATED", "USER:", "*", "ORDER:")
+
+    assert _names(registry.resolve("USER:CREATED")) == ["USER:CREATED", "USER:", "*"]
+    assert _names(registry.resolve("USER:DELETED")) == ["USER:", "*"]
+    assert _names(registry.resolve("ORDER:PAID")) == ["*", "ORDER:"]
+    # A prefix needs its ':' boundary; an exact name is not a prefix.
+    assert _names(registry.resolve("USERS:X")) == ["*"]
+    assert _names(registry.resolve("USER:CREATED:V2")) == ["USER:", "*"]
+
+def test_handlers_of_one_pattern_keep_registration_order():
+    registry = EventHandlerRegistry()
+    calls = []
+
+    @registry.on("USER:")
+    async def first(event):
+        calls.append("first")
+
+    @registry.on("USER:")
+    async def second(event):
+        calls.append("second")
+
+    async def run():
+        for handler in registry.resolve("USER:CREATED"):
+            await handler(None)
+
+    asyncio.run(run())
+    assert calls == ["first", "second"]
+
+def test_registration_invalidates_resolved_names():
+    registry = _registry("USER:")
+    assert _names(registry.resolve("USER:CREATED")) == ["USER:"]
+    assert registry.resolve("AUDIT:X") == []
+
+    @registry.on("AUDIT:")
+    async def audit(event):
+        pass
+
+    assert _names(registry.resolve("AUDIT:X")) == ["audit"]
+
+def test_sync_handlers_are_rejected():
+    registry = EventHandlerRegistry()
+    with pytest.raises(TypeError):
+        registry.register("USER:", lambda event: None)
+    assert registry.resolve("USER:CREATED") == []
+
+# --- WORKER DISPATCH ---
+
+@pytest.fixture
+def worker_cls():
+    pytest.importorskip("fastapi")  # The worker imports the domain handlers (API layer)
+    from app.core.kernel.worker import BackgroundWorker
+    return BackgroundWorker
+
+def _event(event_id, key, name="TEST:STEP"):
+    return SimpleNamespace(id=event_id, event_name=name, partition_key=key, payload={}, entity_id=None)
+
+def test_dispatch_keeps_key_order_and_stops_a_lane_at_its_first_failure(worker_cls):
+    worker = worker_cls(concurrency=4)
+    worker.handlers = EventHandlerRegistry()
+    seen = []
+
+    @worker.handlers.on("TEST:")
+    async def step(event):
+        await asyncio.sleep(0)
+        if event.id == 3:
+            raise RuntimeError("boom")
+        seen.append((event.partition_key, event.id))
+
+    events = [_event(1, "a"), _event(2, "b"), _event(3, "a"), _event(4, "b"), _event(5, "a")]
+    succeeded, errors = asyncio.run(worker.dispatch(events))
+
+    assert succeeded == {1, 2, 4}
+    assert errors == {3: "RuntimeError: boom"}
+    assert [i for key, i in seen if key == "a"] == [1]       # 5 waits behind the failed 3
+    assert [i for key, i in seen if key == "b"] == [2, 4]
+
+def test_dispatch_runs_at_most_concurrency_lanes(worker_cls):
+    worker = worker_cls(concurrency=2)
+    worker.handlers = EventHandlerRegistry()
+    active, peak = 0, 0
+
+    @worker.handlers.on("TEST:")
+    async def step(event):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    succeeded, errors = asyncio.run(worker.dispatch([_event(i, f"k{i}") for i in range(6)]))
+    assert succeeded == set(range(6)) and not errors
+    assert peak == 2
@@ -0,0 +1,92 @@
+# FILEPATH: backend/tests/kernel/test_memory_broker.py
+# @file: Memory Broker Tests (in-process event bus)
+
+import asyncio
+
+from app.core.kernel.bus import MemoryBroker, MemoryConsumer, MemoryProducer, TopicPartition
+
+async def _send(broker, topic, records):
+    producer = MemoryProducer(broker=broker)
+    await producer.start()
+    for key, value in records:
+        await producer.send(topic, value, key=key)
+
+def test_keyed_records_keep_their_partition_and_order():
+    async def scenario():
+        broker = MemoryBroker(partitions=4)
+        await _send(broker, "t", [(f"k{i % 3}".encode(), str(i).encode()) for i in range(30)])
+
+        consumer = MemoryConsumer("t", broker=broker, auto_offset_reset="earliest")
+        await consumer.start()
+        batches = await consumer.getmany(max_records=100)
+
+        by_key = {}
+        for tp, records in batches.items():
+            for record in records:
+                assert record.partition == tp.partition
+                by_key.setdefault(record.key, set()).add(record.partition)
+                assert [r.offset for r in records] == list(range(len(records)))
+        assert sum(len(records) for records in batches.values()) == 30
+        assert all(len(partitions) == 1 for partitions in by_key.values())
+
+    asyncio.run(scenario())
+
+def test_group_members_split_partitions_and_resume_from_commits():
+    async def scenario():
+        broker = MemoryBroker(partitions=4)
+        first = MemoryConsumer("t", group_id="g", broker=broker, auto_offset_reset="earliest", enable_auto_commit=False)
+        second = MemoryConsumer("t", group_id="g", broker=broker, auto_offset_reset="earliest", enable_auto_commit=False)
+        await first.start()
+        await second.start()
+        assert first.assignment() | second.assignment() == {TopicPartition("t", p) for p in range(4)}
+        assert not first.assignment() & second.assignment()
+
+        await _send(broker, "t", [(None, b"x")] * 8)
+        records = await first.getmany()
+        await first.commit()
+        await first.stop()
+
+        # The survivor takes over every partition and starts after the committed offsets.
+        assert len(second.assignment()) == 4
+        taken = {tp: len(batch) for tp, batch in records.items()}
+        for tp in taken:
+            assert await second.position(tp) == taken[tp]
+
+    asyncio.run(scenario())
+
+def test_members_with_different_topics_get_every_partition():
+    async def scenario():
+        broker = MemoryBroker(partitions=3)
+        orders = MemoryConsumer("orders", group_id="g", broker=broker)
+        both = MemoryConsumer("orders", "audit", group_id="g", broker=broker)
+        audit = MemoryConsumer("audit", group_id="g", broker=broker)
+        for member in (orders, both, audit):
+            await member.start()
+
+        assigned = [tp for member in (orders, both, audit) for tp in member.assignment()]
+        expected = {TopicPartition(topic, p) for topic in ("orders", "audit") for p in range(3)}
+        assert sorted(assigned) == sorted(expected)
+        for member in (orders, both, audit):
+            assert {tp.topic for tp in member.assignment()} <= member.topics
+
+    asyncio.run(scenario())
+
+def test_broker_survives_several_event_loops():
+    broker = MemoryBroker(partitions=1)
+
+    async def round_trip(value):
+        consumer = MemoryConsumer("t", broker=broker)
+        await consumer.start()
+
+        async def late_send():
+            await asyncio.sleep(0.01)
+            await _send(broker, "t", [(None, value)])
+
+        sender = asyncio.create_task(late_send())
+        batches = await consumer.getmany(timeout_ms=1000)
+        await sender
+        return [record.value for records in batches.values() for record in records]
+
+    # Each asyncio.run has its own loop; the broker's wake-up event must follow it.
+    assert asyncio.run(round_trip(b"one")) == [b"one"]
+    assert asyncio.run(round_trip(b"two")) == [b"two"]
@@ -0,0 +1,38 @@
+# FILEPATH: backend/tests/kernel/test_node.py
+# @file: Single-Node Runner Tests
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core.config import settings
+from app.core.kernel.handlers import EventHandlerRegistry
+from app.core.kernel.consumer import MemoryIdempotencyStore, StreamConsumer
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_standalone_relay_refuses_the_memory_transport():
+    env = {**os.environ, "EVENT_BUS_TRANSPORT": "memory"}
+    result = subprocess.run(
+        [sys.executable, os.path.join("app", "core", "kernel", "relay.py")],
+        cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 1
+    assert "node.py" in result.stderr
+
+def test_node_forces_the_memory_transport_and_hosts_registered_consumers(monkeypatch):
+    pytest.importorskip("fastapi")  # The worker imports the domain handlers (API layer)
+    from app.core.kernel import node
+
+    monkeypatch.setattr(settings, "EVENT_BUS_TRANSPORT", "kafka")
+    monkeypatch.setattr(node, "_stream_consumers", [])
+
+    @node.stream_consumer
+    def projection():
+        return StreamConsumer("projection", EventHandlerRegistry(), idempotency_store=MemoryIdempotencyStore())
+
+    single = node.SingleNode()
+    assert settings.EVENT_BUS_TRANSPORT == "memory"
+    assert [consumer.group_id for consumer in single.consumers] == ["projection"]
@@ -0,0 +1,56 @@
+# FILEPATH: backend/tests/kernel/test_outbox_leases.py
+# @file: Outbox Shard Lease Tests (Postgres)
+
+import asyncio
+
+from app.core.config import settings
+from app.core.kernel.models import OutboxCheckpoint, OutboxMember
+from app.core.kernel.outbox import OutboxStore
+from tests.support import kernel_tables
+
+CONSUMER = "test-relay"
+
+async def _lease(sessions, owner):
+    async with sessions() as db:
+        return [cp.shard for cp in await OutboxStore.lease_shards(db, CONSUMER, owner)]
+
+def test_newcomer_gets_fair_share_after_one_round_each(postgres_url, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_SHARDS", 16)
+
+    async def scenario():
+        async with kernel_tables(postgres_url, [OutboxCheckpoint.__table__, OutboxMember.__table__]) as sessions:
+            async with sessions() as db:
+                await OutboxStore.ensure_checkpoints(db, CONSUMER)
+
+            assert len(await _lease(sessions, "a")) == 16
+
+            # The newcomer holds nothing yet but is counted from its first heartbeat.
+            assert await _lease(sessions, "b") == []
+            a = await _lease(sessions, "a")
+            b = await _lease(sessions, "b")
+            assert (len(a), len(b)) == (8, 8)
+            assert set(a).isdisjoint(b)
+
+            # Stable afterwards
+            assert await _lease(sessions, "a") == a
+            assert await _lease(sessions, "b") == b
+
+    asyncio.run(scenario())
+
+def test_release_hands_shards_back(postgres_url, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_SHARDS", 16)
+
+    async def scenario():
+        async with kernel_tables(postgres_url, [OutboxCheckpoint.__table__, OutboxMember.__table__]) as sessions:
+            async with sessions() as db:
+                await OutboxStore.ensure_checkpoints(db, CONSUMER)
+            await _lease(sessions, "a")
+            await _lease(sessions, "b")
+            await _lease(sessions, "a")
+            assert len(await _lease(sessions, "b")) == 8
+
+            async with sessions() as db:
+                await OutboxStore.release(db, CONSUMER, "b")
+            assert len(await _lease(sessions, "a")) == 16
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+# FILEPATH: backend/tests/kernel/test_outbox_parking.py
+# @file: Per-Key Retry Parking Tests (Postgres)
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.kernel.models import (
+    SystemOutbox, OutboxCheckpoint, OutboxMember, OutboxParkedEvent, OutboxDeadLetter
+)
+from app.core.kernel.outbox import OutboxCursor
+from tests.support import kernel_tables
+
+TABLES = [
+    SystemOutbox.__table__, OutboxCheckpoint.__table__, OutboxMember.__table__,
+    OutboxParkedEvent.__table__, OutboxDeadLetter.__table__
+]
+
+@pytest.fixture(autouse=True)
+def immediate_retries(monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+
+async def _append(db, *keys):
+    """Appends one event per key, all on shard 0 (so the keys share a checkpoint)."""
+    events = [SystemOutbox(event_name="TEST:STEP", partition_key=key, payload={}, shard=0) for key in keys]
+    db.add_all(events)
+    await db.commit()
+    return events
+
+async def _parked(db):
+    rows = await db.execute(select(OutboxParkedEvent).order_by(OutboxParkedEvent.id))
+    return [(row.partition_key, row.outbox_id, row.attempts) for row in rows.scalars().all()]
+
+def _ids(batches):
+    return [event.id for shard_events in batches.values() for event in shard_events]
+
+def test_failing_key_is_parked_and_the_shard_moves_on(postgres_url):
+    async def scenario():
+        async with kernel_tables(postgres_url, TABLES) as sessions:
+            cursor = OutboxCursor("worker")
+            async with sessions() as db:
+                await cursor.open(db)
+                a1, b1, a2, b2 = await _append(db, "A", "B", "A", "B")
+
+                batches = await cursor.poll(db)
+                assert _ids(batches) == [a1.id, b1.id, a2.id, b2.id]
+                # Lane A fails on a1 (a2 never runs), lane B succeeds.
+                await cursor.settle(db, batches, {b1.id, b2.id}, {a1.id: "boom"})
+                assert await _parked(db) == [("A", a1.id, 1), ("A", a2.id, 0)]
+
+                a3, b3 = await _append(db, "A", "B")
+                batches = await cursor.poll(db)
+                # A replays from its queue; its new event is held; B reads straight from the log.
+                assert _ids(batches) == [a1.id, a2.id, b3.id]
+                await cursor.settle(db, batches, {a1.id, a2.id, b3.id}, {})
+                assert await _parked(db) == [("A", a3.id, 0)]
+
+                batches = await cursor.poll(db)
+                assert _ids(batches) == [a3.id]
+                await cursor.settle(db, batches, {a3.id}, {})
+                assert await _parked(db) == []
+                assert await cursor.poll(db) == {}
+
+    asyncio.run(scenario())
+
+def test_exhausted_head_is_dead_lettered_and_the_key_continues(postgres_url):
+    async def scenario():
+        async with kernel_tables(postgres_url, TABLES) as sessions:
+            cursor = OutboxCursor("worker")
+            async with sessions() as db:
+                await cursor.open(db)
+                a1, a2 = await _append(db, "A", "A")
+
+                for _ in range(settings.OUTBOX_MAX_ATTEMPTS):
+                    batches = await cursor.poll(db)
+                    assert _ids(batches)[0] == a1.id
+                    await cursor.settle(db, batches, set(), {a1.id: "boom"})
+
+                letters = (await db.execute(select(OutboxDeadLetter))).scalars().all()
+                assert [(letter.outbox_id, letter.attempts) for letter in letters] == [(a1.id, 3)]
+                assert await _parked(db) == [("A", a2.id, 0)]
+
+                batches = await cursor.poll(db)
+                assert _ids(batches) == [a2.id]
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+# FILEPATH: backend/tests/kernel/test_outbox_retention.py
+# @file: Outbox Retention Tests (Postgres)
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.core.kernel.models import SystemOutbox, OutboxCheckpoint, ConsumerInbox
+from app.core.kernel.retention import DEFAULT_PARTITION, OutboxRetention
+from tests.support import kernel_tables
+
+TABLES = [SystemOutbox.__table__, OutboxCheckpoint.__table__, ConsumerInbox.__table__]
+
+async def _count(db, table):
+    return (await db.execute(text(f"SELECT count(*) FROM {table}"))).scalar()
+
+def test_drain_default_moves_rows_into_daily_partitions(postgres_url):
+    async def scenario():
+        async with kernel_tables(postgres_url, TABLES) as sessions:
+            async with sessions() as db:
+                # No daily partition yet: the insert lands in DEFAULT.
+                db.add(SystemOutbox(event_name="TEST:CREATED", partition_key="k1", payload={"n": 1}))
+                await db.commit()
+                assert await _count(db, DEFAULT_PARTITION) == 1
+
+                assert await OutboxRetention.drain_default(db) == 1
+                today = OutboxRetention.partition_name(datetime.utcnow().date())
+                assert await _count(db, DEFAULT_PARTITION) == 0
+                assert await _count(db, today) == 1
+
+                # The day partition exists, so pre-making no longer collides with DEFAULT.
+                assert today in await OutboxRetention.ensure_partitions(db, days_ahead=1)
+                assert await OutboxRetention.drain_default(db) == 0
+
+    asyncio.run(scenario())
+
+def test_run_retires_only_fully_consumed_partitions(postgres_url):
+    async def scenario():
+        async with kernel_tables(postgres_url, TABLES) as sessions:
+            async with sessions() as db:
+                old = datetime.utcnow() - timedelta(days=30)
+                event = SystemOutbox(event_name="TEST:CREATED", partition_key="k1", payload={}, created_at=old)
+                db.add(event)
+                await db.commit()
+                await db.refresh(event)  # txid is a server default
+                position = {"txid": event.txid, "seq": event.seq}
+                await OutboxRetention.drain_default(db)
+                partition = OutboxRetention.partition_name(old.date())
+
+                # A cursor still before the row keeps the partition.
+                db.add(OutboxCheckpoint(consumer="relay", shard=event.shard, last_txid=0, last_seq=0))
+                await db.commit()
+                summary = await OutboxRetention.run(db, retention_days=7, archive=False)
+                assert partition in summary["kept"]
+
+                await db.execute(
+                    text("UPDATE system_outbox_checkpoints SET last_txid = :txid, last_seq = :seq"),
+                    position
+                )
+                await db.commit()
+                summary = await OutboxRetention.run(db, retention_days=7, archive=False)
+                assert partition in summary["dropped"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+# FILEPATH: backend/tests/kernel/test_publish_many.py
+# @file: Kernel.build_outbox_rows Tests
+
+from app.core.kernel.events import SystemEvent
+from app.core.kernel.kernel import kernel
+from app.core.kernel.models import outbox_shard
+
+def _event(name, version="1.0.0"):
+    return SystemEvent(name=name, description="", payload_schema={}, version=version)
+
+def test_events_built_on_the_fly_keep_their_own_metadata():
+    # Each SystemEvent is garbage right after its row is built, so ids get reused.
+    rows = kernel.build_outbox_rows((_event(f"TEST:E{i}", f"{i}.0.0"), {"i": i}) for i in range(50))
+    assert [row["event_name"] for row in rows] == [f"TEST:E{i}" for i in range(50)]
+    assert [row["payload"]["meta"]["version"] for row in rows] == [f"{i}.0.0" for i in range(50)]
+
+def test_partition_key_and_shard():
+    rows = kernel.build_outbox_rows([
+        (_event("TEST:A"), {}, 42),
+        {"event": _event("TEST:B"), "payload": {"x": 1}, "partition_key": "order_7"},
+        (_event("TEST:C"), {}),
+    ])
+    assert [row["partition_key"] for row in rows] == ["42", "order_7", "global"]
+    assert [row["shard"] for row in rows] == [outbox_shard(row["partition_key"]) for row in rows]
+    assert rows[1]["payload"]["data"] == {"x": 1}
+    assert len({row["created_at"] for row in rows}) == 1
+
+def test_raw_string_events_are_accepted():
+    rows = kernel.build_outbox_rows([("LEGACY:EVENT", {}), ("LEGACY:EVENT", {})])
+    assert [row["event_name"] for row in rows] == ["LEGACY:EVENT", "LEGACY:EVENT"]
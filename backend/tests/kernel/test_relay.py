@@ -0,0 +1,47 @@
+# FILEPATH: backend/tests/kernel/test_relay.py
+# @file: Relay Publishing Tests (memory bus)
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.kernel.bus import MemoryBroker, MemoryProducer
+from app.core.kernel.models import SystemOutbox
+from app.core.kernel.relay import KafkaRelay
+
+class FlakyProducer(MemoryProducer):
+    """Memory producer whose delivery fails for the given event ids."""
+
+    def __init__(self, failing, **kwargs):
+        super().__init__(**kwargs)
+        self.failing = set(failing)
+
+    async def send(self, topic, value=None, **kwargs):
+        fut = await super().send(topic, value=value, **kwargs)
+        if value["id"] in self.failing:
+            fut = asyncio.get_running_loop().create_future()
+            fut.set_exception(ConnectionError(f"lost {value['id']}"))
+        return fut
+
+def _events(keys):
+    return [
+        SystemOutbox(id=i, seq=i, txid=1, shard=0, event_name="TEST:STEP", partition_key=key,
+                     payload={}, created_at=datetime.utcnow())
+        for i, key in enumerate(keys, start=1)
+    ]
+
+@pytest.mark.parametrize("pipelined", [True, False])
+def test_a_failed_event_holds_the_rest_of_its_key(pipelined):
+    async def scenario():
+        relay = KafkaRelay()
+        relay.producer = FlakyProducer({2}, broker=MemoryBroker(partitions=2))
+        await relay.producer.start()
+        events = _events(["a", "a", "b", "a", "b", "a"])
+        publish = relay.publish_pipelined if pipelined else relay.publish_sequential
+        return await publish(events)
+
+    success_ids, failures, held_ids = asyncio.run(scenario())
+    assert success_ids == [1, 3, 5]
+    assert list(failures) == [2]
+    assert held_ids == [4, 6]
@@ -0,0 +1,57 @@
+# FILEPATH: backend/tests/kernel/test_routing.py
+# @file: Topic Router & Event Header Tests
+
+from types import SimpleNamespace
+
+from app.core.kernel.routing import (
+    DEFAULT_SCHEMA_VERSION, HEADER_DOMAIN, HEADER_EVENT_ID, HEADER_EVENT_NAME,
+    HEADER_SCHEMA_VERSION, HEADER_TRACE_ID, TopicRouter, event_headers, read_headers
+)
+
+ROUTES = {"USER:": "user", "USER:ADMIN:": "admin", "USER:LOGIN": "audit", "WORKFLOW:": "workflow"}
+
+def test_exact_route_wins_over_prefixes():
+    router = TopicRouter(prefix="t", routes=ROUTES)
+    assert router.topic_for("USER:LOGIN") == "t.audit"
+    assert router.topic_for("USER:LOGIN:FAILED") == "t.user"   # Exact names are not prefixes
+
+def test_longest_prefix_wins():
+    router = TopicRouter(prefix="t", routes=ROUTES)
+    assert router.topic_for("USER:ADMIN:GRANTED") == "t.admin"
+    assert router.topic_for("USER:CREATED") == "t.user"
+    assert router.topic_for("WORKFLOW:STARTED") == "t.workflow"
+
+def test_unrouted_events_go_to_the_default_topic():
+    router = TopicRouter(prefix="t", routes=ROUTES)
+    assert router.topic_for("ORDER:PAID") == "t.events"
+    assert router.topic_for("USERS:X") == "t.events"
+    assert TopicRouter(prefix="t", routes={}).topic_for("USER:CREATED") == "t.events"
+
+def test_topics_lists_every_destination_once_default_first():
+    router = TopicRouter(prefix="t", routes={**ROUTES, "ORDER:": "user"})
+    topics = router.topics()
+    assert topics[0] == "t.events"
+    assert sorted(topics) == sorted({"t.events", "t.user", "t.admin", "t.audit", "t.workflow"})
+
+def _event(**fields):
+    defaults = {"id": 7, "event_name": "USER:CREATED", "payload": {}, "trace_id": None}
+    return SimpleNamespace(**{**defaults, **fields})
+
+def test_event_headers_round_trip():
+    event = _event(payload={"meta": {"version": "2.1.0"}}, trace_id="abc")
+    headers = read_headers(event_headers(event))
+    assert headers == {
+        HEADER_EVENT_NAME: "USER:CREATED",
+        HEADER_DOMAIN: "USER",
+        HEADER_SCHEMA_VERSION: "2.1.0",
+        HEADER_EVENT_ID: "7",
+        HEADER_TRACE_ID: "abc",
+    }
+
+def test_header_defaults():
+    # Explicit payload domain wins; CDC payloads carry the baseline schema; no trace, no header.
+    headers = read_headers(event_headers(_event(payload={"domain": "identity"})))
+    assert headers[HEADER_DOMAIN] == "identity"
+    assert headers[HEADER_SCHEMA_VERSION] == DEFAULT_SCHEMA_VERSION
+    assert HEADER_TRACE_ID not in headers
+    assert read_headers(None) == {}
@@ -0,0 +1,164 @@
+# FILEPATH: backend/tests/kernel/test_stream_consumer.py
+# @file: StreamConsumer Tests (memory bus)
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.kernel.bus import MemoryBroker, MemoryConsumer, MemoryProducer, TopicPartition
+from app.core.kernel.consumer import MemoryIdempotencyStore, StreamConsumer
+from app.core.kernel.handlers import EventHandlerRegistry
+
+TOPIC = "test.events"
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 0.02)
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_MAX_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 4)
+    monkeypatch.setattr(settings, "CONSUMER_POLL_TIMEOUT_MS", 20)
+
+class MemoryStreamConsumer(StreamConsumer):
+    """StreamConsumer on a private broker (no global state between tests)."""
+
+    def __init__(self, broker: MemoryBroker, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.broker = broker
+
+    def _build_consumer(self):
+        return MemoryConsumer(*self.topics, group_id=self.group_id, enable_auto_commit=False,
+                              auto_offset_reset=self.auto_offset_reset, broker=self.broker)
+
+async def _publish(broker, events):
+    producer = MemoryProducer(broker=broker, value_serializer=lambda v: json.dumps(v).encode("utf-8"))
+    await producer.start()
+    for event_id, name, key in events:
+        await producer.send(TOPIC, {"id": event_id, "event": name, "key": key, "payload": {}}, key=key.encode())
+
+async def _drain(consumer, rounds=200):
+    for _ in range(rounds):
+        await consumer.process_batch()
+
+def test_records_of_a_partition_run_in_order_once():
+    async def scenario():
+        broker = MemoryBroker(partitions=4)
+        seen = []
+        handlers = EventHandlerRegistry()
+
+        @handlers.on("TEST:")
+        async def record(event):
+            seen.append((event.partition_key, event.id))
+
+        await _publish(broker, [(i, "TEST:CREATED", f"k{i % 3}") for i in range(30)])
+        consumer = MemoryStreamConsumer(broker, "group", handlers, topics=[TOPIC], idempotency_store=MemoryIdempotencyStore())
+        consumer.consumer = consumer._build_consumer()
+        await consumer.consumer.start()
+        await _drain(consumer, rounds=3)
+
+        assert sorted(i for _, i in seen) == list(range(30))
+        for key in ("k0", "k1", "k2"):
+            ids = [i for k, i in seen if k == key]
+            assert ids == sorted(ids)
+
+    asyncio.run(scenario())
+
+def test_failed_record_pauses_its_partition_then_succeeds():
+    async def scenario():
+        broker = MemoryBroker(partitions=1)
+        calls = []
+        handlers = EventHandlerRegistry()
+
+        @handlers.on("TEST:")
+        async def flaky(event):
+            calls.append(event.id)
+            if event.id == 2 and calls.count(2) < 3:
+                raise RuntimeError("boom")
+
+        await _publish(broker, [(1, "TEST:A", "k"), (2, "TEST:A", "k"), (3, "TEST:A", "k")])
+        consumer = MemoryStreamConsumer(broker, "group", handlers, topics=[TOPIC], idempotency_store=MemoryIdempotencyStore())
+        consumer.consumer = consumer._build_consumer()
+        await consumer.consumer.start()
+        tp = TopicPartition(TOPIC, 0)
+
+        await consumer.process_batch()
+        assert calls == [1, 2]
+        assert consumer.consumer.paused() == {tp}
+        assert await consumer.consumer.committed(tp) == 1
+
+        # While paused, nothing is fetched again.
+        assert await consumer.consumer.getmany(timeout_ms=0) == {}
+
+        await _drain(consumer, rounds=50)
+        assert calls == [1, 2, 2, 2, 3]
+        assert consumer.consumer.paused() == set()
+        assert await consumer.consumer.committed(tp) == 3
+
+    asyncio.run(scenario())
+
+def test_exhausted_record_is_skipped():
+    async def scenario():
+        broker = MemoryBroker(partitions=1)
+        calls = []
+        handlers = EventHandlerRegistry()
+
+        @handlers.on("TEST:")
+        async def poison(event):
+            calls.append(event.id)
+            if event.id == 1:
+                raise RuntimeError("poison")
+
+        await _publish(broker, [(1, "TEST:A", "k"), (2, "TEST:A", "k")])
+        consumer = MemoryStreamConsumer(broker, "group", handlers, topics=[TOPIC], idempotency_store=MemoryIdempotencyStore())
+        consumer.consumer = consumer._build_consumer()
+        await consumer.consumer.start()
+        await _drain(consumer, rounds=50)
+
+        assert calls == [1] * settings.OUTBOX_MAX_ATTEMPTS + [2]
+        assert await consumer.consumer.committed(TopicPartition(TOPIC, 0)) == 2
+
+    asyncio.run(scenario())
+
+def test_redelivered_ids_are_skipped():
+    async def scenario():
+        broker = MemoryBroker(partitions=1)
+        calls = []
+        handlers = EventHandlerRegistry()
+
+        @handlers.on("TEST:")
+        async def record(event):
+            calls.append(event.id)
+
+        store = MemoryIdempotencyStore()
+        await store.mark("group", [1])
+        await _publish(broker, [(1, "TEST:A", "k"), (2, "TEST:A", "k")])
+        consumer = MemoryStreamConsumer(broker, "group", handlers, topics=[TOPIC], idempotency_store=store)
+        consumer.consumer = consumer._build_consumer()
+        await consumer.consumer.start()
+        await _drain(consumer, rounds=2)
+
+        assert calls == [2]
+
+    asyncio.run(scenario())
+
+def test_events_without_handler_are_not_decoded():
+    async def scenario():
+        broker = MemoryBroker(partitions=1)
+        handlers = EventHandlerRegistry()
+
+        @handlers.on("USER:")
+        async def users(event):
+            pass
+
+        producer = MemoryProducer(broker=broker)
+        await producer.start()
+        await producer.send(TOPIC, b"not json", key=b"k", headers=[("event_name", b"BILLING:PAID")])
+        consumer = MemoryStreamConsumer(broker, "group", handlers, topics=[TOPIC], idempotency_store=MemoryIdempotencyStore())
+        consumer.consumer = consumer._build_consumer()
+        await consumer.consumer.start()
+        await consumer.process_batch()
+
+        assert consumer.skipped == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+# FILEPATH: backend/tests/meta/test_batch.py
+# @file: Batch Evaluation Tests (evaluate_batch vs evaluate)
+
+import random
+
+import pytest
+
+from app.core.meta.constants import PolicyResolutionStrategy
+from app.core.meta.engine import PolicyEngine
+from tests.support import policy, random_entity, random_policies
+
+STRATEGIES = [PolicyResolutionStrategy.ALL_MUST_PASS, PolicyResolutionStrategy.AT_LEAST_ONE]
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_batch_verdicts_match_per_entity_evaluation(strategy):
+    rng = random.Random(22)
+    engine = PolicyEngine()
+
+    for _ in range(30):
+        policies = random_policies(rng)
+        # Without a context each entity is its own envelope.
+        entities = [{"host": random_entity(rng), "actor": {"id": rng.choice([1, 2])}} for _ in range(25)]
+        batch = engine.evaluate_batch(entities, policies, strategy=strategy)
+        expected = [engine.evaluate(entity, policies, strategy=strategy) for entity in entities]
+        assert batch.results == expected
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_batch_with_context_matches_the_wrapped_envelope(strategy):
+    rng = random.Random(23)
+    engine = PolicyEngine()
+    context = {"actor": {"id": 1}, "system": {"environment": "test"}}
+
+    for _ in range(10):
+        policies = random_policies(rng)
+        entities = [random_entity(rng) for _ in range(25)]
+        batch = engine.evaluate_batch(entities, policies, strategy=strategy, context=context)
+        expected = [
+            engine.evaluate(entity, policies, strategy=strategy, context_override={**context, "host": entity})
+            for entity in entities
+        ]
+        assert batch.results == expected
+
+def test_batch_stats_count_verdicts_and_crashes():
+    engine = PolicyEngine()
+    policies = [policy("limits", [
+        {"logic": "host.amount > `100`", "action": "BLOCK", "message": "Too high."},
+        {"logic": "length(host.amount) > `1`", "action": "BLOCK", "message": "Crashes."},
+    ])]
+    batch = engine.evaluate_batch([{"amount": 5}, {"amount": 500}, {"amount": [1]}], policies, context={})
+
+    assert [r.is_valid for r in batch.results] == [True, False, True]
+    assert batch.stats["blocked"] == 1
+    assert batch.stats["warned"] == 2       # Numbers crash length(): fail open with a warning
+    assert [rule["crashed"] for rule in batch.stats["rules"]] == [0, 2]
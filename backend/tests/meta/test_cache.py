@@ -0,0 +1,194 @@
+# FILEPATH: backend/tests/meta/test_cache.py
+# @file: Domain Cache Tests (invalidation races, TTL, cluster listener, service broadcasts)
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.meta import cache as cache_module
+from app.core.meta import service as service_module
+from app.core.meta.cache import ALL_DOMAINS, DomainCache, PolicyCacheListener
+from app.core.meta.schemas import PolicyBindingUpdate, PolicyUpdate
+from app.core.meta.service import MetaService
+
+class GatedCache(DomainCache):
+    """Returns '<domain>@<n>' for the n-th load; a load can be held open with 'gate'."""
+
+    def __init__(self, ttl=0):
+        super().__init__(ttl=ttl)
+        self.loads = 0
+        self.gate = None
+        self.started = asyncio.Event()
+
+    async def load(self, db, domain_keys):
+        self.loads += 1
+        generation = self.loads
+        self.started.set()
+        if self.gate is not None:
+            await self.gate.wait()
+        return {key: f"{key}@{generation}" for key in domain_keys}
+
+async def _racing_load(cache, invalidate_with):
+    """Starts a load of 'A' and 'B', invalidates while it is in flight, then lets it finish."""
+    cache.gate = asyncio.Event()
+    pending = asyncio.create_task(cache.get_many(None, ["A", "B"]))
+    await cache.started.wait()
+    cache.invalidate(invalidate_with)
+    cache.gate.set()
+    stale = await pending
+    cache.gate = None
+    return stale
+
+def test_load_racing_a_domain_invalidation_is_not_stored():
+    async def scenario():
+        cache = GatedCache()
+        # The caller that started the load still gets its (possibly stale) answer...
+        assert await _racing_load(cache, "A") == {"A": "A@1", "B": "B@1"}
+        # ...but only the untouched domain was stored.
+        assert await cache.get_many(None, ["A", "B"]) == {"A": "A@2", "B": "B@1"}
+        assert cache.loads == 2
+
+    asyncio.run(scenario())
+
+def test_load_racing_an_all_invalidation_stores_nothing():
+    async def scenario():
+        cache = GatedCache()
+        await _racing_load(cache, ALL_DOMAINS)
+        assert cache.stats()["domains"] == 0
+        assert await cache.get_many(None, ["A", "B"]) == {"A": "A@2", "B": "B@2"}
+
+    asyncio.run(scenario())
+
+def test_all_drops_every_domain_and_notifies_subscribers():
+    async def scenario():
+        cache = GatedCache()
+        seen = []
+        cache.subscribe(seen.append)
+        await cache.get_many(None, ["A", "B"])
+
+        cache.invalidate("A")
+        assert await cache.get_many(None, ["A", "B"]) == {"A": "A@2", "B": "B@1"}
+        cache.invalidate()
+        assert await cache.get_many(None, ["A", "B"]) == {"A": "A@3", "B": "B@3"}
+        assert seen == ["A", ALL_DOMAINS]
+
+    asyncio.run(scenario())
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+
+    async def scenario():
+        cache = GatedCache(ttl=30)
+        await cache.get_many(None, ["A"])
+        clock[0] += 29
+        assert await cache.get_many(None, ["A"]) == {"A": "A@1"}
+        clock[0] += 1
+        assert await cache.get_many(None, ["A"]) == {"A": "A@2"}
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    asyncio.run(scenario())
+
+def test_listener_applies_notifications_and_flushes_on_reconnect(monkeypatch):
+    async def scenario():
+        policies, states = GatedCache(), GatedCache()
+        listener = PolicyCacheListener(policies, channel="test_channel")
+        listener.attach(states)
+        await policies.get_many(None, ["A", "B"])
+        await states.get_many(None, ["A"])
+
+        listener._on_notify(None, 0, "test_channel", "A")
+        assert policies.stats()["domains"] == 1 and states.stats()["domains"] == 0
+        listener._on_notify(None, 0, "test_channel", "")
+        assert policies.stats()["domains"] == 0
+
+        # Connection lost: flush at once, then again once LISTEN is back (the second attempt succeeds).
+        attempts = []
+        async def connect():
+            attempts.append(policies.stats()["domains"])
+            return len(attempts) > 1
+        monkeypatch.setattr(listener, "_connect", connect)
+        real_sleep = asyncio.sleep
+        monkeypatch.setattr(cache_module.asyncio, "sleep", lambda delay: real_sleep(0))
+
+        await policies.get_many(None, ["A"])
+        listener._on_terminate(None)
+        assert policies.stats()["domains"] == 0
+        # Filled while the listener was deaf: must not survive the reconnect.
+        await policies.get_many(None, ["B"])
+        await listener._reconnect
+        assert attempts == [1, 1]
+        assert policies.stats()["domains"] == 0
+        await listener.stop()
+
+    asyncio.run(scenario())
+
+class FakeSession:
+    """Just enough of an AsyncSession for the MetaService update paths."""
+
+    def __init__(self, row):
+        self.row = row
+
+    async def get(self, model, id):
+        return self.row
+
+    async def execute(self, stmt):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: self.row))
+
+    def add(self, obj):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+    async def rollback(self):
+        pass
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    sent = []
+    async def record(domain):
+        sent.append(domain)
+    monkeypatch.setattr(cache_module, "notify_invalidation", record)
+    # Isolated from the process-wide cache other tests may have filled.
+    monkeypatch.setattr(service_module, "policy_cache", GatedCache())
+    return sent
+
+def test_update_binding_broadcasts_the_old_and_the_new_domain(broadcasts, monkeypatch):
+    monkeypatch.setattr(service_module, "SystemOutbox", lambda **fields: SimpleNamespace(**fields))
+    binding = SimpleNamespace(id=7, target_domain="CONTAINER", is_active=True, priority=0)
+    # PolicyBindingUpdate cannot move a binding today; a moved binding must still leave both caches.
+    move = SimpleNamespace(model_dump=lambda **kwargs: {"target_domain": "BOOKING"})
+
+    async def scenario():
+        await MetaService.update_binding(FakeSession(binding), 7, move)
+        assert sorted(broadcasts) == ["BOOKING", "CONTAINER"]
+
+        broadcasts.clear()
+        await MetaService.update_binding(FakeSession(binding), 7, PolicyBindingUpdate(priority=5))
+        assert broadcasts == ["BOOKING"]
+
+    asyncio.run(scenario())
+
+def test_update_policy_broadcasts_every_domain(broadcasts):
+    parent = SimpleNamespace(
+        id=3, key="limits", name="Limits", description=None, resolution="ALL_MUST_PASS",
+        rules=[], tags=[], is_active=True, version_major=1, version_minor=0, is_latest=True
+    )
+
+    async def scenario():
+        cache = service_module.policy_cache
+        await cache.get_many(None, ["CONTAINER", "BOOKING"])
+        # A new version re-targets every binding of the old one, wherever it is bound.
+        await MetaService.update_policy(FakeSession(parent), 3, PolicyUpdate(name="Limits v2"))
+        assert broadcasts == [ALL_DOMAINS]
+        assert cache.stats()["domains"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+# FILEPATH: backend/tests/meta/test_changeset.py
+# @file: Changeset-Aware Evaluation Tests (CompiledRule.affected_by, LogicInterceptor._changed_paths)
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.kernel.interceptor import LogicInterceptor
+from app.core.meta.compiled import compile_rule
+from app.core.meta.constants import POLICY_TAG_CHANGESET_AWARE
+from app.core.meta.engine import PolicyEngine
+from tests.support import policy
+
+def _rule(logic):
+    return compile_rule({"logic": logic, "action": "BLOCK", "message": logic}, "test")
+
+def _changed(*columns, container_key=None):
+    snapshot = SimpleNamespace(changeset={column: {"old": None, "new": 1} for column in columns})
+    return LogicInterceptor._changed_paths(snapshot, container_key)
+
+def test_changed_paths_cover_columns_and_the_container():
+    assert _changed("amount", "status") == {("host", "amount"), ("host", "status")}
+    assert _changed("amount", "attributes", container_key="attributes") == {
+        ("host", "amount"), ("host", "attributes"), ("meta",)
+    }
+    assert _changed("amount", container_key="attributes") == {("host", "amount")}
+
+def test_rule_on_another_column_is_skipped():
+    assert not _rule("host.x > `1`").affected_by(_changed("y"))
+    assert _rule("host.x > `1`").affected_by(_changed("x"))
+    # Nested reads overlap their column.
+    assert _rule("host.address.city == 'Riga'").affected_by(_changed("address"))
+
+def test_rule_on_the_whole_host_is_evaluated():
+    assert _rule("length(keys(host)) > `3`").affected_by(_changed("y"))
+
+def test_meta_rule_follows_the_container_column():
+    rule = _rule("meta.risk.score > `5`")
+    assert rule.affected_by(_changed("attributes", container_key="attributes"))
+    assert not rule.affected_by(_changed("amount", container_key="attributes"))
+
+@pytest.mark.parametrize("logic", [
+    "host.owner == actor.id",          # reads the actor
+    "context.tenant == 'acme'",        # volatile namespace
+    "session.locale == 'lv'",
+    "`true`",                          # constant: no read set
+])
+def test_volatile_and_actor_rules_are_always_evaluated(logic):
+    assert _rule(logic).affected_by(_changed("unrelated"))
+
+@pytest.mark.parametrize("tags, blocked", [
+    ([], True),                                  # not opted in: every rule runs
+    (["audit"], True),
+    ([POLICY_TAG_CHANGESET_AWARE], False),       # opted in: the unaffected rule is skipped
+])
+def test_only_tagged_policies_are_selective(tags, blocked):
+    engine = PolicyEngine()
+    limits = policy("limits", [{"logic": "host.amount > `100`", "action": "BLOCK", "message": "Too high."}], tags=tags)
+    # Without a context the entity is its own envelope.
+    result = engine.evaluate({"host": {"amount": 500, "note": "x"}}, [limits], changed=_changed("note"))
+    assert result.is_valid is not blocked
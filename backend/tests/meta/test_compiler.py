@@ -0,0 +1,80 @@
+# FILEPATH: backend/tests/meta/test_compiler.py
+# @file: Rule Compiler Tests (native backend vs jmespath)
+
+import random
+
+import jmespath
+import pytest
+
+from app.core.meta.compiler import compile_native, read_paths
+
+PATHS = ["host.amount", "host.status", "host.tags", "host.flag", "host.nested.x", "host.missing", "meta.score"]
+LITERALS = ["`0`", "`1`", "`-2`", "`1.5`", "`true`", "`false`", "`null`", "`\"x\"`", "'DRAFT'", "''", "`[]`", "`{}`", "`[1, 2]`"]
+VALUES = [None, True, False, 0, 1, -2, 1.5, "", "x", "DRAFT", [], [1, 2], ["x", "DRAFT"], {}, {"x": 1}]
+COMPARATORS = ["==", "!=", "<", "<=", ">", ">="]
+
+def _atom(rng):
+    return rng.choice(PATHS) if rng.random() < 0.6 else rng.choice(LITERALS)
+
+def _expression(rng, depth):
+    """A random expression of the supported subset."""
+    roll = rng.random()
+    if depth <= 0 or roll < 0.25:
+        kind = rng.randrange(4)
+        if kind == 0:
+            return _atom(rng)
+        if kind == 1:
+            return f"{_atom(rng)} {rng.choice(COMPARATORS)} {_atom(rng)}"
+        if kind == 2:
+            return f"contains({rng.choice(PATHS)}, {_atom(rng)})"
+        return f"length({rng.choice(PATHS)}) {rng.choice(COMPARATORS)} `{rng.randrange(3)}`"
+    if roll < 0.45:
+        return f"!({_expression(rng, depth - 1)})"
+    operator = rng.choice(["&&", "||"])
+    return f"({_expression(rng, depth - 1)}) {operator} ({_expression(rng, depth - 1)})"
+
+def _envelope(rng):
+    return {
+        "host": {
+            "amount": rng.choice(VALUES),
+            "status": rng.choice(VALUES),
+            "tags": rng.choice(VALUES),
+            "flag": rng.choice(VALUES),
+            "nested": rng.choice([{"x": rng.choice(VALUES)}, None, "x", [1]]),
+        },
+        "meta": rng.choice([{"score": rng.choice(VALUES)}, {}, None]),
+    }
+
+def _outcome(expression, envelope):
+    try:
+        return ("ok", expression.search(envelope))
+    except Exception as e:
+        return ("error", type(e).__name__)
+
+def test_native_backend_matches_the_interpreter():
+    rng = random.Random(21)
+    envelopes = [_envelope(rng) for _ in range(40)]
+
+    for _ in range(400):
+        source = _expression(rng, depth=3)
+        interpreted = jmespath.compile(source)
+        native = compile_native(source, interpreted.parsed)
+        assert native is not None, source
+        for envelope in envelopes:
+            expected, actual = _outcome(interpreted, envelope), _outcome(native, envelope)
+            # True == 1 in Python: compare the types too.
+            assert (actual, type(actual[1])) == (expected, type(expected[1])), (source, envelope)
+
+@pytest.mark.parametrize("source", ["host.tags[0]", "host.tags[?@ == 'x']", "sort(host.tags)", "host.*", "host.a | length(@)"])
+def test_constructs_outside_the_subset_stay_interpreted(source):
+    assert compile_native(source, jmespath.compile(source).parsed) is None
+
+@pytest.mark.parametrize("source, paths", [
+    ("host.status == 'APPROVED' && actor.role != 'admin'", {("host", "status"), ("actor", "role")}),
+    ("contains(host.tags, 'vip') || !(meta.risk.score)", {("host", "tags"), ("meta", "risk", "score")}),
+    ("host.tags[0] == 'x'", {("host", "tags")}),
+    ("`1` == `1`", set()),
+    ("length(@) > `1`", {()}),
+])
+def test_read_paths(source, paths):
+    assert read_paths(jmespath.compile(source).parsed) == frozenset(paths)
@@ -0,0 +1,70 @@
+# FILEPATH: backend/tests/meta/test_early_exit.py
+# @file: Early Exit Tests (_probe_blocks vs full evaluation)
+
+import random
+
+from app.core.meta.compiled import compile_policy
+from app.core.meta.engine import PolicyEngine
+from tests.support import policy, random_entity, random_policies
+
+def _envelope(rng):
+    return {"host": random_entity(rng), "actor": {"id": rng.choice([1, 2])}}
+
+def test_early_exit_agrees_with_full_evaluation():
+    rng = random.Random(24)
+    engine = PolicyEngine()
+
+    for _ in range(40):
+        # Compiled once and reused, so RuleStats (the probe order) evolve across calls.
+        policies = [compile_policy(p) for p in random_policies(rng)]
+        for _ in range(25):
+            envelope = _envelope(rng)
+            full = engine.evaluate(envelope, policies)
+            fast = engine.evaluate(envelope, policies, early_exit=True)
+
+            assert fast.is_valid == full.is_valid
+            if full.is_valid:
+                assert fast == full
+            else:
+                # A block carries only the first blocking message found.
+                assert len(fast.blocking_errors) == 1
+                assert fast.blocking_errors[0] in full.blocking_errors
+
+def test_blocked_verdict_stops_at_the_first_match():
+    engine = PolicyEngine()
+    policies = [compile_policy(policy("limits", [
+        {"logic": "host.amount > `100`", "action": "BLOCK", "message": "Too high."},
+        {"logic": "host.status == 'DRAFT'", "action": "WARN", "message": "Draft."},
+    ]))]
+
+    result = engine.evaluate({"host": {"amount": 500, "status": "DRAFT"}}, policies, early_exit=True)
+    assert not result.is_valid
+    assert result.blocking_errors == ["Too high."]
+    assert result.warnings == []        # Non-BLOCK rules never ran
+    assert engine.stats()["early_exits"] == 1
+
+def test_probed_rules_are_not_run_twice():
+    engine = PolicyEngine()
+    policies = [compile_policy(policy("limits", [
+        {"logic": "length(host.amount) > `1`", "action": "BLOCK", "message": "Crashes."},
+        {"logic": "host.amount > `100`", "action": "BLOCK", "message": "Too high."},
+        {"logic": "host.amount > `10`", "action": "WARN", "message": "High."},
+    ]))]
+
+    # Nothing blocks: the probe outcomes (one crash) are replayed by the full pass, not re-run.
+    result = engine.evaluate({"host": {"amount": 50}}, policies, early_exit=True)
+    assert result.is_valid
+    assert result.warnings == ["System Governance Warning: Rule crashed in 'limits'. Logic ignored.", "High."]
+    assert engine.stats()["rules_evaluated"] == 3
+    assert result == engine.evaluate({"host": {"amount": 50}}, policies)
+
+def test_explain_ignores_early_exit():
+    engine = PolicyEngine()
+    policies = [policy("limits", [
+        {"logic": "host.amount > `100`", "action": "BLOCK", "message": "Too high."},
+        {"logic": "host.amount > `200`", "action": "BLOCK", "message": "Way too high."},
+    ])]
+
+    result = engine.evaluate({"host": {"amount": 500}}, policies, early_exit=True, explain=True)
+    assert result.blocking_errors == ["Too high.", "Way too high."]
+    assert [rule["matched"] for rule in result.trace["policies"][0]["rules"]] == [True, True]
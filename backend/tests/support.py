@@ -0,0 +1,62 @@
+# FILEPATH: backend/tests/support.py
+# @file: Test Helpers
+# @author: The Engineer
+# @description: Disposable kernel tables on the TEST_DATABASE_URL database, and synthetic
+#              policies / entities for the policy engine tests (no database needed).
+
+import random
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, List, AsyncIterator, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database.base import Base
+
+@asynccontextmanager
+async def kernel_tables(url: str, tables: Sequence[Table]) -> AsyncIterator[async_sessionmaker]:
+    """Creates 'tables' (dropping leftovers first), yields a session factory, drops them again."""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=list(tables))
+        await conn.run_sync(Base.metadata.create_all, tables=list(tables))
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=list(tables))
+        await engine.dispose()
+
+# --- POLICIES ---
+
+# Every action the engine applies, plus rules that crash for some entities (length() of a number).
+RULES: List[Dict[str, Any]] = [
+    {"logic": "host.amount > `100`", "action": "BLOCK", "message": "Amount too high."},
+    {"logic": "host.amount < `0` || host.status == 'REJECTED'", "action": "BLOCK", "message": "Invalid."},
+    {"logic": "length(host.amount) > `1`", "action": "BLOCK", "message": "Crashes on numbers."},
+    {"logic": "host.status == 'DRAFT'", "action": "WARN", "message": "Still a draft."},
+    {"logic": "contains(host.tags, 'vip')", "action": "SET_VALUE", "target": "priority", "value": "host.amount"},
+    {"logic": "!host.active", "action": "TRANSITION", "value": "ARCHIVED"},
+    {"logic": "host.owner == actor.id", "action": "TRIGGER_EVENT", "value": {"event": "OWNER:SAVED", "payload": {}}},
+    {"logic": "host.amount >= `50` && host.status != 'APPROVED'", "action": "BLOCK", "message": "Needs approval."},
+]
+
+def policy(key: str, rules: List[Dict[str, Any]], is_active: bool = True, tags: List[str] = None) -> SimpleNamespace:
+    """Transient PolicyDefinition stand-in (no id: compiled on every call, never cached)."""
+    return SimpleNamespace(key=key, name=key, is_active=is_active, rules=rules, tags=tags or [])
+
+def random_policies(rng: random.Random, count: int = 4) -> List[SimpleNamespace]:
+    return [
+        policy(f"p{i}", rng.sample(RULES, rng.randint(1, 4)), is_active=rng.random() > 0.1)
+        for i in range(count)
+    ]
+
+def random_entity(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "amount": rng.choice([None, -1, 0, 50, 100, 101, 1000.5, "12"]),
+        "status": rng.choice(["DRAFT", "SUBMITTED", "APPROVED", "REJECTED", None]),
+        "tags": rng.choice([[], ["vip"], ["a", "vip"], None]),
+        "active": rng.choice([True, False, None, 0, 1]),
+        "owner": rng.choice([1, 2, None]),
+    }
@@ -0,0 +1,89 @@
+# FILEPATH: backend/tests/utilities/test_async_bridge.py
+# @file: AsyncBridge Tests (persistent sidecar loops)
+
+import asyncio
+import contextvars
+
+import pytest
+
+from app.core.utilities.async_bridge import AsyncBridge
+
+request_user = contextvars.ContextVar("request_user", default=None)
+
+@pytest.fixture
+def bridge():
+    bridge = AsyncBridge(loops=2, timeout=5)
+    yield bridge
+    bridge.shutdown()
+
+async def _running_loop():
+    return asyncio.get_running_loop()
+
+def test_results_and_errors_cross_the_bridge(bridge):
+    async def add(a, b):
+        await asyncio.sleep(0)
+        return a + b
+
+    async def fail():
+        raise ValueError("nope")
+
+    assert bridge.run_sync(add(2, 3)) == 5
+    with pytest.raises(ValueError, match="nope"):
+        bridge.run_sync(fail())
+
+def test_context_vars_are_carried_to_the_sidecar(bridge):
+    async def whoami():
+        return request_user.get()
+
+    token = request_user.set("alice")
+    try:
+        assert bridge.run_sync(whoami()) == "alice"
+    finally:
+        request_user.reset(token)
+    assert bridge.run_sync(whoami()) is None
+
+def test_calls_are_spread_over_persistent_loops(bridge):
+    loops = [bridge.run_sync(_running_loop()) for _ in range(4)]
+
+    assert len({id(loop) for loop in loops}) == 2
+    assert loops[0] is loops[2] and loops[1] is loops[3]
+    assert all(bridge.owns_loop(loop) for loop in loops)
+
+    with asyncio.Runner() as runner:
+        assert not bridge.owns_loop(runner.get_loop())
+
+def test_nested_calls_from_a_sidecar_do_not_deadlock(bridge):
+    async def outer():
+        # Sync code running inside a sidecar (e.g. an ORM hook) calling the bridge again.
+        inner_loop = bridge.run_sync(_running_loop())
+        return inner_loop, asyncio.get_running_loop()
+
+    inner_loop, outer_loop = bridge.run_sync(outer())
+    assert inner_loop is not outer_loop
+    assert not bridge.owns_loop(inner_loop)
+
+def test_timeout_cancels_the_call(bridge):
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(TimeoutError):
+        bridge.run_sync(slow(), timeout=0.05)
+    # The cancellation is delivered on the sidecar loop; the next call on it runs after it.
+    bridge.run_sync(_running_loop())
+    bridge.run_sync(_running_loop())
+    assert cancelled == [True]
+
+def test_shutdown_stops_the_pool_and_the_next_call_restarts_it(bridge):
+    first = bridge.run_sync(_running_loop())
+    bridge.shutdown()
+    assert first.is_closed()
+    assert not bridge.owns_loop(first)
+
+    second = bridge.run_sync(_running_loop())
+    assert second is not first and bridge.owns_loop(second)